@@ -2,27 +2,75 @@
 
 from tkinter import messagebox
 from tkinter.ttk import Progressbar, Treeview, Notebook
-from PIL import Image, ImageTk
-from threading import Lock, Thread
-from time import gmtime, strftime
+from PIL import ImageTk
+from collections import deque
+from threading import Lock, current_thread
+from time import perf_counter
 import tkinter as tk
 import random
+import traceback
 import data as dat
+from renderer.Renderer import Renderer
+from renderer.RotationCache import RotationCache
+from renderer.AssetStore import AssetStore
+from renderer.ChatHistory import ChatHistory
+from player.InputQueue import InputQueue
+
+
+class GraphicalApp(tk.Frame, Renderer):
+    """Interface graphique du jeu.
+        Tk n'est pas thread-safe : seul le thread de Tk modifie les widgets.
+        Les appels venant des autres threads sont mis en attente et exécutés par la boucle d'affichage,
+        qui redessine aussi les pods depuis le dernier instantané publié par le dispatcher.
+    """
+    
+    def __init__(self, dispatcher, assets=None, maxChatRows=ChatHistory.DEFAULT_MAX_ROWS, chatRate=None):
+        """Constructeur.
 
+        Arguments:
+            dispatcher -- Le dispatcher de l'application.
 
-class GraphicalApp(tk.Frame):
-    """Interface graphique du jeu."""
-    
-    def __init__(self, dispatcher):
+        Keyword Arguments:
+            assets -- Le magasin des sprites, un nouveau magasin lisant les PNG si None. (default: {None})
+            maxChatRows -- Le nombre maximum de messages affichés par chat. (default: {ChatHistory.DEFAULT_MAX_ROWS})
+            chatRate -- Le nombre maximum de messages reçus par seconde et par chat, None pour ne pas limiter.
+                        (default: {None})
+        """
         self.dispatcher = dispatcher
+        self.assets = assets if assets is not None else AssetStore()
         self.master = None
         self.treeview = None
-        self.chats = {}     # contient des listes [id, treeview, entry, bouton, messageCpt]
+        self.scoreRows = {}     # pseudo -> identifiant de sa ligne dans le tableau des scores
+        self.scoreValues = {}   # pseudo -> score affiché
+        self.scoreOrder = []    # Les pseudos, dans l'ordre des lignes du tableau des scores
+        self.chats = {}     # contient des listes [id, treeview, entry, bouton]
+        self.chatHistories = {}     # L'historique de chaque chat, créé au premier message, même avant le chat
+        self.chatLock = Lock()      # Protège chatHistories, modifié par les threads réseau et celui de Tk
+        self.maxChatRows = maxChatRows
+        self.chatRate = chatRate
         self.progress = None
-        self.previousAngles = {}
+        self.previousAngles = {}    # L'angle affiché de chaque pod, par tag
+        self.podPictures = {}   # La photoImage affichée de chaque pod, par tag
+        self.drawnPositions = {}    # La position affichée de chaque pod, en pixels entiers, par tag
+        self.drawnPods = {}     # Le dernier instantané dessiné de chaque joueur, par pseudo
+        # Deux sprites de pods, au plus un angle entier par degré : tout tient dans le cache
+        self.rotationCache = RotationCache(lambda image, angle: ImageTk.PhotoImage(image.rotate(angle)), maxSize=2 * 360)
+        self.tkThread = current_thread()
+        self.pendingCalls = deque()     # Les appels (méthode, arguments) faits depuis d'autres threads
+        self.tagLock = Lock()
+        self.tagCpt = 0
+        self.renderedSnapshot = None
+        self.nextFrameTime = None
+        self.renderAfterId = None
+        self.skippedFrames = 0
+        self.renderedFrames = 0
+        self.tkCalls = 0        # Le nombre d'appels faits au canvas
+        self.frameTkCalls = 0   # Le nombre d'appels faits au canvas lors de la dernière image
+        self.closed = False
         self.initializeGraphicalApp()
 
         self.dispatcher.setGraphicalApp(self)
+        self.startRenderLoop()
         self.mainloop()
 
     def initializeGraphicalApp(self):
@@ -34,6 +82,9 @@ class GraphicalApp(tk.Frame):
         
         self.createWidgets()
         self.setUpBindingEvent()
+        # Les photoImages sont créées ici, par le thread de Tk : les autres threads ne font que les lire
+        for sprite in AssetStore.SPRITES:
+            self.assets.getPhotoImage(sprite)
         self.master.protocol("WM_DELETE_WINDOW", self.closeWindow)
         msg = "Welcome space travelers !\n\n"
         msg += "A brand new race has been created. "
@@ -90,16 +141,115 @@ class GraphicalApp(tk.Frame):
 
     def setUpBindingEvent(self):
         """Met en place tous les événement permettant eu joueur de contrôler son pod."""
-        # Les code de mise à jour du joueur doivent être exécutés dans un autre thread.
-        # Dans le cas contraire, il y a un interblocage entre le thread de
-        # l'interface graphique (celui-ci), et celui qui met à jour périodiquement les position des joueurs.
-        self.master.bind('<Left>', self.dispatcher.antiClockEvent)
-        self.master.bind('<Right>', self.dispatcher.clockEvent)
-        self.master.bind('<Up>', self.dispatcher.thrustEvent)
+        # Les touches sont seulement ajoutées à une file lue par la simulation à chaque image :
+        # le thread de l'interface graphique (celui-ci) ne modifie jamais le joueur.
+        # Une touche maintenue agit à chaque image, la répétition automatique du système ne change rien.
+        for (key, action) in (("Left", InputQueue.ANTICLOCK), ("Right", InputQueue.CLOCK), ("Up", InputQueue.THRUST)):
+            self.master.bind("<KeyPress-" + key + ">", lambda event, action=action: self.dispatcher.keyPressedEvent(action))
+            self.master.bind("<KeyRelease-" + key + ">",
+                             lambda event, action=action: self.dispatcher.keyReleasedEvent(action))
+        self.master.bind("<FocusOut>", self.dispatcher.focusLostEvent)
+
+    def postToTkThread(self, function, *args):
+        """Confie un appel à la boucle d'affichage s'il n'est pas fait depuis le thread de Tk.
+        
+        Arguments:
+            function -- La méthode appelée.
+            args -- Les arguments de l'appel.
+        
+        Returns:
+            True si l'appel a été mis en attente, False s'il peut être exécuté tout de suite.
+        """
+        if current_thread() is self.tkThread:
+            return False
+        self.pendingCalls.append((function, args))
+        return True
+
+    def newTag(self):
+        """Génère un tag pour un nouvel élément du canvas.
+            Le tag est connu tout de suite, même si l'élément n'est créé que plus tard par la boucle d'affichage.
+        
+        Returns:
+            Le nouveau tag.
+        """
+        with self.tagLock:
+            self.tagCpt += 1
+            return "item" + str(self.tagCpt)
+
+    def startRenderLoop(self):
+        """Lance la boucle d'affichage dans le thread de Tk."""
+        self.nextFrameTime = perf_counter()
+        self.renderAfterId = self.master.after(0, self.renderFrame)
+
+    def renderFrame(self):
+        """ Une image de la boucle d'affichage, exécutée par le thread de Tk tous les refresh_tickrate.
+            Exécute les appels en attente, puis redessine les pods si un nouvel instantané a été publié.
+            Les images manquées quand la boucle a pris du retard sont sautées plutôt que rattrapées.
+        """
+        while self.pendingCalls and not self.closed:
+            (function, args) = self.pendingCalls.popleft()
+            # Une erreur dans un appel ne doit pas arrêter la boucle d'affichage
+            try:
+                function(*args)
+            except Exception:
+                traceback.print_exc()
+        # La fenêtre a été fermée par l'un des appels
+        if self.closed:
+            return
+        self.flushChats()
+
+        tkCalls = self.tkCalls
+        snapshot = self.dispatcher.getSnapshot()
+        if snapshot is not self.renderedSnapshot:
+            self.renderedSnapshot = snapshot
+            for pod in snapshot.getPods():
+                # Un joueur qui n'a pas changé garde le même instantané (voir PlayerPod.snapshot)
+                if self.drawnPods.get(pod.getPseudo()) is pod:
+                    continue
+                self.drawnPods[pod.getPseudo()] = pod
+                self.updateUIPlayer(pod)
+        self.frameTkCalls = self.tkCalls - tkCalls
+        self.renderedFrames += 1
+
+        period = 1 / dat.REFRESH_TICRATE
+        self.nextFrameTime += period
+        now = perf_counter()
+        if now > self.nextFrameTime:
+            missed = int((now - self.nextFrameTime) / period) + 1
+            self.skippedFrames += missed
+            self.nextFrameTime += missed * period
+        self.renderAfterId = self.master.after(int(round((self.nextFrameTime - now) * 1000)), self.renderFrame)
+
+    def createImage(self, tag, x, y, photoImage):
+        """Ajoute une image au canvas.
+        
+        Arguments:
+            tag -- Le tag de l'image.
+            x -- La coordonnée X, dans le repère du canvas.
+            y -- La coordonnée Y, dans le repère du canvas.
+            photoImage -- La photoImage à afficher.
+        """
+        if self.postToTkThread(self.createImage, tag, x, y, photoImage):
+            return
+        self.tkCalls += 1
+        self.canvas.create_image(x, y, image=photoImage, tags=(tag,))
+        self.drawnPositions[tag] = (int(round(x)), int(round(y)))
+
+    def getRenderStats(self):
+        """Getteur sur les mesures de la boucle d'affichage.
+        
+        Returns:
+            Un dictionnaire : le nombre d'images dessinées et sautées, d'appels au canvas au total et lors de la dernière image.
+        """
+        return {
+            "frames": self.renderedFrames,
+            "skippedFrames": self.skippedFrames,
+            "tkCalls": self.tkCalls,
+            "lastFrameTkCalls": self.frameTkCalls
+        }
 
     def createSpaceEnvironment(self):
         """Crée un décor spatial."""
-        self.canvasLock = Lock()
         self.canvas = tk.Canvas(self.master, width=dat.ARENA_L*2, height=dat.ARENA_H*2, bg="black")
         self.canvas.grid(row=5, column=0, columnspan=3, rowspan=5, pady=(10, 0))
 
@@ -129,6 +279,8 @@ class GraphicalApp(tk.Frame):
 
     def createChat(self, nom, enable=True):
         """Crée un nouveau chat."""
+        if self.postToTkThread(self.createChat, nom, enable):
+            return
         frame = tk.Frame(self.notebook)
         self.notebook.add(frame, text=nom)
         chat = Treeview(frame, height=15)
@@ -157,10 +309,12 @@ class GraphicalApp(tk.Frame):
         messageButton["command"] = lambda: self.sendMessage(nom, messageEntry)
         messageButton.grid(row=4, column=1, sticky=tk.S)
 
-        self.chats[nom] = [frame, chat, messageEntry, messageButton, 0]
+        self.chats[nom] = [frame, chat, messageEntry, messageButton]
 
     def deleteChat(self, name):
         """Supprime un chat."""
+        if self.postToTkThread(self.deleteChat, name):
+            return
         self.notebook.forget(self.chats[name][0])
 
     def sendMessage(self, target, entry):
@@ -178,7 +332,9 @@ class GraphicalApp(tk.Frame):
             entry.delete(0, tk.END)
     
     def addMessage(self, chatName, message, fromMe=False):
-        """Ajout un message à un chat.
+        """ Ajout un message à un chat.
+            Le message n'est que mis en attente dans l'historique du chat, qui peut ne pas encore exister :
+            la boucle d'affichage l'ajoutera au Treeview avec les autres messages reçus pendant l'image.
         
         Arguments:
             chatName -- Le nom du chat.
@@ -187,12 +343,20 @@ class GraphicalApp(tk.Frame):
         Keyword Arguments:
             fromMe -- Indique si le message vient de l'utilisateur de l'application cliente. (default: {False})
         """
-        currentDate = strftime("%d/%m/%Y-%H:%M:%S", gmtime())
-        fromMeTag = 'from_me' if fromMe else 'not_from_me'
-        odd_even_tag = 'even' if (self.chats[chatName][4] % 2) == 0 else 'odd'
-        
-        self.chats[chatName][1].insert('', 'end', text=message, values=currentDate, tags=(odd_even_tag, fromMeTag))
-        self.chats[chatName][4] += 1
+        with self.chatLock:
+            history = self.chatHistories.get(chatName)
+            if history is None:
+                history = self.chatHistories[chatName] = ChatHistory(self.maxChatRows, self.chatRate)
+            history.push(message, fromMe)
+
+    def flushChats(self):
+        """Ajoute aux Treeview des chats les messages en attente. Appelée par la boucle d'affichage."""
+        with self.chatLock:
+            histories = list(self.chatHistories.items())
+        for (name, history) in histories:
+            chat = self.chats.get(name)
+            if chat is not None and history.hasPending():
+                history.flush(chat[1])
 
     def addScoreToTable(self, user, score):
         """Ajoute un nouveau score au tableau des scores.
@@ -201,7 +365,59 @@ class GraphicalApp(tk.Frame):
             user  -- Un pseudo.
             score -- Un score.
         """
-        self.treeview.insert('', 'end', text=str(user), values=str(score))
+        if self.postToTkThread(self.addScoreToTable, user, score):
+            return
+        user = str(user)
+        score = str(score)
+        if user in self.scoreRows:
+            if self.scoreValues[user] != score:
+                self.treeview.item(self.scoreRows[user], values=score)
+                self.scoreValues[user] = score
+            return
+        self.scoreRows[user] = self.treeview.insert('', 'end', text=user, values=score)
+        self.scoreValues[user] = score
+        self.scoreOrder.append(user)
+
+    def updateScores(self, scores):
+        """ Met à jour le tableau des scores avec les scores de tous les joueurs.
+            Seules les différences sont appliquées : les scores changés sont modifiés, les joueurs arrivés
+            ajoutés, ceux partis retirés. Les joueurs sont affichés dans l'ordre envoyé par le serveur,
+            les lignes ne sont déplacées que si cet ordre a changé.
+        
+        Arguments:
+            scores -- Une liste de tuple(pseudo, score).
+        """
+        if self.postToTkThread(self.updateScores, scores):
+            return
+        # Un dictionnaire garde l'ordre d'insertion : celui des scores reçus
+        received = {}
+        for (user, score) in scores:
+            received[str(user)] = None
+            self.addScoreToTable(user, score)
+        for user in [user for user in self.scoreOrder if user not in received]:
+            self.removeScore(user)
+
+        order = list(received)
+        if order == self.scoreOrder:
+            return
+        for (index, user) in enumerate(order):
+            if self.scoreOrder[index] != user:
+                self.treeview.move(self.scoreRows[user], '', index)
+                self.scoreOrder.remove(user)
+                self.scoreOrder.insert(index, user)
+
+    def removeScore(self, user):
+        """Retire un joueur du tableau des scores. Doit être appelée depuis le thread de Tk.
+        
+        Arguments:
+            user -- Le pseudo du joueur.
+        """
+        row = self.scoreRows.pop(user, None)
+        if row is None:
+            return
+        self.treeview.delete(row)
+        del self.scoreValues[user]
+        self.scoreOrder.remove(user)
     
     def createGraphicalPlayer(self, playerX, playerY):
         """Crée un joueur à une position spécifique.
@@ -211,17 +427,17 @@ class GraphicalApp(tk.Frame):
             playerY -- La coordonnée Y du joueur.
         
         Returns:
-            tuple -- Un tuple contenant le tag du joueur dans le canvas et ses images.
+            tuple -- Un tuple contenant le tag du joueur dans le canvas, ses images et le chemin de son sprite.
         """
         convertedPos = self.convertPosition(playerX, playerY)
-        playerImage = Image.open('images/pod_sprite_50.png')
-        podPicture = ImageTk.PhotoImage(playerImage)
+        sprite = 'images/pod_sprite_50.png'
+        playerImage = self.assets.getImage(sprite)
+        podPicture = self.assets.getPhotoImage(sprite)
         
-        self.canvasLock.acquire()
-        tagPlayer = self.canvas.create_image(convertedPos[0], convertedPos[1], image=podPicture)
-        self.canvasLock.release()
+        tagPlayer = self.newTag()
+        self.createImage(tagPlayer, convertedPos[0], convertedPos[1], podPicture)
 
-        return (tagPlayer, playerImage, podPicture)
+        return (tagPlayer, playerImage, podPicture, sprite)
 
     def createGraphicalOpponent(self, playerX, playerY):
         """Crée un adversaire à une position spécifique.
@@ -231,17 +447,17 @@ class GraphicalApp(tk.Frame):
             playerY -- La coordonnée Y de l'adversaire.
         
         Returns:
-            tuple -- Un tuple contenant le tag de l'adversaire dans le canvas et ses images.
+            tuple -- Un tuple contenant le tag de l'adversaire dans le canvas, ses images et le chemin de son sprite.
         """
         convertedPos = self.convertPosition(playerX, playerY)
-        opponentImage = Image.open('images/pod2_sprite_50.png')
-        podPicture = ImageTk.PhotoImage(opponentImage)
+        sprite = 'images/pod2_sprite_50.png'
+        opponentImage = self.assets.getImage(sprite)
+        podPicture = self.assets.getPhotoImage(sprite)
         
-        self.canvasLock.acquire()
-        tagOpponent = self.canvas.create_image(convertedPos[0], convertedPos[1], image=podPicture)
-        self.canvasLock.release()
+        tagOpponent = self.newTag()
+        self.createImage(tagOpponent, convertedPos[0], convertedPos[1], podPicture)
 
-        return (tagOpponent, opponentImage, podPicture)
+        return (tagOpponent, opponentImage, podPicture, sprite)
 
     def createGraphicalObstacle(self, obstacleX, obstacleY):
         """Crée un obstacle à une position spécifique.
@@ -254,12 +470,10 @@ class GraphicalApp(tk.Frame):
             tuple -- Un tuple contenant le tag de l'obstacle dans le canvas et sa photoImage.
         """
         convertedPos = self.convertPosition(obstacleX, obstacleY)
-        obstacleImage = Image.open('images/obstacles/asteroid_sprite_55.png')
-        obstaclePicture = ImageTk.PhotoImage(obstacleImage)
+        obstaclePicture = self.assets.getPhotoImage('images/obstacles/asteroid_sprite_55.png')
         
-        self.canvasLock.acquire()
-        tagOpponent = self.canvas.create_image(convertedPos[0], convertedPos[1], image=obstaclePicture)
-        self.canvasLock.release()
+        tagOpponent = self.newTag()
+        self.createImage(tagOpponent, convertedPos[0], convertedPos[1], obstaclePicture)
 
         return (tagOpponent, obstaclePicture)
 
@@ -285,36 +499,60 @@ class GraphicalApp(tk.Frame):
                 msg = "Connection to the server failed.\nMake sure the server is running."
                 messagebox.showerror(title="Connection failed", message=msg)
 
+    def onSnapshotPublished(self, snapshot):
+        """La boucle d'affichage lit elle-même le dernier instantané : rien à faire ici.
+        
+        Arguments:
+            snapshot -- Le nouvel instantané.
+        """
+        pass
+
     def closeWindow(self):
         """Handler de la fermeture de la fenêtre.
            Signale au dispatcher que l'utilisateur souhaite quitter l'application et ferme l'interface.
         """
+        if self.postToTkThread(self.closeWindow):
+            return
+        # Aucun autre thread n'attend le thread de Tk : on peut attendre la fin des threads de communication
         self.dispatcher.onCloseWindow()
-        # Il se peut qu'un thread soit bloqué en attente d'une réponse du thread de l'interface
-        # En exécutant un update, on va le débloquer
-        self.master.update()
+        self.closed = True
+        print("[GraphicalApp] : render stats : " + str(self.getRenderStats()))
+        with self.chatLock:
+            histories = list(self.chatHistories.items())
+        for (name, history) in histories:
+            print("[GraphicalApp] : chat %s : %d received, %d rate limited, %d evicted, %d rows" % (
+                (name,) + history.getStats()))
+        if self.renderAfterId is not None:
+            self.master.after_cancel(self.renderAfterId)
+            self.renderAfterId = None
         self.master.destroy()
 
     def updateUIPlayer(self, player):
         """Met à jour la position et l'angle de rotation d'un joueur.
+            Ne modifie pas le joueur : peut recevoir un PlayerPod ou un PodSnapshot.
         
         Arguments:
             player -- Le joueur.
         """
-        self.canvasLock.acquire()
-        if player.getPseudo() not in self.previousAngles or self.previousAngles[player.getPseudo()] != player.getAngle():
+        if self.postToTkThread(self.updateUIPlayer, player):
+            return
+        if self.previousAngles.get(player.getCanvasTagId()) != player.getAngle():
             self.rotatePlayer(player)
         self.updatePlayer(player)
-        self.canvasLock.release()
 
     def updatePlayer(self, player):
-        """Met à jour la position d'un joueur.
+        """Met à jour la position d'un joueur, s'il s'est déplacé d'au moins un pixel.
         
         Arguments:
             player -- Le joueur.
         """
         convertedPos = self.convertPosition(player.getPositionX(), player.getPositionY())
-        self.canvas.coords(player.getCanvasTagId(), (convertedPos[0], convertedPos[1]))
+        pixel = (int(round(convertedPos[0])), int(round(convertedPos[1])))
+        if self.drawnPositions.get(player.getCanvasTagId()) == pixel:
+            return
+        self.drawnPositions[player.getCanvasTagId()] = pixel
+        self.tkCalls += 1
+        self.canvas.coords(player.getCanvasTagId(), pixel)
     
     def rotatePlayer(self, player):
         """Met à jour l'angle de rotation d'un joueur.
@@ -322,13 +560,15 @@ class GraphicalApp(tk.Frame):
         Arguments:
             player -- Le joueur.
         """
-        self.previousAngles[player.getPseudo()] = player.getAngle()
-        self.canvas.delete(player.getCanvasTagId())
-        podPicture = ImageTk.PhotoImage(player.getImage().rotate(player.getAngle()))
-        convertedPos = self.convertPosition(player.getPositionX(), player.getPositionY())
-        newId = self.canvas.create_image(convertedPos[0], convertedPos[1], image=podPicture)
-        player.setCanvasTagId(newId)
-        player.setPhotoImage(podPicture)
+        self.previousAngles[player.getCanvasTagId()] = player.getAngle()
+        # Les rotations sont rangées par chemin de sprite : tous les pods d'un même sprite les partagent,
+        # et la clé reste valable si le magasin des sprites est fermé puis reconstruit
+        podPicture = self.rotationCache.get(player.getSprite(), player.getImage(), player.getAngle())
+        # On change l'image sans recréer l'élément : son tag reste celui connu du dispatcher
+        self.tkCalls += 1
+        self.canvas.itemconfig(player.getCanvasTagId(), image=podPicture)
+        # Tk ne garde pas de référence sur l'image, elle serait sinon libérée si le cache l'oubliait
+        self.podPictures[player.getCanvasTagId()] = podPicture
 
     def convertPosition(self, x, y):
         """Convertie des coordonnées pour qu'elle soit utilisable par le canvas.
@@ -347,6 +587,8 @@ class GraphicalApp(tk.Frame):
 
     def showDeniedMessage(self):
         """Affiche un message indiquant à l'utilisateur que sa tentative de connexion à été refusée."""
+        if self.postToTkThread(self.showDeniedMessage):
+            return
         msg = "The server refused the connection.\nYou may try again with an other pseudo"
         messagebox.showerror(title="Connection refused", message=msg)
         self.statusLabel["text"] = "Pseudo already used..."
@@ -354,12 +596,16 @@ class GraphicalApp(tk.Frame):
 
     def showWaitingMessage(self):
         """Met à jour le label de status pour indiquer à l'utilisateur d'attendre le début de la partie."""
+        if self.postToTkThread(self.showWaitingMessage):
+            return
         print("Waiting")
         self.statusLabel["text"] = "Waiting for game to start..."
         self.progress.start(10)
 
     def showStartMessage(self):
         """Met à jour le label de status pour indiquer à l'utilisateur que la partie à commencé."""
+        if self.postToTkThread(self.showStartMessage):
+            return
         print("Good game")
         self.statusLabel["text"] = "Good game !"
         self.progress.stop()
@@ -371,6 +617,8 @@ class GraphicalApp(tk.Frame):
             winnerName  -- Le nom du gagnant.
             iWin  -- Indique si le gagnant est le joueur actuel.
         """
+        if self.postToTkThread(self.showWinner, winnerName, iWin):
+            return
         msg = ""
         if iWin:
             msg = "Congratulation you have won !"
@@ -390,30 +638,40 @@ class GraphicalApp(tk.Frame):
             tuple(idTag, photoImage) -- Un tuple contenant le tag de l'objectif et son image.
         """
         converted = self.convertPosition(objectifX, objectifY)
-        newImage = Image.open('images/dragon_ball/ball_'+str(objectifNumber)+".png")
-        newPhotoImage = ImageTk.PhotoImage(newImage)
+        newPhotoImage = self.assets.getPhotoImage('images/dragon_ball/ball_'+str(objectifNumber)+".png")
         
-        self.canvasLock.acquire()
-        tagImage = self.canvas.create_image(converted[0], converted[1], image=newPhotoImage)
-        self.canvasLock.release()
+        tagImage = self.newTag()
+        self.createImage(tagImage, converted[0], converted[1], newPhotoImage)
         
         return (tagImage, newPhotoImage)
 
     def reset(self):
         """Remet à zéro l'application graphique."""
+        if self.postToTkThread(self.reset):
+            return
         self.resetScores()
         for(name, chat) in self.chats.items():
             if name != "Public":
                 self.notebook.forget(chat[0])
         
-        self.chats = {}
-        
+        # Le chat public reste affiché d'une session à l'autre
+        self.chats = {"Public": self.chats["Public"]} if "Public" in self.chats else {}
+        # Vidé sur place : un message ajouté pendant la remise à zéro n'est pas perdu dans un ancien dictionnaire
+        with self.chatLock:
+            for name in [name for name in self.chatHistories if name != "Public"]:
+                del self.chatHistories[name]
+        self.drawnPods = {}
 
     def resetScores(self):
         """Remet à zéro le tableau des scores."""
+        if self.postToTkThread(self.resetScores):
+            return
         self.progress.stop()
-        for i in self.treeview.get_children():
-            self.treeview.delete(i)
+        if self.scoreRows:
+            self.treeview.delete(*self.scoreRows.values())
+        self.scoreRows = {}
+        self.scoreValues = {}
+        self.scoreOrder = []
     
     def removeOpponent(self, opponentName):
         """Supprime un adversaire dde l'interface graphique.
@@ -421,13 +679,14 @@ class GraphicalApp(tk.Frame):
         Arguments:
             opponentName -- Le nom de l'adversaire.
         """
-        for child in self.treeview.get_children():
-            item = self.treeview.item(child)
-            if (item["text"]) == opponentName:
-                self.treeview.delete(child)
+        if self.postToTkThread(self.removeOpponent, opponentName):
+            return
+        self.removeScore(opponentName)
 
         if opponentName in self.chats:
             del self.chats[opponentName]
+        with self.chatLock:
+            self.chatHistories.pop(opponentName, None)
 
     def deleteFromCanvas(self, tag):
         """Supprime un élément du canavas identifié par son tag.
@@ -435,4 +694,10 @@ class GraphicalApp(tk.Frame):
         Arguments:
             tag  -- Le tag de l'élément à supprimer.
         """
-        self.canvas.delete(tag)
\ No newline at end of file
+        if self.postToTkThread(self.deleteFromCanvas, tag):
+            return
+        self.tkCalls += 1
+        self.canvas.delete(tag)
+        self.previousAngles.pop(tag, None)
+        self.podPictures.pop(tag, None)
+        self.drawnPositions.pop(tag, None)
\ No newline at end of file
@@ -0,0 +1,75 @@
+# coding: utf-8
+
+"""Mesure le coût du décodage d'un TICK par joueur.
+Compare l'ancienne extraction par expression régulière avec le module communication.codec.
+
+Depuis le dossier src/client :
+    python3 -m benchmarks.codec_benchmark [nombre de joueurs...]
+"""
+import random
+import re as regexp
+import sys
+import timeit
+
+import communication.codec as codec
+
+# L'expression régulière utilisée auparavant par le Dispatcher
+OLD_PATTERN = "(-?[0-9]+\\.?[0-9]+E?-?[0-9]*)"
+
+
+def generateTick(nbPlayers, seed=0):
+    """Génère le contenu d'un TICK tel qu'envoyé par le serveur.
+
+    Arguments:
+        nbPlayers -- Le nombre de joueurs de la session.
+
+    Keyword Arguments:
+        seed -- La graine du générateur aléatoire. (default: {0})
+
+    Returns:
+        Le contenu du TICK.
+    """
+    rand = random.Random(seed)
+    players = []
+    for i in range(0, nbPlayers):
+        values = (rand.uniform(-400, 400), rand.uniform(-250, 250),
+                  rand.uniform(-5, 5), rand.choice([0.0, -2.5e-5, rand.uniform(-5, 5)]),
+                  rand.uniform(0, 6.283))
+        players.append("player" + str(i) + ":" + codec.formatVcoord(*values))
+    return "|".join(players)
+
+
+def parseWithRegexp(vcoords):
+    """Décode un TICK avec l'ancienne méthode."""
+    res = []
+    for p in vcoords.split("|"):
+        splitted = p.split(":")
+        extracted = regexp.findall(OLD_PATTERN, splitted[1])
+        res.append((splitted[0], float(extracted[0]), float(extracted[1]), float(extracted[2]),
+                    float(extracted[3]), float(extracted[4])))
+    return res
+
+
+def parseWithCodec(vcoords):
+    """Décode un TICK avec le module codec."""
+    return [(name,) + codec.parseVcoord(vcoord) for (name, vcoord) in codec.parseEntries(vcoords)]
+
+
+def main(argv):
+    counts = [int(arg) for arg in argv] if argv else [1, 4, 16, 64, 256]
+    print("%8s %16s %16s %8s" % ("players", "regexp (us/pl)", "codec (us/pl)", "speedup"))
+    for nbPlayers in counts:
+        tick = generateTick(nbPlayers)
+        # Les deux méthodes doivent donner le même résultat
+        assert parseWithRegexp(tick) == parseWithCodec(tick)
+
+        number = max(1, 20000 // nbPlayers)
+        oldTime = min(timeit.repeat(lambda: parseWithRegexp(tick), number=number, repeat=5))
+        newTime = min(timeit.repeat(lambda: parseWithCodec(tick), number=number, repeat=5))
+        oldPerPlayer = oldTime / (number * nbPlayers) * 1e6
+        newPerPlayer = newTime / (number * nbPlayers) * 1e6
+        print("%8d %16.3f %16.3f %7.1fx" % (nbPlayers, oldPerPlayer, newPerPlayer, oldPerPlayer / newPerPlayer))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
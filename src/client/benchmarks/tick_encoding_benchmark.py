@@ -0,0 +1,95 @@
+# coding: utf-8
+
+"""Compare les deux formes d'un TICK : le texte du protocole et la forme binaire (BTICK).
+Affiche, selon le nombre de joueurs, la taille d'un TICK, le temps de décodage par joueur
+et l'erreur maximale due à la quantification de la forme binaire.
+
+Depuis le dossier src/client :
+    python3 -m benchmarks.tick_encoding_benchmark [nombre de joueurs...]
+"""
+import random
+import sys
+import timeit
+
+import communication.codec as codec
+from communication.MessageDecoder import MessageDecoder
+
+
+def generateStates(nbPlayers, seed=0):
+    """Génère les états des joueurs d'un TICK.
+
+    Arguments:
+        nbPlayers -- Le nombre de joueurs de la session.
+
+    Keyword Arguments:
+        seed -- La graine du générateur aléatoire. (default: {0})
+
+    Returns:
+        Une liste de tuple(numéro, pseudo, x, y, vx, vy, angle), l'angle étant en radians.
+    """
+    rand = random.Random(seed)
+    states = []
+    for i in range(0, nbPlayers):
+        states.append((i + 1, "player" + str(i), rand.uniform(-400, 400), rand.uniform(-250, 250),
+                       rand.uniform(-5, 5), rand.uniform(-5, 5), rand.uniform(0, 6.283)))
+    return states
+
+
+def encodeText(states):
+    """Écrit le message TICK d'un ensemble d'états."""
+    vcoords = "|".join(pseudo + ":" + codec.formatVcoord(x, y, vx, vy, angle)
+                       for (_, pseudo, x, y, vx, vy, angle) in states)
+    return ("TICK/" + vcoords + "/").encode()
+
+
+def encodeBinary(states):
+    """Écrit le message BTICK d'un ensemble d'états."""
+    frame = codec.formatBinaryStates((playerId, x, y, vx, vy, angle) for (playerId, _, x, y, vx, vy, angle) in states)
+    return b"BTICK/" + str(len(frame)).encode() + b"/" + frame
+
+
+def decodeText(data):
+    """Découpe puis décode un message TICK, comme le client."""
+    decoder = MessageDecoder()
+    decoder.feed(data)
+    message = decoder.nextMessage()
+    return [(pseudo,) + codec.parseVcoord(vcoord) for (pseudo, vcoord) in codec.parseEntries(message[1])]
+
+
+def decodeBinary(data, pseudos):
+    """Découpe puis décode un message BTICK, comme le client."""
+    decoder = MessageDecoder()
+    decoder.feed(data)
+    message = decoder.nextMessage()
+    return codec.parseBinaryStates(message[1], pseudos)
+
+
+def main(argv):
+    counts = [int(arg) for arg in argv] if argv else [1, 4, 16, 64, 256]
+    print("%8s %12s %12s %14s %14s %8s %12s" % ("players", "text (B)", "binary (B)", "text (us/pl)",
+                                                 "binary (us/pl)", "speedup", "max error"))
+    for nbPlayers in counts:
+        states = generateStates(nbPlayers)
+        pseudos = {playerId: pseudo for (playerId, pseudo, _, _, _, _, _) in states}
+        text = encodeText(states)
+        binary = encodeBinary(states)
+
+        # La forme binaire perd un peu de précision, jamais plus d'un demi pas de quantification
+        textStates = decodeText(text)
+        binaryStates = decodeBinary(binary, pseudos)
+        assert [s[0] for s in textStates] == [s[0] for s in binaryStates]
+        maxError = max(abs(a - b) for (first, second) in zip(textStates, binaryStates)
+                       for (a, b) in zip(first[1:], second[1:]))
+
+        number = max(1, 20000 // nbPlayers)
+        textTime = min(timeit.repeat(lambda: decodeText(text), number=number, repeat=5))
+        binaryTime = min(timeit.repeat(lambda: decodeBinary(binary, pseudos), number=number, repeat=5))
+        textPerPlayer = textTime / (number * nbPlayers) * 1e6
+        binaryPerPlayer = binaryTime / (number * nbPlayers) * 1e6
+        print("%8d %12d %12d %14.3f %14.3f %7.1fx %12.2e" % (nbPlayers, len(text), len(binary), textPerPlayer,
+                                                              binaryPerPlayer, textPerPlayer / binaryPerPlayer,
+                                                              maxError))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1,16 +1,53 @@
 # coding: utf-8
 """Main de l'application cliente."""
+import argparse
 import signal
 import sys
 import json
 import data as dat
-from GraphicalApp import GraphicalApp
 from dispatcher.Dispatcher import Dispatcher
 from communication.ServerMessager import ServerMessager
+from communication.AsyncServerMessager import AsyncServerMessager
+
+parser = argparse.ArgumentParser(description="Client du jeu.")
+parser.add_argument("--host", default="localhost", help="le nom d'host du serveur")
+parser.add_argument("--port", type=int, default=1234, help="le numéro de port du serveur")
+parser.add_argument("--asyncio", action="store_true",
+                    help="gère les communications avec le serveur dans une boucle asyncio plutôt qu'avec des threads")
+parser.add_argument("--headless", action="store_true",
+                    help="exécute le client sans interface graphique (Tk, Pillow et écran inutiles)")
+parser.add_argument("--pseudo", default="headless", help="le pseudo utilisé en mode headless")
+parser.add_argument("--duration", type=float, default=None,
+                    help="en mode headless, la durée en secondes avant de quitter (par défaut jusqu'à CTRL-C)")
+parser.add_argument("--asset-pack", default=None,
+                    help="lit les sprites depuis ce pack de sprites décodés, construit s'il n'existe pas")
+parser.add_argument("--interp-delay", type=float, default=None,
+                    help="le retard d'affichage des adversaires en ms, interpolés entre deux TICK (0 pour les désactiver)")
+parser.add_argument("--max-extrapolation", type=float, default=None,
+                    help="la durée maximale d'extrapolation des adversaires en ms quand les TICK tardent")
+parser.add_argument("--no-prediction", action="store_true",
+                    help="n'annonce pas les numéros de séquence des commandes : chaque TICK remplace l'état du joueur")
+parser.add_argument("--binary-ticks", action="store_true",
+                    help="demande au serveur d'envoyer les TICK sous forme binaire, s'il le permet")
+parser.add_argument("--input-script", choices=("circle", "random"), default=None,
+                    help="en mode headless, joue selon ce script afin de mesurer la prédiction du joueur")
+parser.add_argument("--chat-history", type=int, default=None,
+                    help="le nombre maximum de messages affichés par chat, les plus anciens sont supprimés")
+parser.add_argument("--chat-rate", type=float, default=None,
+                    help="le nombre maximum de messages reçus affichés par seconde et par chat, les autres sont ignorés")
+args = parser.parse_args()
 
 dat.setUpData()
 
 disp = Dispatcher()
+if args.interp_delay is not None or args.max_extrapolation is not None:
+    delay = args.interp_delay / 1000 if args.interp_delay is not None else disp.interpolationDelay
+    maxExtrapolation = args.max_extrapolation / 1000 if args.max_extrapolation is not None else disp.maxExtrapolation
+    disp.setInterpolation(delay, maxExtrapolation)
+if args.no_prediction:
+    disp.setPrediction(False)
+if args.binary_ticks:
+    disp.setBinaryTicks(True)
 
 def signal_handler(signal, frame):
         disp.onExitClicked()
@@ -18,7 +55,27 @@ def signal_handler(signal, frame):
 # Ferme proprement l'application en cas de réception d'un signal CTRL-C
 signal.signal(signal.SIGINT, signal_handler)
 
-serverMessager = ServerMessager("localhost", 1234, disp)
+if args.asyncio:
+    serverMessager = AsyncServerMessager(args.host, args.port, disp)
+else:
+    serverMessager = ServerMessager(args.host, args.port, disp)
 disp.setServerMessager(serverMessager)
 
-gApp = GraphicalApp(disp)
+if args.headless:
+    from renderer.NullRenderer import NullRenderer
+    renderer = NullRenderer(disp)
+    if not disp.onConnectionClicked(args.pseudo):
+        sys.exit(1)
+    if args.input_script is not None:
+        from player.ScriptedInput import ScriptedInput
+        ScriptedInput(disp, args.input_script).start()
+    # Le délai est dépassé, on quitte la partie
+    if not renderer.waitForClose(args.duration):
+        renderer.closeWindow()
+    print("[client] : renderer calls : " + str(renderer.getCallCounts()))
+else:
+    from GraphicalApp import GraphicalApp
+    from renderer.AssetStore import AssetStore
+    from renderer.ChatHistory import ChatHistory
+    maxChatRows = args.chat_history if args.chat_history is not None else ChatHistory.DEFAULT_MAX_ROWS
+    gApp = GraphicalApp(disp, AssetStore(args.asset_pack), maxChatRows, args.chat_rate)
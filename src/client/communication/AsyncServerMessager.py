@@ -0,0 +1,298 @@
+# coding: utf-8
+
+import asyncio
+import socket
+import threading
+import traceback
+import data as dat
+from communication.MessageDecoder import MessageDecoder
+from communication.Protocol import Protocol
+from communication.OutboundQueue import OutboundQueue
+from communication.threads.TickScheduler import TickScheduler
+
+# La taille maximale lue en une fois sur la socket
+RECV_SIZE = 65536
+
+class AsyncServerMessager():
+    """Gère les communications avec le serveur à l'aide d'asyncio.
+        La lecture, l'envoi des commandes et la mise à jour des joueurs s'exécutent dans une unique boucle
+        d'événements, tournant dans son propre thread.
+        Les autres threads (dont celui de l'interface graphique) lui confient leurs actions sans jamais l'attendre,
+        exception faite de la connexion.
+        Propose les mêmes méthodes que le ServerMessager.
+    """
+    def __init__(self, host, port, dispatcher):
+        """Constructor.
+
+        Arguments:
+            host -- Le nom d'host du serveur.
+            port -- Le numéro de port du serveur.
+            dispatcher -- Le dispatcher de l'application.
+        """
+        self.host = host
+        self.port = port
+        self.dispatcher = dispatcher
+        self.loop = None
+        self.loopThread = None
+        self.reader = None
+        self.writer = None
+        self.readTask = None
+        self.updateTask = None
+        self.commandTask = None
+        self.outboundQueue = OutboundQueue()
+        self.flushScheduled = False
+        self.decoder = MessageDecoder()
+        self.protocol = Protocol(dispatcher, self.onDeniedReceived)
+        # Champ utilisé pour éviter de faire des affichages inutiles
+        self.displayNext = True
+
+    def connect(self, pseudo):
+        """Établie une connexion avec le serveur.
+            Bloque jusqu'à ce que la connexion soit établie ou ait échoué.
+
+        Arguments:
+            pseudo -- Le pseudo que l'utilisateur veut.
+
+        Returns:
+            True si la connection s'est bien déroulée, False sinon.
+        """
+        if self.loop is None:
+            self.loop = asyncio.new_event_loop()
+            self.loopThread = threading.Thread(target=self.runLoop, name="AsyncServerMessager")
+            self.loopThread.start()
+
+        print("[AsyncServerMessager] : Connection to the server...")
+        future = asyncio.run_coroutine_threadsafe(self.openConnection(), self.loop)
+        if not future.result():
+            print("[AsyncServerMessager] : Connection failed")
+            return False
+
+        print("[AsyncServerMessager] : Connection success")
+        self.sendMessage(Protocol.formatConnect(pseudo, self.dispatcher.getCapabilities()))
+        return True
+
+    def runLoop(self):
+        """Exécute la boucle d'événements jusqu'à son arrêt."""
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_forever()
+        finally:
+            self.loop.close()
+
+    def callInLoop(self, callback, *args):
+        """Exécute une fonction dans la boucle d'événements.
+            Elle est exécutée immédiatement si l'appel vient déjà de la boucle, planifiée sinon.
+
+        Arguments:
+            callback -- La fonction.
+            args -- Les arguments de la fonction.
+        """
+        if threading.current_thread() is self.loopThread:
+            callback(*args)
+        elif self.loop is not None and not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(callback, *args)
+
+    async def openConnection(self):
+        """Ouvre la connexion et lance la lecture des messages du serveur.
+
+        Returns:
+            True si la connection s'est bien déroulée, False sinon.
+        """
+        try:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        except OSError:
+            return False
+        # asyncio le fait déjà pour les sockets TCP, les messages regroupés ne doivent pas attendre Nagle
+        self.writer.get_extra_info("socket").setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.outboundQueue = OutboundQueue()
+        self.decoder.reset()
+        self.readTask = self.loop.create_task(self.readMessages())
+        return True
+
+    async def readMessages(self):
+        """Lit et traite les messages du serveur jusqu'à la fermeture de la connexion."""
+        print("[AsyncServerMessager]: start of reading")
+        while True:
+            if self.displayNext:
+                print("[AsyncServerMessager]: Wainting for a message from the server...")
+                self.displayNext = False
+            data = await self.reader.read(RECV_SIZE)
+            # Le serveur a fermé la socket
+            if not data:
+                break
+            self.decoder.feed(data)
+            messages = []
+            while self.decoder.hasMessage():
+                messages.append(self.decoder.nextMessage())
+            self.treatMessages(messages)
+        print("[AsyncServerMessager]: messages received :\n" + self.protocol.formatCounters())
+
+    def treatMessages(self, messages):
+        """Traite les messages reçus lors d'une lecture.
+            Seul le dernier TICK est traité, les autres messages sont tous traités dans leur ordre d'arrivée.
+
+        Arguments:
+            messages -- Les messages : des listes contenant la commande suivie de ses champs.
+        """
+        lastTick = None
+        for message in messages:
+            if message[0] in Protocol.TICK_COMMANDS:
+                lastTick = message
+        for message in messages:
+            if message[0] in Protocol.TICK_COMMANDS and message is not lastTick:
+                continue
+            # On affiche pas les TICK et ACK car on les reçoit beaucoup trop souvent
+            if message[0] not in Protocol.SILENT_COMMANDS:
+                print("Message received : " + str(message))
+                self.displayNext = True
+            try:
+                self.protocol.dispatch(message)
+            # Un message mal formé ne doit pas empêcher le traitement des suivants
+            except Exception:
+                traceback.print_exc()
+
+    def onDeniedReceived(self):
+        """Réagit au refus de la connexion par le serveur : la connexion est fermée."""
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+    def sendMessage(self, message):
+        """Envoi un message au serveur.
+            Peut être appelée depuis n'importe quel thread.
+
+        Arguments:
+            message -- Le message à envoyer.
+        """
+        self.outboundQueue.put(message)
+        self.callInLoop(self.scheduleFlush)
+
+    def writeMessage(self, message):
+        """Ajoute un message à la file d'envoi. Doit être appelée depuis la boucle d'événements.
+
+        Arguments:
+            message -- Le message à envoyer.
+        """
+        self.outboundQueue.put(message)
+        self.scheduleFlush()
+
+    def scheduleFlush(self):
+        """ Planifie l'écriture des messages en attente à la fin de l'itération courante de la boucle :
+            les messages ajoutés d'ici là partent avec un seul write.
+        """
+        if not self.flushScheduled:
+            self.flushScheduled = True
+            self.loop.call_soon(self.flushMessages)
+
+    def flushMessages(self):
+        """Écrit d'un seul coup dans la socket les messages en attente, la suite à l'itération suivante s'il en reste."""
+        self.flushScheduled = False
+        batch = self.outboundQueue.takeBatch(block=False)
+        if batch is not None and self.writer is not None:
+            self.writer.write(batch)
+        if self.outboundQueue.getDepth() > 0:
+            self.scheduleFlush()
+
+    def sendExitMessage(self, pseudo):
+        """Envoie au serveur le message indiquant que le joueur quitte la session.
+
+        Arguments:
+            pseudo -- Le pseudo du joueur.
+        """
+        message = "EXIT/" + str(pseudo) + "/"
+        self.sendMessage(message)
+
+    def closeConnection(self, playerPseudo):
+        """Ferme la connexion avec le serveur et arrête la boucle d'événements.
+            N'attend pas la fin de la boucle : elle peut être en attente du thread de l'interface graphique.
+
+        Arguments:
+            playerPseudo -- La pseudo du joueur.
+        """
+        if self.loop is not None and not self.loop.is_closed():
+            asyncio.run_coroutine_threadsafe(self.shutdown(playerPseudo), self.loop)
+
+    async def shutdown(self, playerPseudo):
+        """Arrête toutes les tâches, envoie le message EXIT puis arrête la boucle d'événements.
+
+        Arguments:
+            playerPseudo -- La pseudo du joueur.
+        """
+        self.stopUpdating()
+        if self.readTask is not None:
+            self.readTask.cancel()
+            self.readTask = None
+
+        # Toutes les tâches sont terminées, on envoie au serveur le message EXIT
+        if self.writer is not None:
+            self.writeMessage("EXIT/" + str(playerPseudo) + "/")
+            while self.outboundQueue.getDepth() > 0:
+                self.flushMessages()
+            print("[AsyncServerMessager]: writing " + self.outboundQueue.formatStats())
+            try:
+                await self.writer.drain()
+                self.writer.close()
+                await self.writer.wait_closed()
+            except OSError:
+                pass
+            self.writer = None
+        self.loop.stop()
+
+    def startUpdating(self):
+        """ Lance deux tâches gérant les mises à jour des données des joueurs.
+            La première mettant à jour régulièrement les positions du joueur et de ses adversaires,
+            Et la seconde envoyant régulièrement les commandes du joueur au serveur.
+        """
+        self.callInLoop(self.createUpdatingTasks)
+
+    def createUpdatingTasks(self):
+        """Crée les deux tâches de mise à jour. Doit être appelée depuis la boucle d'événements."""
+        self.updateTask = self.loop.create_task(self.updatePlayers())
+        self.commandTask = self.loop.create_task(self.sendCommands())
+
+    def finishUpdating(self):
+        """Interrompt les deux tâches créées par la methode "startUpdating(self)"."""
+        self.callInLoop(self.stopUpdating)
+
+    def stopUpdating(self):
+        """Annule les deux tâches de mise à jour. Doit être appelée depuis la boucle d'événements."""
+        if self.updateTask is not None:
+            self.updateTask.cancel()
+            self.updateTask = None
+        if self.commandTask is not None:
+            self.commandTask.cancel()
+            self.commandTask = None
+
+    async def updatePlayers(self):
+        """Met à jour les positions des différents joueurs tous les refresh_tickrate."""
+        print("[AsyncServerMessager]: start updating")
+        scheduler = TickScheduler(dat.REFRESH_TICRATE)
+        try:
+            while True:
+                # La physique avance d'autant de pas que le temps écoulé, même si la boucle a pris du retard
+                nbSteps = scheduler.takeSteps()
+                if nbSteps > 0:
+                    self.dispatcher.updateEveryPlayerPosition(nbSteps)
+                # Les touches sont lues juste avant l'envoi des commandes
+                inputPhase = self.dispatcher.tickPhaseLock.getInputPhase()
+                if inputPhase is not None:
+                    scheduler.align(inputPhase)
+                await asyncio.sleep(scheduler.nextDelay())
+        finally:
+            print("[AsyncServerMessager]: updating " + scheduler.formatStats())
+
+    async def sendCommands(self):
+        """Envoie les nouvelles commandes du joueur une fois par TICK, juste avant que le serveur ne les traite."""
+        print("[AsyncServerMessager]: start of sending")
+        scheduler = self.dispatcher.tickPhaseLock
+        try:
+            while True:
+                # Renvoie None tant que la session n'a pas créé le joueur, ou si la commande ne changerait rien
+                message = self.dispatcher.getPlayerCommandMessage()
+                if message is not None:
+                    # Gardée avant l'envoi : l'acquittement peut arriver avant le retour de l'envoi
+                    self.dispatcher.resetPlayerCommand()
+                    self.writeMessage(message)
+                await asyncio.sleep(scheduler.nextDelay())
+        finally:
+            print("[AsyncServerMessager]: sending " + scheduler.formatStats())
@@ -0,0 +1,127 @@
+# coding: utf-8
+
+from collections import deque
+from communication.Protocol import Protocol
+
+
+class MessageDecoder():
+    """Découpe le flux d'octets reçu du serveur en messages complets du protocole.
+        Le serveur ne sépare pas ses messages par une fin de ligne : chaque champ est terminé par un "/"
+        et le nombre de champs d'un message dépend de sa commande.
+        Les octets reçus sont accumulés dans un tampon et un message n'est rendu qu'une fois tous ses champs arrivés.
+        Le champ d'une commande binaire est précédé de sa taille et rendu tel quel (bytes).
+        Une commande binaire dont la taille n'est pas un entier positif est ignorée avec sa taille :
+        le décodage reprend juste après, plutôt que de buter indéfiniment sur les mêmes octets.
+    """
+
+    # Le nombre de champs qui suivent chaque commande envoyée par le serveur
+    FIELD_COUNTS = Protocol.FIELD_COUNTS
+    BINARY_COMMANDS = Protocol.BINARY_COMMANDS
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self.messages = deque()
+        self.nbMalformed = 0    # Le nombre de commandes binaires ignorées
+
+    def feed(self, data):
+        """Ajoute des octets reçus au tampon et en extrait les messages complets.
+
+        Arguments:
+            data -- Les octets reçus (bytes, bytearray ou memoryview).
+        """
+        self.buffer += data
+        self.decodeBuffer()
+
+    def hasMessage(self):
+        """Indique si un message complet est disponible.
+
+        Returns:
+            True si un message peut être récupéré, False sinon.
+        """
+        return len(self.messages) > 0
+
+    def nextMessage(self):
+        """Récupère le plus ancien message complet.
+
+        Returns:
+            Une liste contenant la commande suivie de ses champs, None s'il n'y a aucun message complet.
+        """
+        if self.messages:
+            return self.messages.popleft()
+        return None
+
+    def reset(self):
+        """Vide le tampon et les messages en attente."""
+        self.buffer.clear()
+        self.messages.clear()
+
+    def decodeBuffer(self):
+        """Extrait du tampon tous les messages complets. Les octets d'un message incomplet restent dans le tampon."""
+        buffer = self.buffer
+        length = len(buffer)
+        start = 0
+        while start < length:
+            # Des fins de ligne peuvent séparer deux messages, on les ignore
+            while start < length and buffer[start] in b"\r\n":
+                start += 1
+            end = buffer.find(b"/", start)
+            if end < 0:
+                break
+            command = buffer[start:end].decode(errors="replace")
+            if command in self.BINARY_COMMANDS:
+                pos = self.decodeBinary(command, end + 1)
+                # Le message n'est pas encore entièrement arrivé
+                if pos < 0:
+                    break
+                start = pos
+                continue
+            # Une commande inconnue est rendue seule, c'est au lecteur de l'ignorer
+            nbFields = self.FIELD_COUNTS.get(command, 0)
+
+            spans = []
+            pos = end + 1
+            while len(spans) < nbFields:
+                end = buffer.find(b"/", pos)
+                if end < 0:
+                    break
+                spans.append((pos, end))
+                pos = end + 1
+            # Le message n'est pas encore entièrement arrivé
+            if len(spans) < nbFields:
+                break
+
+            message = [command]
+            for (fieldStart, fieldEnd) in spans:
+                message.append(buffer[fieldStart:fieldEnd].decode(errors="replace"))
+            self.messages.append(message)
+            start = pos
+
+        # On ne garde que les octets qui n'ont pas encore été traités
+        if start > 0:
+            del buffer[:start]
+
+    def decodeBinary(self, command, pos):
+        """Extrait du tampon un message binaire de la forme "<commande>/<taille>/<octets>".
+
+        Arguments:
+            command -- La commande, déjà lue.
+            pos -- La position du champ donnant la taille.
+
+        Returns:
+            La position qui suit le message, ou le champ de la taille s'il est invalide,
+            -1 si le message n'est pas encore entièrement arrivé.
+        """
+        buffer = self.buffer
+        end = buffer.find(b"/", pos)
+        if end < 0:
+            return -1
+        sizeField = bytes(buffer[pos:end])
+        if not sizeField.isdigit():
+            self.nbMalformed += 1
+            print("[MessageDecoder] : malformed " + command + " size " + repr(sizeField) + ", skipped")
+            return end + 1
+        size = int(sizeField)
+        if end + 1 + size > len(buffer):
+            return -1
+        self.messages.append([command, bytes(buffer[end + 1:end + 1 + size])])
+        return end + 1 + size
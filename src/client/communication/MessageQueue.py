@@ -0,0 +1,97 @@
+# coding: utf-8
+
+from collections import deque
+from threading import Condition
+from communication.Protocol import Protocol
+
+
+class MessageQueue():
+    """File bornée des messages reçus du serveur, en attente de traitement.
+        Seul le dernier TICK compte : un TICK pas encore traité est abandonné au profit du plus récent.
+        Les autres messages ne sont jamais abandonnés et gardent leur ordre d'arrivée.
+    """
+
+    def __init__(self, maxSize=256):
+        """Constructeur.
+
+        Keyword Arguments:
+            maxSize -- Le nombre maximum de messages en attente, au-delà l'ajout est bloquant. (default: {256})
+        """
+        self.condition = Condition()
+        # Chaque entrée est une liste [message] afin de pouvoir annuler un TICK déjà placé dans la file
+        self.entries = deque()
+        self.size = 0
+        self.maxSize = maxSize
+        self.pendingTick = None
+        self.droppedTicks = 0
+        self.closed = False
+
+    def put(self, message):
+        """Ajoute un message à la file. Bloque tant que la file est pleine.
+
+        Arguments:
+            message -- Le message : une liste contenant la commande suivie de ses champs.
+        """
+        with self.condition:
+            isTick = message[0] in Protocol.TICK_COMMANDS
+            if isTick and self.pendingTick is not None:
+                # L'ancien TICK n'a pas encore été traité, il est désormais obsolète
+                self.pendingTick[0] = None
+                self.size -= 1
+                self.droppedTicks += 1
+            else:
+                while self.size >= self.maxSize and not self.closed:
+                    self.condition.wait()
+            if self.closed:
+                return
+
+            entry = [message]
+            if isTick:
+                self.pendingTick = entry
+            self.entries.append(entry)
+            self.size += 1
+            self.condition.notify_all()
+
+    def get(self):
+        """Récupère le plus ancien message de la file. Bloque tant que la file est vide.
+
+        Returns:
+            Le message, None si la file a été fermée et qu'il ne reste plus de message.
+        """
+        with self.condition:
+            while True:
+                while not self.entries and not self.closed:
+                    self.condition.wait()
+                if not self.entries:
+                    return None
+                entry = self.entries.popleft()
+                # Un TICK remplacé par un plus récent
+                if entry[0] is None:
+                    continue
+                if entry is self.pendingTick:
+                    self.pendingTick = None
+                self.size -= 1
+                self.condition.notify_all()
+                return entry[0]
+
+    def close(self, discardPending=False):
+        """Ferme la file et réveille les threads en attente.
+
+        Keyword Arguments:
+            discardPending -- Abandonne les messages qui n'ont pas encore été traités. (default: {False})
+        """
+        with self.condition:
+            self.closed = True
+            if discardPending:
+                self.entries.clear()
+                self.pendingTick = None
+                self.size = 0
+            self.condition.notify_all()
+
+    def getDroppedTicks(self):
+        """Getteur sur le nombre de TICK abandonnés au profit d'un plus récent.
+
+        Returns:
+            Le nombre de TICK abandonnés.
+        """
+        return self.droppedTicks
@@ -0,0 +1,103 @@
+# coding: utf-8
+
+from collections import deque
+from threading import Condition
+from communication.Protocol import Protocol
+
+
+class OutboundQueue():
+    """File des messages à envoyer au serveur, vidée par un unique écrivain.
+        Tous les messages en attente sont regroupés en un seul envoi à chaque réveil de l'écrivain.
+        Les commandes de Protocol.PRIORITY_COMMANDS passent devant les autres messages, notamment ceux du chat ;
+        les autres messages gardent leur ordre.
+    """
+
+    # Le nombre maximum d'octets des autres messages par envoi : un flot de messages du chat
+    # ne retarde pas d'un long sendall la commande du joueur suivante
+    MAX_NORMAL_BYTES = 16384
+
+    def __init__(self):
+        self.condition = Condition()
+        self.priority = deque()     # Les messages déjà encodés
+        self.normal = deque()
+        self.closed = False
+        self.maxDepth = 0
+        self.nbMessages = 0
+        self.nbBatches = 0
+        self.nbBytes = 0
+
+    def put(self, message):
+        """Ajoute un message à la file. Ne bloque jamais, peut être appelée depuis n'importe quel thread.
+
+        Arguments:
+            message -- Le message, sans fin de ligne.
+        """
+        data = (message + "\n").encode()
+        command = message.split("/", 1)[0]
+        with self.condition:
+            if self.closed:
+                return
+            if command in Protocol.PRIORITY_COMMANDS:
+                self.priority.append(data)
+            else:
+                self.normal.append(data)
+            self.maxDepth = max(self.maxDepth, len(self.priority) + len(self.normal))
+            self.condition.notify()
+
+    def takeBatch(self, block=True):
+        """Retire tous les messages en attente.
+
+        Keyword Arguments:
+            block -- Attendre qu'un message soit ajouté si la file est vide. (default: {True})
+
+        Returns:
+            Les messages mis bout à bout, None si la file est vide et fermée, ou vide et block vaut False.
+        """
+        with self.condition:
+            while block and not self.priority and not self.normal and not self.closed:
+                self.condition.wait()
+            if not self.priority and not self.normal:
+                return None
+            nbMessages = len(self.priority)
+            batch = b"".join(self.priority)
+            self.priority.clear()
+            parts = []
+            size = 0
+            while self.normal and (size == 0 or size + len(self.normal[0]) <= self.MAX_NORMAL_BYTES):
+                data = self.normal.popleft()
+                parts.append(data)
+                size += len(data)
+            nbMessages += len(parts)
+            batch += b"".join(parts)
+            self.nbMessages += nbMessages
+            self.nbBatches += 1
+            self.nbBytes += len(batch)
+            return batch
+
+    def close(self):
+        """Ferme la file : les messages déjà ajoutés sont encore rendus par takeBatch, les suivants sont ignorés."""
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+    def getDepth(self):
+        """Getteur sur le nombre de messages en attente."""
+        with self.condition:
+            return len(self.priority) + len(self.normal)
+
+    def getStats(self):
+        """Getteur sur les mesures de la file.
+
+        Returns:
+            tuple(nbMessages, nbBatches, bytesPerBatch, messagesPerBatch, maxDepth) -- Le nombre de messages
+            et d'envois, le nombre moyen d'octets et de messages par envoi et le plus grand nombre de messages en attente.
+        """
+        with self.condition:
+            if self.nbBatches == 0:
+                return (0, 0, 0.0, 0.0, self.maxDepth)
+            return (self.nbMessages, self.nbBatches, self.nbBytes / self.nbBatches,
+                    self.nbMessages / self.nbBatches, self.maxDepth)
+
+    def formatStats(self):
+        """Met en forme les mesures de la file."""
+        return "%d messages in %d writes, %.1f bytes/write, %.2f messages/write, max depth %d" % self.getStats()
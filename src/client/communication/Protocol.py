@@ -0,0 +1,194 @@
+# coding: utf-8
+
+from time import perf_counter
+
+
+class Protocol():
+    """Décrit les messages envoyés par le serveur et transmet leurs champs au dispatcher.
+        Chaque commande est déclarée une seule fois avec son nombre de champs et son handler.
+        Le nombre de messages reçus et le temps passé à les traiter sont comptés par commande.
+    """
+
+    # commande -> (nombre de champs, nom du handler)
+    COMMANDS = {
+        "WELCOME": (4, "onWelcome"),
+        "DENIED": (0, "onDenied"),
+        "NEWPLAYER": (1, "onNewPlayer"),
+        "PLAYERLEFT": (1, "onPlayerLeft"),
+        "SESSION": (3, "onSession"),
+        "WINNER": (1, "onWinner"),
+        "TICK": (1, "onTick"),
+        "NEWOBJ": (2, "onNewObjectif"),
+        "RECEPTION": (1, "onReception"),
+        "PRECEPTION": (2, "onPrivateReception"),
+        # Extension facultative : envoyé seulement aux clients ayant annoncé CAPABILITY_SEQ
+        "ACK": (1, "onAck"),
+        # Extension facultative : envoyés seulement aux clients ayant annoncé CAPABILITY_BINARY_TICK
+        "IDS": (1, "onPlayerIds"),
+        "BTICK": (1, "onBinaryTick")
+    }
+
+    # Les commandes dont l'unique champ est binaire : BTICK/<taille>/<octets>, sans "/" final
+    BINARY_COMMANDS = ("BTICK",)
+
+    # Capacité annoncée avec CONNECT : les commandes portent un numéro de séquence (NEWCOM/commande/SEQ/numéro/)
+    # et le serveur indique par ACK/numéro/ la dernière commande traitée avant chaque TICK.
+    # Le serveur Java ignore les champs qu'il ne connaît pas et n'envoie jamais ACK.
+    CAPABILITY_SEQ = "SEQ"
+    # Capacité annoncée avec CONNECT : le serveur envoie BTICK au lieu de TICK (voir codec.formatBinaryStates),
+    # les joueurs y étant identifiés par les numéros envoyés avec IDS/pseudo:numéro|.../
+    CAPABILITY_BINARY_TICK = "BIN"
+
+    # Les commandes portant les états des joueurs : seul le plus récent compte
+    TICK_COMMANDS = ("TICK", "BTICK")
+    # Les commandes reçues à chaque TICK, trop fréquentes pour être affichées
+    SILENT_COMMANDS = ("TICK", "BTICK", "ACK")
+    # Les commandes envoyées au serveur avant les autres messages en attente, notamment ceux du chat
+    PRIORITY_COMMANDS = ("NEWCOM",)
+
+    # commande -> nombre de champs, utilisé pour découper le flux reçu
+    FIELD_COUNTS = {command: nbFields for (command, (nbFields, _)) in COMMANDS.items()}
+
+    def __init__(self, dispatcher, deniedListener=None):
+        """Constructeur.
+
+        Arguments:
+            dispatcher -- Le dispatcher de l'application.
+
+        Keyword Arguments:
+            deniedListener -- Fonction appelée lorsque le serveur refuse la connexion. (default: {None})
+        """
+        self.dispatcher = dispatcher
+        self.deniedListener = deniedListener
+        self.handlers = {}
+        # commande -> [nombre de messages, temps de traitement cumulé en secondes]
+        self.counters = {}
+        for (command, (nbFields, handlerName)) in self.COMMANDS.items():
+            self.handlers[command] = (nbFields, getattr(self, handlerName))
+            self.counters[command] = [0, 0.0]
+        self.unknownCount = 0
+
+    def dispatch(self, message):
+        """Transmet un message au handler de sa commande.
+
+        Arguments:
+            message -- Le message : une liste contenant la commande suivie de ses champs.
+
+        Returns:
+            True si la commande est connue, False sinon.
+
+        Raises:
+            ValueError -- Si le message n'a pas le nombre de champs de sa commande.
+        """
+        entry = self.handlers.get(message[0])
+        if entry is None:
+            self.unknownCount += 1
+            return False
+        nbFields, handler = entry
+        if len(message) != nbFields + 1:
+            raise ValueError("Wrong number of fields for " + message[0] + " : " + str(message))
+
+        start = perf_counter()
+        handler(*message[1:])
+        counter = self.counters[message[0]]
+        counter[0] += 1
+        counter[1] += perf_counter() - start
+        return True
+
+    @staticmethod
+    def formatConnect(pseudo, capabilities=()):
+        """Met en forme le message de connexion.
+
+        Arguments:
+            pseudo -- Le pseudo demandé.
+
+        Keyword Arguments:
+            capabilities -- Les extensions du protocole gérées par le client. (default: {()})
+
+        Returns:
+            Le message CONNECT/pseudo/capacités.../
+        """
+        return "CONNECT/" + pseudo + "/" + "".join(capability + "/" for capability in capabilities)
+
+    def getCounters(self):
+        """Getteur sur les compteurs de messages.
+
+        Returns:
+            Un dictionnaire commande -> tuple(nombre de messages, temps de traitement cumulé en secondes).
+        """
+        return {command: (counter[0], counter[1]) for (command, counter) in self.counters.items()}
+
+    def formatCounters(self):
+        """Met en forme les compteurs des commandes reçues au moins une fois.
+
+        Returns:
+            Une ligne par commande : nombre de messages, temps total et temps moyen de traitement.
+        """
+        lines = []
+        for (command, (count, total)) in sorted(self.getCounters().items(), key=lambda item: -item[1][1]):
+            if count > 0:
+                lines.append("%-10s %8d msg %10.3f ms %8.3f ms/msg" % (command, count, total * 1000, total * 1000 / count))
+        if self.unknownCount > 0:
+            lines.append("%-10s %8d msg" % ("unknown", self.unknownCount))
+        return "\n".join(lines)
+
+    def onWelcome(self, phase, scores, objectif, bombs):
+        """Handler du message WELCOME/phase/scores/objectif/bombes/"""
+        # Les obstacles seront envoyés avec le message SESSION
+        self.dispatcher.onStatusReceived(phase)
+        self.dispatcher.onScoresReceived(scores)
+
+    def onDenied(self):
+        """Handler du message DENIED/"""
+        if self.deniedListener is not None:
+            self.deniedListener()
+        self.dispatcher.showDeniedMessage()
+
+    def onNewPlayer(self, pseudo):
+        """Handler du message NEWPLAYER/pseudo/"""
+        self.dispatcher.onNewPlayerReceived(pseudo)
+
+    def onPlayerLeft(self, pseudo):
+        """Handler du message PLAYERLEFT/pseudo/"""
+        self.dispatcher.onPlayerLeftReceived(pseudo)
+
+    def onSession(self, coords, objectif, obstacles):
+        """Handler du message SESSION/coords/objectif/obstacles/"""
+        self.dispatcher.onSessionReceived(coords, objectif)
+        self.dispatcher.onObstaclesReceived(obstacles)
+
+    def onWinner(self, scores):
+        """Handler du message WINNER/scores/"""
+        self.dispatcher.onWinnerReceived(scores)
+
+    def onTick(self, vcoords):
+        """Handler du message TICK/vcoords/"""
+        # Il se peut que l'on reçoive un TICK avant de recevoir un message de type WELCOME
+        if self.dispatcher.player is not None:
+            self.dispatcher.onTickReceived(vcoords)
+
+    def onAck(self, seq):
+        """Handler du message ACK/numéro/"""
+        self.dispatcher.onAckReceived(int(seq))
+
+    def onPlayerIds(self, ids):
+        """Handler du message IDS/pseudo:numéro|.../"""
+        self.dispatcher.onPlayerIdsReceived(ids)
+
+    def onBinaryTick(self, payload):
+        """Handler du message BTICK/taille/octets"""
+        if self.dispatcher.player is not None:
+            self.dispatcher.onBinaryTickReceived(payload)
+
+    def onNewObjectif(self, objectif, scores):
+        """Handler du message NEWOBJ/objectif/scores/"""
+        self.dispatcher.onObjectifReceived(objectif)
+        self.dispatcher.onScoresReceived(scores)
+
+    def onReception(self, message):
+        """Handler du message RECEPTION/message/"""
+        self.dispatcher.onPublicMessageReceived(message)
+
+    def onPrivateReception(self, message, src):
+        """Handler du message PRECEPTION/message/source/"""
+        self.dispatcher.onPrivateMessageReceived(src, message)
@@ -4,6 +4,15 @@ import socket
 from communication.threads.ServerReaderThread import ServerReaderThread
 from communication.threads.UpdatePlayerThread import  UpdatePlayerThread
 from communication.threads.CommandSenderThread import CommandSenderThread
+from communication.threads.SocketWriterThread import SocketWriterThread
+from communication.MessageDecoder import MessageDecoder
+from communication.OutboundQueue import OutboundQueue
+from communication.Protocol import Protocol
+
+# La taille maximale lue en une fois sur la socket
+RECV_SIZE = 65536
+# Le temps laissé au thread d'écriture pour envoyer les messages en attente à la fermeture, en secondes
+WRITER_JOIN_TIMEOUT = 2.0
 
 class ServerMessager():
     """Gère les communications avec le serveur."""
@@ -21,7 +30,13 @@ class ServerMessager():
         self.serverReaderThread = None
         self.updatePlayerThread = None
         self.commandSenderThread = None
+        self.socketWriterThread = None
+        self.outboundQueue = None
         self.dispatcher = dispatcher
+        self.decoder = MessageDecoder()
+        # Tampon de réception réutilisé à chaque lecture
+        self.readBuffer = bytearray(RECV_SIZE)
+        self.readView = memoryview(self.readBuffer)
 
     def connect(self, pseudo):
         """Établie une connexion avec le serveur.
@@ -32,10 +47,15 @@ class ServerMessager():
         Returns:
             True si la connection s'est bien déroulée, False sinon.
         """
+        # Une connexion refusée a pu laisser son thread d'écriture
+        self.stopWriting()
         self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         # On place un timeout afin de ne pas bloquer la lecture
         # Cela permet au thread lecteur de vérifier régulièrement s'il doit se terminer
         self.sock.settimeout(0.5)
+        # Les messages sont petits et déjà regroupés par le thread d'écriture : Nagle ne ferait que les retarder
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.decoder.reset()
         print("[ServerMessager] : Connection to the server...")
         try:
             self.sock.connect((self.host, self.port))
@@ -44,44 +64,68 @@ class ServerMessager():
             return False
 
         print("[ServerMessager] : Connection success")
+        self.outboundQueue = OutboundQueue()
+        self.socketWriterThread = SocketWriterThread(self.sock, self.outboundQueue)
+        self.socketWriterThread.start()
         self.serverReaderThread = ServerReaderThread(self, self.dispatcher)
         self.serverReaderThread.start()
 
-        connectMsg = "CONNECT/"+pseudo+"/"
+        connectMsg = Protocol.formatConnect(pseudo, self.dispatcher.getCapabilities())
         self.sendMessage(connectMsg)
 
         return True
 
     def sendMessage(self, message):
         """Envoi un message au serveur.
+            Ne fait qu'ajouter le message à la file du thread d'écriture : peut être appelée depuis n'importe quel thread
+            et ne bloque jamais.
         
         Arguments:
             message -- Le message à envoyer.
         """
-        if self.sock is not None:
-            message += "\n"
-            # On ne peut qu'envoyer des tableau de byte, il faut donc encoder le message
-            self.sock.send(message.encode())
+        if self.outboundQueue is not None:
+            self.outboundQueue.put(message)
+
+    def stopWriting(self):
+        """ Envoie les messages en attente puis attend la fin du thread d'écriture.
+            Si le serveur ne lit plus, la socket est fermée pour débloquer le thread.
+        """
+        if self.socketWriterThread is None:
+            return
+        print("Waiting for SocketWriterThread to finish...", end="", flush=True)
+        self.socketWriterThread.stop()
+        self.socketWriterThread.join(WRITER_JOIN_TIMEOUT)
+        if self.socketWriterThread.is_alive():
+            print("stuck, shutting the socket down...", end="", flush=True)
+            try:
+                self.socketWriterThread.sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self.socketWriterThread.join()
+        print("done (" + self.outboundQueue.formatStats() + ", %d send timeouts)" % self.socketWriterThread.nbTimeouts)
+        self.socketWriterThread = None
+        self.outboundQueue = None
     
     def readMessage(self):
-        """Lit un message.
+        """Lit un message complet.
+            Les octets reçus sont accumulés par le décodeur tant qu'aucun message n'est complet.
         
         Returns:
-            Un message envoyé par le serveur.
+            Une liste contenant la commande du message suivie de ses champs,
+            None si la connexion est fermée, "Timeout-exception" si le timeout a été dépassé.
         """
-        if self.sock is not None:
+        if self.sock is None:
+            return None
+        while not self.decoder.hasMessage():
             try:
-                message = self.sock.recv(1024)
-                if not message:
-                    return None
-                else:
-                    # Décode le message (tableau de byte --> string)
-                    return message.decode()
+                nbBytes = self.sock.recv_into(self.readBuffer)
             # On a dépassé le timeout
             except socket.timeout:
                 return "Timeout-exception"
-        else:
-            return None
+            if nbBytes == 0:
+                return None
+            self.decoder.feed(self.readView[:nbBytes])
+        return self.decoder.nextMessage()
 
     def sendExitMessage(self, pseudo):
         """Envoie au serveur le message indiquant que le joueur quitte la session.
@@ -113,14 +157,15 @@ class ServerMessager():
         if self.updatePlayerThread is not None:
             print("Waiting for UpdatePlayerThread to finish...", end="", flush=True)
             self.updatePlayerThread.join()
-            print("done")
+            print("done (" + self.updatePlayerThread.scheduler.formatStats() + ")")
         if self.commandSenderThread is not None:
             print("Waiting for CommandSenderThread to finish...", end="", flush=True)
             self.commandSenderThread.join()
-            print("done")
+            print("done (" + self.commandSenderThread.scheduler.formatStats() + ")")
 
         # Tous les thread sont terminés, on envoie au serveur le message EXIT
         self.sendExitMessage(playerPseudo)
+        self.stopWriting()
         if self.sock is not None:
             self.sock.close()
 
@@ -143,10 +188,10 @@ class ServerMessager():
 
         print("Waiting for UpdatePlayerThread to finish...", end="", flush=True)
         self.updatePlayerThread.join()
+        print("done (" + self.updatePlayerThread.scheduler.formatStats() + ")")
         self.updatePlayerThread = None
-        print("done")
         
         print("Waiting for CommandSenderThread to finish...", end="", flush=True)
         self.commandSenderThread.join()
-        self.commandSenderThread = None
-        print("done")
\ No newline at end of file
+        print("done (" + self.commandSenderThread.scheduler.formatStats() + ")")
+        self.commandSenderThread = None
\ No newline at end of file
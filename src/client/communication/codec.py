@@ -0,0 +1,188 @@
+# coding: utf-8
+
+"""Décodage (et encodage) des coordonnées échangées avec le serveur.
+
+Le serveur écrit ses nombres avec Float.toString de Java ("12.5", "-3.0E-4", "NaN"...) :
+    - une coordonnée a la forme "X<x>Y<y>",
+    - un vecteur a la forme "X<x>Y<y>VX<vx>VY<vy>T<angle>", l'angle étant en radians.
+Les lettres servant de séparateurs n'apparaissent jamais dans un nombre : une expression régulière compilée
+une seule fois découpe le texte en un appel, puis float() valide et convertit chaque nombre.
+
+Les TICK peuvent aussi être envoyés sous forme binaire (voir Protocol.CAPABILITY_BINARY_TICK) :
+un enregistrement de taille fixe par joueur, identifié par un numéro attribué à la session,
+les valeurs étant des entiers à virgule fixe.
+"""
+import re as regexp
+import struct
+from math import pi
+
+COORD_PATTERN = regexp.compile("X([^Y]+)Y(.+)\\Z")
+VCOORD_PATTERN = regexp.compile("X([^Y]+)Y([^V]+)VX([^V]+)VY([^T]+)T(.+)\\Z")
+
+# Un joueur d'un TICK binaire : numéro, x, y, vx, vy, angle
+BINARY_STATE = struct.Struct("<HiihhH")
+# Les pas de quantification : 1/1024 de pixel, 1/256 de pixel par image et 1/65536 de tour
+POSITION_SCALE = 1024
+VECTOR_SCALE = 256
+ANGLE_SCALE = 65536 / (2 * pi)
+
+
+def parseCoord(coord):
+    """Décode une coordonnée de la forme "X<x>Y<y>".
+
+    Arguments:
+        coord -- La coordonnée envoyée par le serveur.
+
+    Returns:
+        tuple(x, y) -- Les valeurs de la coordonnée.
+
+    Raises:
+        ValueError -- Si la coordonnée n'a pas le format attendu.
+    """
+    match = COORD_PATTERN.match(coord)
+    if match is None:
+        raise ValueError("Invalid coordinate : " + coord)
+    x, y = match.groups()
+    return (float(x), float(y))
+
+
+def parseVcoord(vcoord):
+    """Décode une position, un vecteur et un angle de la forme "X<x>Y<y>VX<vx>VY<vy>T<angle>".
+
+    Arguments:
+        vcoord -- Les informations envoyées par le serveur.
+
+    Returns:
+        tuple(x, y, vx, vy, angle) -- Les valeurs décodées, l'angle est en radians.
+
+    Raises:
+        ValueError -- Si les informations n'ont pas le format attendu.
+    """
+    match = VCOORD_PATTERN.match(vcoord)
+    if match is None:
+        raise ValueError("Invalid vcoord : " + vcoord)
+    x, y, vx, vy, angle = match.groups()
+    return (float(x), float(y), float(vx), float(vy), float(angle))
+
+
+def parseEntries(payload):
+    """Découpe une liste de la forme "nom1:valeur1|nom2:valeur2".
+        Les entrées vides sont ignorées.
+
+    Arguments:
+        payload -- La liste envoyée par le serveur.
+
+    Returns:
+        Une liste de tuple(nom, valeur).
+    """
+    entries = []
+    for entry in payload.split("|"):
+        if entry != "":
+            # Une valeur ne contient jamais de ":", contrairement à un pseudo
+            name, _, value = entry.rpartition(":")
+            entries.append((name, value))
+    return entries
+
+
+def formatFloat(value):
+    """Écrit un nombre comme le ferait Float.toString de Java.
+
+    Arguments:
+        value -- Le nombre.
+
+    Returns:
+        La représentation textuelle du nombre ("12.5", "-3.0E-4"...).
+    """
+    value = float(value)
+    if value != 0 and (abs(value) < 1e-3 or abs(value) >= 1e7):
+        mantissa, exponent = ("%E" % value).split("E")
+        mantissa = mantissa.rstrip("0")
+        if mantissa.endswith("."):
+            mantissa += "0"
+        return mantissa + "E" + str(int(exponent))
+    return repr(value)
+
+
+def formatCoord(x, y):
+    """Écrit une coordonnée de la forme "X<x>Y<y>".
+
+    Arguments:
+        x -- La coordonnée X.
+        y -- La coordonnée Y.
+
+    Returns:
+        La coordonnée conforme au protocole.
+    """
+    return "X" + formatFloat(x) + "Y" + formatFloat(y)
+
+
+def formatVcoord(x, y, vx, vy, angle):
+    """Écrit une position, un vecteur et un angle de la forme "X<x>Y<y>VX<vx>VY<vy>T<angle>".
+
+    Arguments:
+        x -- La coordonnée X.
+        y -- La coordonnée Y.
+        vx -- Le vecteur X.
+        vy -- Le vecteur Y.
+        angle -- L'angle en radians.
+
+    Returns:
+        Les informations conformes au protocole.
+    """
+    return formatCoord(x, y) + "VX" + formatFloat(vx) + "VY" + formatFloat(vy) + "T" + formatFloat(angle)
+
+
+def quantize(value, scale, bound):
+    """Convertit un nombre en entier à virgule fixe, borné pour tenir dans son champ.
+
+    Arguments:
+        value -- Le nombre.
+        scale -- Le nombre de pas par unité.
+        bound -- La valeur absolue maximale de l'entier.
+
+    Returns:
+        L'entier.
+    """
+    return max(-bound, min(bound, round(value * scale)))
+
+
+def formatBinaryStates(states):
+    """Écrit les états des joueurs d'un TICK binaire.
+
+    Arguments:
+        states -- Les états : des tuples (numéro, x, y, vx, vy, angle), l'angle étant en radians.
+
+    Returns:
+        Les octets du TICK, BINARY_STATE.size par joueur.
+    """
+    pack = BINARY_STATE.pack
+    frame = []
+    for (playerId, x, y, vx, vy, angle) in states:
+        frame.append(pack(playerId, quantize(x, POSITION_SCALE, 0x7FFFFFFF), quantize(y, POSITION_SCALE, 0x7FFFFFFF),
+                          quantize(vx, VECTOR_SCALE, 0x7FFF), quantize(vy, VECTOR_SCALE, 0x7FFF),
+                          round((angle % (2 * pi)) * ANGLE_SCALE) & 0xFFFF))
+    return b"".join(frame)
+
+
+def parseBinaryStates(payload, pseudos):
+    """Décode les états des joueurs d'un TICK binaire.
+
+    Arguments:
+        payload -- Les octets du TICK.
+        pseudos -- Le dictionnaire numéro -> pseudo de la session. Les numéros inconnus sont ignorés.
+
+    Returns:
+        Une liste de tuple(pseudo, x, y, vx, vy, angle), l'angle étant en radians.
+
+    Raises:
+        ValueError -- Si la taille du TICK n'est pas un multiple de celle d'un joueur.
+    """
+    if len(payload) % BINARY_STATE.size != 0:
+        raise ValueError("Invalid binary TICK of " + str(len(payload)) + " bytes")
+    states = []
+    for (playerId, x, y, vx, vy, angle) in BINARY_STATE.iter_unpack(payload):
+        pseudo = pseudos.get(playerId)
+        if pseudo is not None:
+            states.append((pseudo, x / POSITION_SCALE, y / POSITION_SCALE, vx / VECTOR_SCALE, vy / VECTOR_SCALE,
+                           angle / ANGLE_SCALE))
+    return states
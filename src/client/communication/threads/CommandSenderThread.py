@@ -2,29 +2,30 @@
 
 import threading
 import socket
-import time
-import data as dat
 
 
 class CommandSenderThread(threading.Thread):
-    """Le thread qui enverra tous les server_tickrate les nouvelles commandes du joueur."""
+    """ Le thread qui enverra les nouvelles commandes du joueur une fois par TICK du serveur,
+        juste avant l'instant où le serveur les traite.
+    """
 
     def __init__(self, serverMessager, dispatcher):
         super().__init__()
         self.serverMessager = serverMessager
         self.dispatcher = dispatcher
+        self.scheduler = dispatcher.tickPhaseLock
         self.isInterrupted = False
 
     def run(self):
         print("[CommandSenderThread]: start of sending")
         while not self.isInterrupted:
-            # Peut renvoyer None si l'on a pas obtenu le verrou sur le joueur avant le timeout
-            # Évite un interblocage avec le thread graphique lors de la fermeture de l'application
-            command = self.dispatcher.getPlayerCommand()
-            if command is not None:
-                self.serverMessager.sendMessage("NEWCOM/" + command + "/")
+            # Renvoie None tant que la session n'a pas créé le joueur, ou si la commande ne changerait rien
+            message = self.dispatcher.getPlayerCommandMessage()
+            if message is not None:
+                # Gardée avant l'envoi : l'acquittement peut arriver avant le retour de l'envoi
                 self.dispatcher.resetPlayerCommand()
-                time.sleep(1 / dat.SERVER_TICRATE)
+                self.serverMessager.sendMessage(message)
+            self.scheduler.sleep()
 
     def stop(self):
         self.isInterrupted = True
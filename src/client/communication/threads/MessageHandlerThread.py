@@ -0,0 +1,32 @@
+# coding: utf-8
+
+import threading
+import traceback
+
+
+class MessageHandlerThread(threading.Thread):
+    """Le thread qui traitera, un par un et dans l'ordre, les messages reçus du serveur."""
+
+    def __init__(self, messageQueue, handler):
+        """Constructeur.
+
+        Arguments:
+            messageQueue -- La file des messages reçus.
+            handler -- La fonction appelée pour chaque message.
+        """
+        super().__init__()
+        self.messageQueue = messageQueue
+        self.handler = handler
+
+    def run(self):
+        print("[MessageHandlerThread]: start of handling")
+        while True:
+            message = self.messageQueue.get()
+            # La file a été fermée
+            if message is None:
+                break
+            try:
+                self.handler(message)
+            # Un message mal formé ne doit pas empêcher le traitement des suivants
+            except Exception:
+                traceback.print_exc()
@@ -3,6 +3,9 @@
 import threading
 import socket
 import time
+from communication.MessageQueue import MessageQueue
+from communication.Protocol import Protocol
+from communication.threads.MessageHandlerThread import MessageHandlerThread
 
 
 class ServerReaderThread(threading.Thread):
@@ -15,10 +18,14 @@ class ServerReaderThread(threading.Thread):
         self.isInterrupted = False
         # Champ utilisé pour éviter de faire des affichages inutiles
         self.displayNext = True
-        self.lock = threading.Lock()
+        self.protocol = Protocol(dispatcher, self.onDeniedReceived)
+        # Les messages sont traités un par un, dans l'ordre, par un unique thread
+        self.messageQueue = MessageQueue()
+        self.messageHandlerThread = MessageHandlerThread(self.messageQueue, self.treatMessage)
 
     def run(self):
         print("[ServerReaderThread]: start of reading")
+        self.messageHandlerThread.start()
         while not self.isInterrupted:
             if self.displayNext:
                 print("[ServerReaderThread]: Wainting for a message from the server...")
@@ -30,83 +37,35 @@ class ServerReaderThread(threading.Thread):
             else:
                 # La lecture à été interrompue par le timeout
                 if message != "Timeout-exception":
+                    # Le message est complet : le décodeur du serverMessager a déjà regroupé ses champs
                     # La tâche peut être très longue
-                    # On délègue donc son traitement à un autre thread
-                    threading.Thread(target=self.treatMessage, args=(message,)).start()
+                    # On délègue donc son traitement au thread de traitement des messages
+                    self.messageQueue.put(message)
+        # Les messages déjà reçus sont encore traités avant que le thread de traitement ne se termine
+        self.messageQueue.close()
+        print("[ServerReaderThread]: messages received :\n" + self.protocol.formatCounters())
 
     def treatMessage(self, message):
         """Traite un message reçu.
         
         Arguments:
-            message -- Le message reçu.
+            message -- Le message reçu : une liste contenant la commande suivie de ses champs.
         """
-        # On ne souhaite traiter qu'un seul message à la fois
-        self.lock.acquire()
-        splitted = message.split("/")
-
         # On affiche pas ce message car on le reçoit beaucoup trop souvent
-        if splitted[0] != "TICK":
-            print("Message received : " + str(splitted))
+        if message[0] not in Protocol.SILENT_COMMANDS:
+            print("Message received : " + str(message))
             self.displayNext = True
         else:
             self.displayNext = False
 
-        # Il se peut qu'on aie reçu plusieurs messages en un, donc on boucle afin traiter l'ensemble
-        # des messages si necessaire
-        for i in range(0, len(splitted)):
-            if splitted[i] == "WELCOME":
-                phase = splitted[i+1]
-                scores = splitted[i+2]
-                coord = splitted[i+3]
-                obstacles = splitted[i+4]
-                print(splitted)
-                self.dispatcher.onStatusReceived(phase)
-                self.dispatcher.onScoresReceived(scores)
-                self.dispatcher.onObstaclesReceived(obstacles)
-                i += 4
-            elif splitted[i] == "DENIED":
-                # Le thread doit se terminer
-                self.isInterrupted = True
-                self.dispatcher.showDeniedMessage()
-            elif splitted[i] == "NEWPLAYER":
-                self.dispatcher.onNewPlayerReceived(splitted[i+1])
-                i += 1
-            elif splitted[i] == "PLAYERLEFT":
-                self.dispatcher.onPlayerLeftReceived(splitted[i+1])
-                i += 1
-            elif splitted[i] == "SESSION":
-                coords = splitted[i+1]
-                coord = splitted[i+2]
-                obstacles = splitted[i+3]
-                self.dispatcher.onSessionReceived(coords, coord)
-                self.dispatcher.onObstaclesReceived(obstacles)
-                i += 3
-            elif splitted[i] == "WINNER":
-                self.dispatcher.onWinnerReceived(splitted[i+1])
-                i += 1
-            elif splitted[i] == "TICK":
-                # Il se peut que l'on reçoive un TICK avant de recevoir un message de type WELCOME
-                if self.dispatcher.player is not None:
-                    vcoords = splitted[i+1]
-                    self.dispatcher.onTickReceived(vcoords)
-                i += 1
-            elif splitted[i] == "NEWOBJ":
-                coord = splitted[i+1]
-                scores = splitted[i+2]
-                self.dispatcher.onObjectifReceived(coord)
-                self.dispatcher.onScoresReceived(scores)
-                i += 2
-            elif splitted[i] == "RECEPTION":
-                message = splitted[i+1]
-                self.dispatcher.onPublicMessageReceived(message)
-                i += 1
-            elif splitted[i] == "PRECEPTION":
-                message = splitted[i+1]
-                src = splitted[i+2]
-                self.dispatcher.onPrivateMessageReceived(src, message)
-                i += 2
-        
-        self.lock.release()
+        self.protocol.dispatch(message)
+
+    def onDeniedReceived(self):
+        """Réagit au refus de la connexion par le serveur."""
+        # Le thread doit se terminer
+        self.isInterrupted = True
 
     def stop(self):
         self.isInterrupted = True
+        # Inutile de traiter les messages restants, l'application se termine
+        self.messageQueue.close(discardPending=True)
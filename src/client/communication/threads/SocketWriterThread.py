@@ -0,0 +1,71 @@
+# coding: utf-8
+
+import socket
+import threading
+from time import perf_counter
+
+
+class SocketWriterThread(threading.Thread):
+    """ Le seul thread qui écrira dans la socket.
+        Chaque réveil envoie tous les messages de la file en un seul lot : les messages ne peuvent pas
+        s'entremêler et les envois partiels sont complétés.
+        La socket a un délai d'attente, réglé pour la lecture : un envoi qui l'atteint n'a rien envoyé
+        et est simplement recommencé, tant que le lot n'attend pas depuis plus de MAX_SEND_TIME secondes.
+        Au-delà, ou sur une vraie erreur de connexion, l'écriture s'arrête.
+    """
+
+    # La durée maximale de l'envoi d'un lot : un serveur qui ne lit plus ne bloque pas le client indéfiniment
+    MAX_SEND_TIME = 5.0
+
+    def __init__(self, sock, outboundQueue):
+        """Constructeur.
+
+        Arguments:
+            sock -- La socket connectée au serveur.
+            outboundQueue -- La file des messages à envoyer.
+        """
+        super().__init__()
+        self.sock = sock
+        self.outboundQueue = outboundQueue
+        self.nbTimeouts = 0
+
+    def run(self):
+        print("[SocketWriterThread]: start of writing")
+        while True:
+            batch = self.outboundQueue.takeBatch()
+            # La file a été fermée et vidée
+            if batch is None:
+                break
+            try:
+                self.sendBatch(batch)
+            except OSError as e:
+                # Une partie du lot a pu être envoyée : le flux n'est plus utilisable
+                print("[SocketWriterThread]: write failed : " + str(e))
+                self.outboundQueue.close()
+                break
+
+    def sendBatch(self, batch):
+        """Envoie un lot en entier, en recommençant les envois interrompus par le délai d'attente de la socket.
+
+        Arguments:
+            batch -- Les octets à envoyer.
+
+        Raises:
+            socket.timeout -- Le lot n'a pas pu être envoyé en MAX_SEND_TIME secondes.
+        """
+        view = memoryview(batch)
+        sent = 0
+        deadline = perf_counter() + SocketWriterThread.MAX_SEND_TIME
+        while sent < len(view):
+            try:
+                sent += self.sock.send(view[sent:])
+            except socket.timeout:
+                # Le serveur ne lit plus assez vite : rien n'a été envoyé, on recommence au même endroit
+                self.nbTimeouts += 1
+                if perf_counter() > deadline:
+                    raise socket.timeout("%d of %d bytes sent in %.1f s" % (sent, len(view),
+                                                                          SocketWriterThread.MAX_SEND_TIME))
+
+    def stop(self):
+        """Demande la fin du thread une fois les messages en attente envoyés."""
+        self.outboundQueue.close()
@@ -0,0 +1,175 @@
+# coding: utf-8
+
+import time
+from math import ceil
+from threading import Lock
+from time import perf_counter
+
+
+class TickPhaseLock():
+    """Cale l'envoi des commandes sur les TICK du serveur.
+        L'instant d'arrivée du prochain TICK est prédit à partir des arrivées précédentes (une boucle à verrouillage
+        de phase : la phase et la période prédites sont corrigées d'une fraction de l'écart observé à chaque TICK).
+        Les commandes sont envoyées une avance (lead) avant cet instant, afin d'arriver au serveur juste avant
+        qu'il n'envoie son TICK suivant plutôt qu'à un instant quelconque de la période.
+
+        L'avance idéale est l'aller-retour réseau plus une marge, que le client ne connaît pas. Si le serveur
+        acquitte les commandes (ACK), l'avance est ajustée d'après le délai entre l'envoi d'une commande et son
+        acquittement : elle est réduite pas à pas tant que ce délai diminue ; quand il augmente d'une demi-période,
+        les commandes arrivent trop tard pour le TICK visé et l'avance est rétablie puis maintenue un moment.
+        Sans TICK reçu, les commandes sont envoyées à la période nominale.
+    """
+
+    # Les gains de la boucle, appliqués à l'écart entre l'arrivée prédite et l'arrivée réelle
+    PHASE_GAIN = 0.1
+    PERIOD_GAIN = 0.005
+    # Le nombre d'acquittements dont le délai minimum est comparé au précédent
+    ACK_WINDOW = 15
+    # Le nombre de fenêtres pendant lesquelles l'avance est maintenue après avoir été rétablie
+    HOLD_WINDOWS = 20
+
+    def __init__(self, rate):
+        """Constructeur.
+
+        Arguments:
+            rate -- La fréquence nominale des TICK du serveur, en TICK par seconde.
+        """
+        self.lock = Lock()
+        self.nominalPeriod = 1 / rate
+        self.period = self.nominalPeriod
+        self.margin = self.nominalPeriod / 8
+        self.probeStep = self.nominalPeriod / 8
+        self.lead = self.margin
+        self.nextArrival = None     # L'instant prédit du prochain TICK (perf_counter)
+        self.lastSend = None        # L'instant d'envoi visé par le dernier nextDelay
+        self.nbTicks = 0
+        self.errorSum = 0.0
+        # Le réglage de l'avance d'après les acquittements
+        self.windowMin = None
+        self.windowCount = 0
+        self.previousMin = None
+        self.holdWindows = 0
+        self.settling = False       # La fenêtre en cours mêle des commandes envoyées avec l'ancienne avance
+        self.nbBackoffs = 0
+        self.startTime = None
+        self.nbSends = 0
+
+    def onTick(self, now):
+        """Signale l'arrivée d'un TICK.
+
+        Arguments:
+            now -- L'instant d'arrivée (perf_counter).
+        """
+        with self.lock:
+            self.nbTicks += 1
+            if self.nextArrival is None:
+                self.nextArrival = now + self.period
+                return
+            error = now - self.nextArrival
+            # Des TICK ont pu être perdus ou fusionnés : on se ramène au TICK prédit le plus proche
+            missed = round(error / self.period)
+            error -= missed * self.period
+            self.errorSum += abs(error)
+            self.period += self.PERIOD_GAIN * error
+            self.period = max(0.8 * self.nominalPeriod, min(1.2 * self.nominalPeriod, self.period))
+            self.nextArrival += (missed + 1) * self.period + self.PHASE_GAIN * error
+
+    def onAckDelay(self, delay):
+        """Signale le délai entre l'envoi d'une commande et la réception de son acquittement.
+
+        Arguments:
+            delay -- Le délai en secondes.
+        """
+        with self.lock:
+            self.windowMin = delay if self.windowMin is None else min(self.windowMin, delay)
+            self.windowCount += 1
+            if self.windowCount < self.ACK_WINDOW:
+                return
+            current = self.windowMin
+            self.windowMin = None
+            self.windowCount = 0
+            if self.settling:
+                self.settling = False
+                return
+            previous = self.previousMin
+            self.previousMin = current
+            if previous is None:
+                return
+            if current > previous + self.period / 2:
+                # Les commandes arrivent après le TICK visé et attendent le suivant : l'avance est rétablie
+                self.lead = (self.lead + self.probeStep + self.margin) % self.period
+                self.holdWindows = self.HOLD_WINDOWS
+                self.previousMin = None
+                self.settling = True
+                self.nbBackoffs += 1
+            elif self.holdWindows > 0:
+                self.holdWindows -= 1
+            else:
+                self.lead = (self.lead - self.probeStep) % self.period
+                self.settling = True
+
+    def nextDelay(self):
+        """Calcule le temps à attendre avant l'envoi suivant.
+
+        Returns:
+            Le délai en secondes.
+        """
+        now = perf_counter()
+        with self.lock:
+            if self.startTime is None:
+                self.startTime = now
+            self.nbSends += 1
+            if self.nextArrival is None:
+                # Aucun TICK reçu : envoi à la période nominale
+                sendTime = now + self.nominalPeriod
+            else:
+                sendTime = self.nextArrival - self.lead
+                # Le premier instant d'envoi à venir, une seule fois par TICK prédit
+                if sendTime <= now:
+                    sendTime += ceil((now - sendTime) / self.period + 1e-9) * self.period
+                if self.lastSend is not None and sendTime < self.lastSend + self.period / 2:
+                    sendTime += self.period
+            self.lastSend = sendTime
+            return sendTime - now
+
+    def sleep(self):
+        """Attend l'instant d'envoi suivant."""
+        delay = self.nextDelay()
+        if delay > 0:
+            time.sleep(delay)
+
+    def getInputPhase(self):
+        """ Getteur sur un instant auquel lire les touches du joueur : peu avant l'envoi prévu,
+            pour qu'une touche n'attende pas une période de plus avant de partir.
+
+        Returns:
+            L'instant (perf_counter), None tant que la phase des TICK n'est pas connue.
+        """
+        with self.lock:
+            if self.nextArrival is None or self.lastSend is None:
+                return None
+            return self.lastSend - self.margin / 2
+
+    def isLocked(self):
+        """Indique si la phase des TICK est connue."""
+        return self.nextArrival is not None
+
+    def getStats(self):
+        """Getteur sur les mesures de la boucle.
+
+        Returns:
+            tuple(sendRate, period, meanError, lead, nbBackoffs) -- La fréquence réelle des envois, la période estimée
+            des TICK et l'écart moyen entre arrivées prédites et réelles en secondes, l'avance courante en secondes
+            et le nombre de fois où l'avance a été rétablie.
+        """
+        with self.lock:
+            elapsed = perf_counter() - self.startTime if self.startTime is not None else 0
+            sendRate = self.nbSends / elapsed if elapsed > 0 else 0.0
+            meanError = self.errorSum / self.nbTicks if self.nbTicks > 0 else 0.0
+            return (sendRate, self.period, meanError, self.lead, self.nbBackoffs)
+
+    def formatStats(self):
+        """Met en forme les mesures de la boucle."""
+        (sendRate, period, meanError, lead, nbBackoffs) = self.getStats()
+        return "%.2f sends/s, TICK period %.2f ms, phase error %.2f ms, lead %.2f ms, %d backoffs" % (
+            sendRate, period * 1000, meanError * 1000, lead * 1000, nbBackoffs)
@@ -0,0 +1,122 @@
+# coding: utf-8
+
+import time
+from time import perf_counter
+
+
+class TickScheduler():
+    """Cadence une boucle à une fréquence fixe, sur l'horloge monotone.
+        Les échéances sont calculées depuis le démarrage et non depuis la fin du travail de la boucle :
+        le temps passé à travailler ne ralentit donc pas la fréquence réelle.
+        Une échéance déjà passée est exécutée tout de suite ; celles qui ne peuvent plus être tenues
+        sont sautées et comptées comme manquées, plutôt que rattrapées en rafale.
+        La phase des échéances peut être calée sur une autre horloge avec align.
+        Sert aussi d'accumulateur pour une physique à pas fixe : takeSteps indique combien de pas
+        de simulation sont dus depuis le dernier appel, quelle que soit la régularité de la boucle.
+    """
+
+    # Le nombre maximum de pas de simulation rattrapés en une fois, au-delà le temps est abandonné
+    MAX_STEPS = 5
+
+    def __init__(self, rate):
+        """Constructeur.
+
+        Arguments:
+            rate -- La fréquence voulue, en ticks par seconde.
+        """
+        self.rate = rate
+        self.period = 1 / rate
+        self.startTime = None
+        self.deadline = None
+        self.nbTicks = 0
+        self.nbMissed = 0
+        self.nbSteps = 0
+        self.nbDroppedSteps = 0
+
+    def start(self):
+        """Démarre l'horloge. Appelée automatiquement au premier nextDelay ou takeSteps."""
+        self.startTime = perf_counter()
+        self.deadline = self.startTime
+
+    def nextDelay(self):
+        """Passe à l'échéance suivante.
+
+        Returns:
+            Le temps à attendre avant l'échéance suivante, en secondes, 0 si elle est déjà passée.
+        """
+        if self.startTime is None:
+            self.start()
+        now = perf_counter()
+        self.nbTicks += 1
+        self.deadline += self.period
+        late = now - self.deadline
+        if late > 0:
+            # Les échéances passées depuis plus d'une période sont sautées
+            skipped = int(late / self.period)
+            self.deadline += skipped * self.period
+            self.nbMissed += 1 + skipped
+            return 0
+        return -late
+
+    def align(self, reference):
+        """ Décale les échéances suivantes, d'au plus une demi-période, pour qu'elles tombent sur reference
+            modulo la période. Les pas de simulation sont décalés d'autant.
+
+        Arguments:
+            reference -- Un instant (perf_counter) sur lequel caler les échéances.
+        """
+        if self.startTime is None:
+            self.start()
+        shift = (reference - self.deadline) % self.period
+        if shift > self.period / 2:
+            shift -= self.period
+        self.deadline += shift
+        self.startTime += shift
+
+    def sleep(self):
+        """Attend l'échéance suivante."""
+        delay = self.nextDelay()
+        if delay > 0:
+            time.sleep(delay)
+
+    def takeSteps(self, maxSteps=MAX_STEPS):
+        """Compte les pas de simulation dus depuis le dernier appel.
+
+        Keyword Arguments:
+            maxSteps -- Le nombre maximum de pas renvoyés, le retard au-delà est abandonné. (default: {TickScheduler.MAX_STEPS})
+
+        Returns:
+            Le nombre de pas de simulation à faire maintenant, éventuellement 0.
+        """
+        if self.startTime is None:
+            self.start()
+        # Calculé depuis le démarrage : les erreurs d'arrondi ne s'accumulent pas
+        due = int((perf_counter() - self.startTime) * self.rate) - self.nbSteps - self.nbDroppedSteps
+        if due <= 0:
+            # L'horloge a été recalée en arrière par align
+            return 0
+        if due > maxSteps:
+            self.nbDroppedSteps += due - maxSteps
+            due = maxSteps
+        self.nbSteps += due
+        return due
+
+    def getStats(self):
+        """Getteur sur les mesures de la boucle.
+
+        Returns:
+            tuple(tickRate, nbMissed, stepRate, nbDroppedSteps) -- La fréquence réelle de la boucle,
+            le nombre d'échéances manquées, la fréquence réelle des pas de simulation et le nombre de pas abandonnés.
+        """
+        if self.startTime is None:
+            return (0.0, 0, 0.0, 0)
+        elapsed = max(perf_counter() - self.startTime, 1e-9)
+        return (self.nbTicks / elapsed, self.nbMissed, self.nbSteps / elapsed, self.nbDroppedSteps)
+
+    def formatStats(self):
+        """Met en forme les mesures de la boucle."""
+        (tickRate, nbMissed, stepRate, nbDroppedSteps) = self.getStats()
+        text = "%.2f/%.2f ticks/s, %d missed" % (tickRate, self.rate, nbMissed)
+        if self.nbSteps > 0:
+            text += ", %.2f steps/s, %d dropped" % (stepRate, nbDroppedSteps)
+        return text
@@ -1,8 +1,8 @@
 # coding: utf-8
 
 import threading
-import time
 import data as dat
+from communication.threads.TickScheduler import TickScheduler
 
 
 class UpdatePlayerThread(threading.Thread):
@@ -10,14 +10,22 @@ class UpdatePlayerThread(threading.Thread):
     def __init__(self, dispatcher):
         super().__init__()
         self.dispatcher = dispatcher
+        self.scheduler = TickScheduler(dat.REFRESH_TICRATE)
         self.isInterrupted = False
 
     def run(self):
         print("[UpdatePlayerThread]: start updating")
         while not self.isInterrupted:
-            # Évite un interblocage avec le thread graphique lors de la terminaison de l'application
-            threading.Thread(target=self.dispatcher.updateEveryPlayerPosition).start()
-            time.sleep(1 / dat.REFRESH_TICRATE)
+            # La physique avance d'autant de pas que le temps écoulé, même si le thread a été réveillé en retard.
+            # La simulation ne fait que publier un instantané : c'est la boucle d'affichage qui redessine
+            nbSteps = self.scheduler.takeSteps()
+            if nbSteps > 0:
+                self.dispatcher.updateEveryPlayerPosition(nbSteps)
+            # Les touches sont lues juste avant l'envoi des commandes
+            inputPhase = self.dispatcher.tickPhaseLock.getInputPhase()
+            if inputPhase is not None:
+                self.scheduler.align(inputPhase)
+            self.scheduler.sleep()
 
     def stop(self):
         self.isInterrupted = True
\ No newline at end of file
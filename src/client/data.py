@@ -12,11 +12,15 @@ ARENA_L                 = -1 # Le paramètre l de l'arène
 POD_SIDE                = -1 # La taille du coté d'un POD (le joueur)
 BALL_SIDE               = -1 # La taille du coté d'une dragon ball (un objectif)
 ASTEROID_SIDE           = -1 # La taille du coté d'un astéroïde
+WIN_CAP                 = -1 # Le score à atteindre pour gagner une session
+NB_OBSTACLE             = -1 # Le nombre d'obstacles d'une session
+WAITING_TIME            = -1 # Le temps d'attente (en ms) avant le début d'une session
 
 
 def setUpData():
     """Met en place toutes la variables constantes du jeu en lisant le fichier des constantes."""
     global TURN_IT, THRUST_IT, SERVER_TICRATE, REFRESH_TICRATE, ARENA_H, ARENA_L, POD_SIDE, BALL_SIDE, ASTEROID_SIDE
+    global WIN_CAP, NB_OBSTACLE, WAITING_TIME
     with open('../data.json') as json_file:  
         data = json.load(json_file)
         TURN_IT = data["turn_it"]
@@ -28,3 +32,6 @@ def setUpData():
         POD_SIDE = data["pod_side"]
         BALL_SIDE = data["ball_side"]
         ASTEROID_SIDE = data["asteroid_side"]
+        WIN_CAP = data["win_cap"]
+        NB_OBSTACLE = data["nb_obstacle"]
+        WAITING_TIME = data["waiting_time"]
@@ -1,13 +1,20 @@
 # coding: utf-8
 
-from tkinter import Event
-from threading import Thread, RLock
+from collections import deque
+from time import perf_counter
+from math import degrees, hypot
 from player.Pair import Pair
 from player.PlayerPod import PlayerPod
-from math import sqrt
-
+from player.InputHistory import InputHistory
+from player.InputQueue import InputQueue
+from physics.World import World
+from physics.WorldSnapshot import WorldSnapshot
+from physics.InterpolationBuffer import InterpolationBuffer
+from communication.threads.TickPhaseLock import TickPhaseLock
+
+import communication.codec as codec
+from communication.Protocol import Protocol
 import data as dat
-import re as regexp
 
 
 class Dispatcher():
@@ -20,12 +27,35 @@ class Dispatcher():
         self.playerPseudo = None
         self.player = None
         self.userCanPlay = False
-        self.opponentsLock = RLock()
-        self.opponents = {}     # Un dictionnaire d'adversaire
+        self.opponents = {}     # Un dictionnaire d'adversaire, modifié par la simulation seulement pendant une session
         self.objectif = ()      # Un tuple représentant l'objectif : (x, y, canvasTag, photoImage)
-        self.obstaclesLock = RLock()
         self.obstacles = []   # Une liste de tuple représentant un obstacle : (x, y, canvasTag, photoImage)
+        self.pendingCalls = deque()     # Les appels (méthode, arguments) confiés à la simulation
         self.objectifCpt = 0
+        self.world = World()
+        self.snapshot = WorldSnapshot.EMPTY   # Remplacé en entier à chaque image, jamais modifié
+        self.sentCommand = (0, 0)      # Les commandes du joueur déjà envoyées au serveur
+        self.pendingCommand = (0, 0)   # Les commandes du joueur lues par le dernier getPlayerCommand
+        self.opponentBuffers = {}      # Les états reçus de chaque adversaire, modifiés comme opponents
+        self.interpolationDelay = InterpolationBuffer.DEFAULT_DELAY
+        self.maxExtrapolation = InterpolationBuffer.DEFAULT_MAX_EXTRAPOLATION
+        self.predictionEnabled = True  # Annonce CAPABILITY_SEQ au serveur
+        self.serverAcksInputs = False  # Le serveur acquitte les commandes, reçu avec le premier ACK
+        self.commandSeq = 0            # Le numéro de la dernière commande envoyée, jamais remis à zéro
+        self.ackedSeq = None           # Le numéro de la dernière commande traitée par le serveur
+        self.inputHistory = InputHistory()
+        self.inputQueue = InputQueue()  # Les touches du joueur, lues une fois par image
+        self.binaryTicksEnabled = False  # Annonce CAPABILITY_BINARY_TICK au serveur
+        self.playerIds = {}             # Le numéro de chaque joueur dans les TICK binaires -> son pseudo
+        self.tickPhaseLock = TickPhaseLock(dat.SERVER_TICRATE)  # Cale l'envoi des commandes sur les TICK
+        self.inputFrame = 0             # Le pas de la première touche appliquée depuis le dernier envoi
+        self.inputTime = None           # L'instant de cette touche, écrits par la simulation seulement
+        self.pendingInputTime = None    # inputTime lu par le dernier getPlayerCommandMessage
+        self.pendingFrame = 0           # Le pas de l'instantané lu par le dernier getPlayerCommandMessage
+        self.nbFrames = 0               # Le nombre de pas de simulation, écrit par la simulation seulement
+        self.framesAtSend = 0           # Le pas de l'instantané du dernier envoi, écrit par le thread d'envoi seulement
+        self.nbSentCommands = 0
+        self.nbSkippedCommands = 0
 
     def setServerMessager(self, serverMessager):
         """Setteur du serverMessager du dispatcher.
@@ -35,6 +65,47 @@ class Dispatcher():
         """
         self.serverMessager = serverMessager
 
+    def setInterpolation(self, delay, maxExtrapolation):
+        """Règle l'interpolation des adversaires.
+        
+        Arguments:
+            delay -- Le retard avec lequel les adversaires sont affichés, en secondes.
+                     0 pour les afficher au dernier état reçu puis les déplacer avec la physique du client.
+            maxExtrapolation -- La durée maximale d'extrapolation quand les TICK tardent, en secondes.
+        """
+        self.interpolationDelay = delay
+        self.maxExtrapolation = maxExtrapolation
+
+    def setPrediction(self, enabled):
+        """Active ou désactive le recalage du joueur sur les commandes acquittées par le serveur.
+            Désactivé, chaque TICK remplace l'état du joueur. Doit être appelé avant la connexion.
+        
+        Arguments:
+            enabled -- True pour annoncer au serveur les numéros de séquence des commandes.
+        """
+        self.predictionEnabled = enabled
+
+    def setBinaryTicks(self, enabled):
+        """Demande au serveur d'envoyer les TICK sous forme binaire, s'il le permet. Doit être appelé avant la connexion.
+        
+        Arguments:
+            enabled -- True pour annoncer au serveur la capacité CAPABILITY_BINARY_TICK.
+        """
+        self.binaryTicksEnabled = enabled
+
+    def getCapabilities(self):
+        """Getteur sur les extensions du protocole annoncées au serveur lors de la connexion.
+        
+        Returns:
+            La liste des capacités du client.
+        """
+        capabilities = []
+        if self.predictionEnabled:
+            capabilities.append(Protocol.CAPABILITY_SEQ)
+        if self.binaryTicksEnabled:
+            capabilities.append(Protocol.CAPABILITY_BINARY_TICK)
+        return capabilities
+
     def setGraphicalApp(self, gApp):
         """Setteur de l'application graphique du dispatcher.
         
@@ -64,45 +135,53 @@ class Dispatcher():
     def onCloseWindow(self):
         """Handler de l'événement de fermeture de la fenêtre."""
         self.serverMessager.closeConnection(self.playerPseudo)
+        print("[Dispatcher] : %d commands sent, %d skipped" % (self.nbSentCommands, self.nbSkippedCommands))
+        if self.serverAcksInputs:
+            print("[Dispatcher] : prediction : " + self.inputHistory.formatStats())
 
-    def clockEvent(self, Event):
-        """ Handler d'un événement demandant une rotation.
-            Déléguera le traitement de la tâche à un autre thread pour ne pas bloquer le thread de l'interface graphique.
+    def keyPressedEvent(self, action):
+        """ Handler de l'appui sur une touche de contrôle du pod.
+            Ne fait qu'ajouter l'événement à la file des touches : ne bloque jamais le thread de l'interface graphique.
+        
+        Arguments:
+            action -- L'action de la touche, une des InputQueue.ACTIONS.
         """
-        Thread(target=self.clockEventForNonGUIThread).start()
-
-    def clockEventForNonGUIThread(self):
-        """Applique une rotation au joueur."""
-        if self.userCanPlay:
-            self.player.acquire()
-            self.player.clock()
-            self.player.release()
+        self.inputQueue.press(action)
 
-    def antiClockEvent(self, Event):
-        """ Handler d'un événement demandant une rotation inverse.
-            Déléguera le traitement de la tâche à un autre thread pour ne pas bloquer le thread de l'interface graphique.
+    def keyReleasedEvent(self, action):
+        """ Handler du relâchement d'une touche de contrôle du pod.
+        
+        Arguments:
+            action -- L'action de la touche, une des InputQueue.ACTIONS.
         """
-        Thread(target=self.antiClockEventForNonGUIThread).start()
+        self.inputQueue.release(action)
 
-    def antiClockEventForNonGUIThread(self):
-        """Applique une rotation inverse au joueur."""
-        if self.userCanPlay:
-            self.player.acquire()
-            self.player.antiClock()
-            self.player.release()
+    def focusLostEvent(self, Event):
+        """Handler de la perte du focus : les relâchements des touches ne seront pas reçus."""
+        self.inputQueue.releaseAll()
 
-    def thrustEvent(self, Event):
-        """ Handler d'un événement demandant une impulsion.
-            Déléguera le traitement de la tâche à un autre thread pour ne pas bloquer le thread de l'interface graphique.
+    def applyInputs(self, player):
+        """ Applique au joueur les touches appuyées ou maintenues depuis la dernière image.
+            Ne doit être appelée que par la simulation.
+        
+        Arguments:
+            player -- Le joueur.
         """
-        Thread(target=self.thrustEventFromNonGUIThread).start()
-    
-    def thrustEventFromNonGUIThread(self):
-        """Applique au poussée au joueur."""
-        if self.userCanPlay:
-            self.player.acquire()
-            self.player.thrust()
-            self.player.release()
+        actions = self.inputQueue.drain()
+        # Les touches appuyées hors session sont lues mais ignorées
+        if not self.userCanPlay:
+            return
+        # framesAtSend peut être en retard d'un envoi : la touche est alors seulement mesurée avec la suivante
+        if actions and self.inputFrame <= self.framesAtSend:
+            self.inputFrame = self.nbFrames
+            self.inputTime = perf_counter()
+        for action in actions:
+            if action == InputQueue.ANTICLOCK:
+                player.antiClock()
+            elif action == InputQueue.CLOCK:
+                player.clock()
+            elif action == InputQueue.THRUST:
+                player.thrust()
 
     def createPlayer(self, pseudo, x, y):
         """Crée un joueur.
@@ -114,7 +193,10 @@ class Dispatcher():
         """
         pos = Pair(x, y)
         tupleRes = self.graphicalApp.createGraphicalPlayer(pos.getX(), pos.getY())
-        self.player = PlayerPod(pseudo, pos, 0, tupleRes[0], tupleRes[1], tupleRes[2])
+        self.player = PlayerPod(pseudo, pos, 0, tupleRes[0], tupleRes[1], tupleRes[2], tupleRes[3])
+        self.sentCommand = (0, 0)
+        self.pendingCommand = (0, 0)
+        self.inputHistory.clear()
     
     def createOpponent(self, pseudo, x, y):
         """Crée un adversaire et l'ajoute à notre dictionnaire d'adversaire.
@@ -127,9 +209,7 @@ class Dispatcher():
         self.graphicalApp.createChat(pseudo)
         pos = Pair(x, y)
         tupleRes = self.graphicalApp.createGraphicalOpponent(pos.getX(), pos.getY())
-        self.opponentsLock.acquire()
-        self.opponents[pseudo] = PlayerPod(pseudo, pos, 0, tupleRes[0], tupleRes[1], tupleRes[2])
-        self.opponentsLock.release()
+        self.opponents[pseudo] = PlayerPod(pseudo, pos, 0, tupleRes[0], tupleRes[1], tupleRes[2], tupleRes[3])
 
     def getPlayer(self):
         """Getteur sur le joueur du dispatcher.
@@ -139,81 +219,136 @@ class Dispatcher():
         """
         return self.player
 
-    def getPlayerCommand(self):
-        """ Récupère les commandes du joueurs.
+    def getSnapshot(self):
+        """Getteur sur le dernier instantané publié. Ne prend aucun verrou.
+        
+        Returns:
+            Le dernier WorldSnapshot.
+        """
+        return self.snapshot
+
+    def getPlayerCommandMessage(self):
+        """ Récupère le message NEWCOM des commandes du joueur accumulées depuis le dernier envoi.
+            Si le serveur acquitte les commandes, le message porte le numéro de séquence de la commande.
+            Ne lit que le dernier instantané publié, sans verrou : seul le thread d'envoi des commandes appelle
+            cette méthode et resetPlayerCommand.
         
         Returns:
-            Les commandes du joueur, None si le verrou du joueur n'a pas pu être pris en 0.5 seconde
-        """
-        command = None
-        if self.player is not None:
-            res = self.player.acquire(timeout=0.5)
-            # On a obtenu le lock
-            if res:
-                command = self.player.getCommand()
-                self.player.release()    
-        return command
+            Le message à envoyer, None s'il n'y a pas de joueur ou si la commande ne changerait rien.
+        """
+        snapshot = self.snapshot
+        player = snapshot.player
+        if player is None:
+            return None
+        self.pendingCommand = snapshot.commands
+        # Le serveur ne déplace un pod qu'à la réception d'un NEWCOM : une commande vide n'est inutile
+        # que si le pod est aussi immobile
+        if self.pendingCommand == self.sentCommand and player.getVectorX() == 0 and player.getVectorY() == 0:
+            # Pour le serveur, comme si la commande vide avait été envoyée
+            self.framesAtSend = snapshot.frame
+            self.nbSkippedCommands += 1
+            return None
+        self.pendingInputTime = snapshot.inputTime if snapshot.inputFrame > self.framesAtSend else None
+        self.pendingFrame = snapshot.frame
+        message = "NEWCOM/" + PlayerPod.formatCommand(self.pendingCommand[0] - self.sentCommand[0],
+                                                      self.pendingCommand[1] - self.sentCommand[1]) + "/"
+        if self.serverAcksInputs:
+            message += "SEQ/" + str(self.commandSeq + 1) + "/"
+        return message
     
     def resetPlayerCommand(self):
-        """Reset les commandes du joueur."""
-        self.player.acquire()
-        self.player.resetCommand()
-        self.player.release()
-
-    def updateEveryPlayerPosition(self):
-        """Met à jour les positions de tous les joueurs et demande à l'interfaces graphiques de se mettre à jour en conséquence."""
+        """Indique que le message lu par le dernier getPlayerCommandMessage a été envoyé."""
+        if self.serverAcksInputs:
+            self.commandSeq += 1
+            # La commande est gardée jusqu'à ce que le serveur indique l'avoir traitée
+            self.inputHistory.push(self.commandSeq, self.pendingCommand[0] - self.sentCommand[0],
+                                   self.pendingCommand[1] - self.sentCommand[1], self.pendingCommand,
+                                   perf_counter(), self.pendingInputTime)
+        self.pendingInputTime = None
+        self.sentCommand = self.pendingCommand
+        # Une touche appliquée après l'instantané lu reste pour le prochain envoi
+        self.framesAtSend = self.pendingFrame
+        self.nbSentCommands += 1
+
+    def publishSnapshot(self, player, opponents):
+        """ Fige l'état des joueurs et le publie. Ne doit être appelée que par la simulation.
         
-        # On met à jour la position du joueur
-        if self.player is None:
-            return
-        self.player.acquire()
-        self.updatePlayerPosition(self.player)
-        self.graphicalApp.updateUIPlayer(self.player)
-        self.player.release()
-
-        # On met à jour la position des adversaires
-        self.opponentsLock.acquire()
-        for _, opponent in self.opponents.items():
-            if opponent is None:
-                continue
-            opponent.acquire()
-            # Il se peut que l'on aie pas encore reçu la position de l'adversaire
-            if opponent.getPosition() is not None:
-                self.updatePlayerPosition(opponent)
-                self.graphicalApp.updateUIPlayer(opponent)
-            opponent.release()
-        self.opponentsLock.release()
+        Arguments:
+            player -- Le joueur.
+            opponents -- Les adversaires ayant une position.
+        
+        Returns:
+            Le nouvel instantané.
+        """
+        snapshot = WorldSnapshot(self.nbFrames, player.snapshot(), tuple(opponent.snapshot() for opponent in opponents),
+                                 player.getCommandTotals(), self.inputFrame, self.inputTime)
+        # L'affectation d'une référence est atomique : les lecteurs voient l'ancien ou le nouvel instantané
+        self.snapshot = snapshot
+        return snapshot
 
-    def updatePlayerPosition(self, player):
-        """Met à jour la position d'un joueur en fonction de son vecteur et de son angle.
+    def postToSimulation(self, function, *args):
+        """ Confie un appel à la simulation si une session est en cours : elle seule modifie alors les joueurs.
+            Doit être appelée depuis le thread de réception des messages, qui seul lance et arrête les sessions.
         
         Arguments:
-            player -- Le joueur que l'on souhaite mettre à jour.
+            function -- La méthode appelée.
+            args -- Les arguments de l'appel.
+        """
+        if self.userCanPlay:
+            self.pendingCalls.append((function, args))
+        else:
+            function(*args)
+
+    def runPendingCalls(self):
+        """Exécute, dans l'ordre de réception, les appels confiés à la simulation depuis la dernière image."""
+        pendingCalls = self.pendingCalls
+        while pendingCalls:
+            (function, args) = pendingCalls.popleft()
+            function(*args)
+
+    def updateEveryPlayerPosition(self, nbSteps=1):
+        """ Met à jour les positions de tous les joueurs et demande à l'interfaces graphiques de se mettre à jour en conséquence.
+            Seule la simulation modifie les joueurs, sans verrou : l'affichage et l'envoi des commandes lisent l'instantané publié.
+            Ne touche jamais directement à l'interface graphique : aucun thread n'attend celui de Tk.
+        
+        Keyword Arguments:
+            nbSteps -- Le nombre de pas de simulation à faire, chacun durant 1/refresh_tickrate seconde.
+                       Un seul instantané est publié à la fin. (default: {1})
         """
-        newX = player.getPositionX()
-        newX += player.getVectorX()
-        
-        newY = player.getPositionY()
-        newY += player.getVectorY()
-
-        # Le pod quitte le canvas par la droite
-        if newX > dat.ARENA_L:
-            newX = -dat.ARENA_L + (newX - dat.ARENA_L)
-        # Le pod quitte le canvas par la gauche
-        if newX < -dat.ARENA_L:
-            newX = dat.ARENA_L - (newX + dat.ARENA_L)
-
-        # Le pod quitte le canvas par le haut
-        if newY > dat.ARENA_H:
-            newY = -dat.ARENA_H + (newY - dat.ARENA_H)
-        # Le pod quitte le canvas par le bas
-        if newY < -dat.ARENA_H:
-            newY = dat.ARENA_H - (newY + dat.ARENA_H)
         
-        player.setPositionX(newX)
-        player.setPositionY(newY)
+        player = self.player
+        if player is None:
+            return
+        # Les TICK, ACK, arrivées et départs de joueurs reçus depuis la dernière image
+        self.runPendingCalls()
+        # Il se peut que l'on aie pas encore reçu la position de l'adversaire
+        opponents = [opponent for opponent in self.opponents.values() if opponent.getPosition() is not None]
+
+        # Les adversaires interpolés sont placés d'après les états reçus, la physique ne les déplace pas
+        fixedOpponents = []
+        movingPods = [player]
+        if self.interpolationDelay > 0:
+            renderTime = perf_counter() - self.interpolationDelay
+            for opponent in opponents:
+                buffer = self.opponentBuffers.get(opponent.getPseudo())
+                state = buffer.sample(renderTime, self.maxExtrapolation) if buffer is not None else None
+                if state is None:
+                    movingPods.append(opponent)
+                    continue
+                opponent.setState(state[0], state[1], state[2], state[3])
+                if opponent.getAngle() != state[4]:
+                    opponent.setAngle(state[4])
+                fixedOpponents.append(opponent)
+        else:
+            movingPods.extend(opponents)
 
-        self.checkCollisions(self.player)
+        for _ in range(0, nbSteps):
+            self.nbFrames += 1
+            self.applyInputs(player)
+            # Déplace tous les pods en une fois et les fait rebondir sur les obstacles et entre eux
+            self.world.step(movingPods, fixedOpponents)
+        snapshot = self.publishSnapshot(player, opponents)
+        self.graphicalApp.onSnapshotPublished(snapshot)
 
     def showDeniedMessage(self):
         """Demande à l'interface graphique d'afficher un message indiquant un refus de connexion."""
@@ -226,11 +361,7 @@ class Dispatcher():
         Arguments:
             scores -- Les scores reçus.
         """
-        self.graphicalApp.resetScores()
-        scores = scores.split("|")
-        for score in scores:
-            elt = score.split(":")
-            self.graphicalApp.addScoreToTable(elt[0], elt[1])
+        self.graphicalApp.updateScores(codec.parseEntries(scores))
 
     def onObjectifReceived(self, objectif):
         """ Réagit à la réception d'un objectif.
@@ -244,10 +375,7 @@ class Dispatcher():
         if self.objectif:
             self.graphicalApp.deleteFromCanvas(self.objectif[2])
         
-        pattern = "(-?[0-9]+\\.?[0-9]+E?-?[0-9]*)"
-        extractedCoord = regexp.findall(pattern, objectif)
-        objectifX = float(extractedCoord[0])
-        objectifY = float(extractedCoord[1])
+        objectifX, objectifY = codec.parseCoord(objectif)
 
         self.objectifCpt += 1
         # On a seulement 7 dragon ball...
@@ -274,21 +402,16 @@ class Dispatcher():
             coord -- Les coordonnées de l'objectif.
         """
         print("Positions of players : ")
-        pattern = "(-?[0-9]+\\.?[0-9]+E?-?[0-9]*)"
-        players = coords.split("|")
         # Création des joueurs avec leurs coordonnées
-        for p in players:
-            splitted = p.split(":")
-            print("\t", splitted[0], "->", splitted[1])
-            extractedCoord = regexp.findall(pattern, splitted[1])
-            playerX = float(extractedCoord[0])
-            playerY = float(extractedCoord[1])
+        for (pseudo, coordPlayer) in codec.parseEntries(coords):
+            print("\t", pseudo, "->", coordPlayer)
+            playerX, playerY = codec.parseCoord(coordPlayer)
             # Notre joueur
-            if splitted[0] == self.playerPseudo:
-                self.createPlayer(splitted[0], playerX, playerY)
+            if pseudo == self.playerPseudo:
+                self.createPlayer(pseudo, playerX, playerY)
             # Un adversaire
             else:
-                self.createOpponent(splitted[0], playerX, playerY)
+                self.createOpponent(pseudo, playerX, playerY)
         self.onObjectifReceived(coord)
         self.startGame()
 
@@ -299,12 +422,20 @@ class Dispatcher():
         Arguments:
             newOpponentName  -- Le pseudo du nouveau joueur.
         """
-        self.opponentsLock.acquire()
-        self.opponents[newOpponentName] = PlayerPod(newOpponentName, None, 0, None, None, None)
         print(newOpponentName, "joined the session")
+        self.postToSimulation(self.addOpponent, newOpponentName)
         self.graphicalApp.addScoreToTable(newOpponentName, 0)
         self.graphicalApp.createChat(newOpponentName)
-        self.opponentsLock.release()
+
+    def addOpponent(self, pseudo):
+        """ Ajoute un adversaire sans position, placé à la réception de son premier TICK.
+            Un adversaire déjà créé, par exemple par le début de la session, est gardé.
+        
+        Arguments:
+            pseudo -- Le pseudo de l'adversaire.
+        """
+        if pseudo not in self.opponents:
+            self.opponents[pseudo] = PlayerPod(pseudo, None, 0, None, None, None)
     
     def onPlayerLeftReceived(self, opponentName):
         """ Réagit à la réception du message indiquant qu'un joueur est parti.
@@ -315,14 +446,21 @@ class Dispatcher():
         """
         
         # Supprime l'adversaire du dictionnaire et du canvas
-        self.opponentsLock.acquire()
         print(opponentName, "left the game")
         self.graphicalApp.deleteChat(opponentName)
-        self.opponents.__delitem__(opponentName)
-        self.opponentsLock.release()
+        self.postToSimulation(self.removeOpponent, opponentName)
 
         # Remove the component from the score table
         self.graphicalApp.removeOpponent(opponentName)
+
+    def removeOpponent(self, pseudo):
+        """ Supprime un adversaire et les états reçus de lui.
+        
+        Arguments:
+            pseudo -- Le pseudo de l'adversaire.
+        """
+        self.opponents.pop(pseudo, None)
+        self.opponentBuffers.pop(pseudo, None)
     
     def onObstaclesReceived(self, obstacles):
         """ Réagit à la réception d'obstacles.
@@ -331,20 +469,15 @@ class Dispatcher():
         Arguments:
             obstacles  -- Les nouveaux obstacles.
         """
-        pattern = "(-?[0-9]+\\.?[0-9]+E?-?[0-9]*)"
-        obstacles = obstacles.split("|")
         # Creation des obstacles
-        self.obstaclesLock.acquire()
-        for o in obstacles:
-            if o != '':
-                splitted = o.split(":")
-                extractedCoord = regexp.findall(pattern, splitted[1])
-                obstacleX = float(extractedCoord[0])
-                obstacleY =float(extractedCoord[1])
-                tupleRes = self.graphicalApp.createGraphicalObstacle(obstacleX, obstacleY)
-                tupleRes = (obstacleX, obstacleY) + tupleRes
-                self.obstacles.append(tupleRes)
-        self.obstaclesLock.release()
+        for (_, coordObstacle) in codec.parseEntries(obstacles):
+            obstacleX, obstacleY = codec.parseCoord(coordObstacle)
+            tupleRes = self.graphicalApp.createGraphicalObstacle(obstacleX, obstacleY)
+            tupleRes = (obstacleX, obstacleY) + tupleRes
+            self.obstacles.append(tupleRes)
+        # Les obstacles ne bougent pas : leur index spatial n'est construit qu'à leur réception,
+        # puis remplacé en une affectation que la simulation voit à l'image suivante
+        self.world.setObstacles(self.obstacles)
 
     def onWinnerReceived(self, scores):
         """ Réagit à la reception d'un message indiquant qu'un joueur à gagné.
@@ -374,35 +507,118 @@ class Dispatcher():
         Arguments:
             vcoords -- Les nouvelles informations des joueurs de la session.
         """
-        pattern = "(-?[0-9]+\\.?[0-9]+E?-?[0-9]*)"
-        players = vcoords.split("|")
+        self.onStatesReceived([(pseudo,) + codec.parseVcoord(vcoord) for (pseudo, vcoord) in codec.parseEntries(vcoords)])
+
+    def onBinaryTickReceived(self, payload):
+        """ Réagit à la réception d'un message de type BTICK, la forme binaire d'un TICK.
+        
+        Arguments:
+            payload -- Les octets du TICK.
+        """
+        self.onStatesReceived(codec.parseBinaryStates(payload, self.playerIds))
+
+    def onPlayerIdsReceived(self, ids):
+        """ Réagit à la réception des numéros des joueurs utilisés dans les TICK binaires.
+            Envoyés au début de la session puis à chaque arrivée d'un joueur.
+        
+        Arguments:
+            ids -- Les numéros des joueurs, de la forme "pseudo:numéro|...".
+        """
+        self.playerIds = {int(playerId): pseudo for (pseudo, playerId) in codec.parseEntries(ids)}
+
+    def onStatesReceived(self, states):
+        """ Réagit aux états reçus dans un TICK : ils seront appliqués aux joueurs par la simulation.
+        
+        Arguments:
+            states -- Les états des joueurs : des tuples (pseudo, x, y, vx, vy, angle), l'angle étant en radians.
+        """
+        now = perf_counter()
+        self.tickPhaseLock.onTick(now)
+        self.postToSimulation(self.applyStates, states, now)
+
+    def applyStates(self, states, receiveTime):
+        """ Met à jour l'ensemble des joueurs avec les états reçus dans un TICK.
+        
+        Arguments:
+            states -- Les états des joueurs : des tuples (pseudo, x, y, vx, vy, angle), l'angle étant en radians.
+            receiveTime -- L'instant de réception du TICK.
+        """
         # Création des joueurs avec leurs coordonnées
-        for p in players:
-            splitted = p.split(":")
-            extractedCoord = regexp.findall(pattern, splitted[1])
-            playerX = float(extractedCoord[0])
-            playerY = float(extractedCoord[1])
-            playerVX = float(extractedCoord[2])
-            playerVY = float(extractedCoord[3])
-            playerAngle = float(extractedCoord[4])
-            if splitted[0] == self.playerPseudo:
-                self.player.acquire()
-                self.player.fullyUpdate(playerX, playerY, playerVX, playerVY, playerAngle)
-                self.player.release()
-            else:
-                self.opponentsLock.acquire()
-                if splitted[0] in self.opponents:
-                    opponent = self.opponents[splitted[0]]
-                    opponent.acquire()
-                    # On reçoit le tick d'un adversaire n'ayant pas encore de position
-                    if opponent.getPosition() is None:
-                        opponent.fullyUpdateFromScratch(playerX, playerY, playerVX, playerVY, playerAngle)
-                        tupleRes = self.graphicalApp.createGraphicalOpponent(playerX, playerY)
-                        self.opponents[splitted[0]] = PlayerPod(splitted[0], Pair(playerX, playerY), playerAngle, tupleRes[0], tupleRes[1], tupleRes[2])
-                    else:
-                        opponent.fullyUpdate(playerX, playerY, playerVX, playerVY, playerAngle)
-                    opponent.release()
-                self.opponentsLock.release()
+        for (pseudo, playerX, playerY, playerVX, playerVY, playerAngle) in states:
+            if pseudo == self.playerPseudo:
+                if self.ackedSeq is None:
+                    self.player.fullyUpdate(playerX, playerY, playerVX, playerVY, playerAngle)
+                else:
+                    self.reconcilePlayer(playerX, playerY, playerVX, playerVY, playerAngle)
+            elif pseudo in self.opponents:
+                opponent = self.opponents[pseudo]
+                # On reçoit le tick d'un adversaire n'ayant pas encore de position
+                if opponent.getPosition() is None:
+                    opponent.fullyUpdateFromScratch(playerX, playerY, playerVX, playerVY, playerAngle)
+                    tupleRes = self.graphicalApp.createGraphicalOpponent(playerX, playerY)
+                    self.opponents[pseudo] = PlayerPod(pseudo, Pair(playerX, playerY), round(degrees(playerAngle)), tupleRes[0], tupleRes[1], tupleRes[2], tupleRes[3])
+                else:
+                    opponent.fullyUpdate(playerX, playerY, playerVX, playerVY, playerAngle)
+                if pseudo not in self.opponentBuffers:
+                    self.opponentBuffers[pseudo] = InterpolationBuffer()
+                self.opponentBuffers[pseudo].push(receiveTime, playerX, playerY, playerVX, playerVY, round(degrees(playerAngle)))
+
+    def onAckReceived(self, seq):
+        """ Réagit à la réception d'un message de type ACK, envoyé juste avant un TICK.
+            Le premier ACK indique que le serveur gère les numéros de séquence des commandes.
+            L'acquittement est traité par la simulation, dans l'ordre de réception avec les TICK.
+        
+        Arguments:
+            seq -- Le numéro de la dernière commande traitée par le serveur, 0 si aucune.
+        """
+        self.serverAcksInputs = True
+        self.postToSimulation(self.applyAck, seq, perf_counter())
+
+    def applyAck(self, seq, receiveTime):
+        """ Oublie les commandes traitées par le serveur et mesure leur délai d'acquittement.
+        
+        Arguments:
+            seq -- Le numéro de la dernière commande traitée par le serveur, 0 si aucune.
+            receiveTime -- L'instant de réception de l'ACK.
+        """
+        self.ackedSeq = seq
+        delay = self.inputHistory.acknowledge(seq, receiveTime)
+        if delay is not None:
+            self.tickPhaseLock.onAckDelay(delay)
+
+    def reconcilePlayer(self, x, y, vx, vy, angle):
+        """ Recale le joueur sur l'état reçu du serveur puis rejoue les commandes que le serveur n'a pas encore traitées,
+            avec la physique du client. Ne doit être appelée que par la simulation.
+        
+        Arguments:
+            x -- La coordonnée X reçue.
+            y -- La coordonnée Y reçue.
+            vx -- Le vecteur X reçu.
+            vy -- Le vecteur Y reçu.
+            angle -- L'angle reçu, en radians.
+        """
+        player = self.player
+        (pending, sentTotals) = self.inputHistory.getPending()
+        predicted = player.getState()
+        state = [x, y, vx, vy]
+        newAngle = round(degrees(angle)) % 360
+        for (_, angleCommand, thrustCommand, _, _) in pending:
+            newAngle = self.world.applyCommand(state, newAngle, angleCommand, thrustCommand)
+        # Les commandes pas encore envoyées ont déjà été appliquées au joueur, mais pas au serveur ;
+        # le joueur s'est aussi déplacé à chaque image depuis le dernier envoi, le serveur le fera au prochain
+        totals = player.getCommandTotals()
+        nbFrames = self.nbFrames - self.framesAtSend
+        newAngle = self.world.applyCommand(state, newAngle, totals[0] - sentTotals[0], totals[1] - sentTotals[1],
+                                           move=nbFrames > 0)
+        for _ in range(1, nbFrames):
+            newAngle = self.world.applyCommand(state, newAngle, 0, 0)
+        player.setState(state[0], state[1], state[2], state[3])
+        if player.getAngle() != newAngle:
+            player.setAngle(newAngle)
+
+        error = hypot(InterpolationBuffer.shortest(state[0] - predicted[0], dat.ARENA_L),
+                      InterpolationBuffer.shortest(state[1] - predicted[1], dat.ARENA_H))
+        self.inputHistory.recordCorrection(error, len(pending))
 
     def startGame(self):
         """ Débute une session."""
@@ -412,196 +628,39 @@ class Dispatcher():
     
     def resetGame(self):
         """ Reset une session."""
+        # La simulation est arrêtée : les joueurs peuvent être modifiés depuis ce thread
         # Enlève l'objectif courant
-        self.player.acquire()
         self.graphicalApp.deleteFromCanvas(self.player.getCanvasTagId())
         self.player = None
         self.userCanPlay = False
+        self.snapshot = WorldSnapshot.EMPTY
+        # Les TICK de la session finie ne s'appliquent pas à la suivante
+        self.pendingCalls.clear()
         
-        self.opponentsLock.acquire()
         for _, opponent in self.opponents.items():
-            opponent.acquire()
             self.graphicalApp.deleteFromCanvas(opponent.getCanvasTagId())
-            opponent.release()
         self.opponents = {}
-        self.opponentsLock.release()
+        self.opponentBuffers = {}
         
         self.graphicalApp.deleteFromCanvas(self.objectif[2])
         self.objectif = ()
         
-        self.obstaclesLock.acquire()
         for obstacle in self.obstacles:
             self.graphicalApp.deleteFromCanvas(obstacle[2])
         self.obstacles = []
+        self.world.setObstacles(self.obstacles)
         self.objectifCpt = 0
-        self.obstaclesLock.release()
-        
-        # self.player vaut None, pas besoin de relâcher son lock
-        # self.player.release()
-
-    def checkCollisions(self, player):
-        """ Vérifie s'il y a une collision entre un joueur et les autres objets de l'application.
-            Met et met à jour le vecteur et la position du joueur en conséquence.
-        
-        Arguments:
-            player -- Le joueur pour lequel on souhaite vérifier s'il entre en collision avec quelque chose.
-        """
-
-        pX = player.getPositionX()
-        pY = player.getPositionY()
-        # On doit tester les collisions avec les adversaires
-        if player.getPseudo() == self.player.getPseudo():
-            self.opponentsLock.acquire()
-            for _, opponent in self.opponents.items():
-                opponent.acquire()
-                if opponent.getPosition() is not None:
-                    oX = opponent.getPositionX()
-                    oY = opponent.getPositionY()
-                    if self.checkHit(pX, pY, dat.POD_SIDE, oX, oY, dat.ASTEROID_SIDE):
-                        self.collisionsJoueurs(player, opponent)
-                opponent.release()
-            self.opponentsLock.release()
-        # On doit tester les collisions avec le joueur principal, et les autres adversaires
-        else:
-            # Teste avec le joueur principal
-            self.player.acquire()
-            oX = self.player.getPositionX()
-            oY = self.player.getPositionY()
-            if self.checkHit(pX, pY, dat.POD_SIDE, oX, oY, dat.ASTEROID_SIDE):
-                self.collisionsJoueurs(player, self.player)
-            self.player.release()
-            # Teste avec les autres adversaires
-            self.opponentsLock.acquire()
-            for _, opponent in self.opponents.items():
-                opponent.acquire()
-                if opponent.getPosition() is not None:
-                    oX = opponent.getPositionX()
-                    oY = opponent.getPositionY()
-                    # On ne teste pas la collision avec soi-même
-                    if player.getPseudo() != opponent.getPseudo():
-                        if self.checkHit(pX, pY, dat.POD_SIDE, oX, oY, dat.ASTEROID_SIDE):
-                            self.collisionsJoueurs(player, opponent)
-                opponent.release()
-            self.opponentsLock.release()
-
-        # Vérifie s'il y a collision avec les obstacles
-        self.obstaclesLock.acquire()
-        for obstacle in self.obstacles:
-            oX = obstacle[0]
-            oY = obstacle[1]
-            if self.checkHit(pX, pY, dat.POD_SIDE, oX, oY, dat.ASTEROID_SIDE):
-                self.collisionsObstacle(player, oX, oY)
-        self.obstaclesLock.release()
-    
-    def checkHit(self, object1X, object1Y, object1Side, object2X, object2Y, object2Side):
-        """ Vérifie si deux objets se touchent.
-        
-        Arguments:
-            object1X -- La coordonnée X de l'objet 1.
-            object1Y -- La coordonnée Y de l'objet 1.
-            object1Side -- La taille de l'objet 1.
-            object2X -- La coordonnée X de l'objet 2.
-            object2Y -- La coordonnée Y de l'objet 2.
-            object2Side -- La taille de l'objet 2.
-        
-        Returns:
-            True s'il y a collision, False sinon.
-        """
-
-        object1X -= object1Side
-        object1Y -= object1Side
-
-        object2X -= object2Side
-        object2Y -= object2Side
-        
-        distance = ((object1X - object2X) * (object1X - object2X)) + ((object1Y - object2Y) * (object1Y - object2Y))
-        # Vérifie si l'objet 1 et l'objet 2 se touchent
-        return distance <= ((object1Side/2 + object2Side/2) * (object1Side/2 + object2Side/2))
-
-    def collisionsJoueurs(self, player1, player2):
-        """ Gère les mises à jour de vecteur et de position dans le cadre d'une collision
-	        entre deux joueurs?
-        
-        Arguments:
-            player -- Le joueur.
-            obstacleX -- La coordonnée X de l'obstacle.
-            obstacleY -- La coordonnée Y de l'obstacle.
-        """
-
-        x1 = player1.getPositionX()
-        y1 = player1.getPositionY()
-        r1 = dat.POD_SIDE / 2
-
-        x2 = player2.getPositionX()
-        y2 = player2.getPositionY()
-        r2 = dat.POD_SIDE / 2
-
-        nx = (x2 - x1) / (r1 + r2)
-        ny = (y2 - y1) / (r1 + r2)
-        gx = -ny
-        gy = nx
-        v1n = nx * player1.getVectorX() + ny * player1.getVectorY()
-        v1g = gx * player1.getVectorX() + gy * player1.getVectorY()
-        v2n = nx * player2.getVectorX() + ny * player2.getVectorY()
-        v2g = gx * player2.getVectorX() + gy * player2.getVectorY()
-        d = sqrt((x1 - x2) * (x1 - x2) + (y1 - y2) * (y1 - y2))
-
-        player1.setVectorX(nx * v2n + gx * v1g)
-        player1.setVectorY(ny * v2n + gy * v1g)
-
-        player2.setVectorX(nx * v1n + gx * v2g)
-        player2.setVectorY(ny * v1n + gy * v2g)
-
-        player2.setPositionX(x1 + (r1 + r2) * (x2 - x1) / d)
-        player2.setPositionY(y1 + (r1 + r2) * (y2 - y1) / d)
-
-        # On éloigne le joueur pour que celui-ci ne touche plus l'obstacle
-        # player1.setPositionX(obstacleX + (playerR + obstacleR) * (player1.getPositionX() - obstacleX) / float(d))
-        # player1.setPositionY(obstacleY + (playerR + obstacleR) * (player1.getPositionY() - obstacleY) / float(d))
-
-    def collisionsObstacle(self, player, obstacleX, obstacleY):
-        """ Gère les mises à jour de vecteur et de position dans le cadre d'une collision
-	        entre un joueur et un obstacle.
-        
-        Arguments:
-            player -- Le joueur.
-            obstacleX -- La coordonnée X de l'obstacle.
-            obstacleY -- La coordonnée Y de l'obstacle.
-        """
-        playerX = player.getPositionX()
-        playerY = player.getPositionY()
-        playerR = dat.POD_SIDE / 2
-        obstacleR = dat.ASTEROID_SIDE / 2
-
-        nx = (playerX - obstacleX) / (obstacleR + playerR)
-        ny = (playerY - obstacleY) / (obstacleR + playerR)
-        playerPosition = player.getVectorX() * nx + player.getVectorY() * ny
-        d = sqrt((obstacleX - playerX) * (obstacleX - playerX) + (obstacleY - playerY) * (obstacleY - playerY))
-
-        player.setVectorX(player.getVectorX() - 2 * playerPosition * nx)
-        player.setVectorY(player.getVectorY() - 2 * playerPosition * ny)
-
-        player.setPositionX(obstacleX + (obstacleR + playerR) * (playerX - obstacleX) / d)
-        player.setPositionY(obstacleY + (obstacleR + playerR) * (playerY - obstacleY) / d)
 
     def sendMessage(self, target, message):
         """ Envoie un message du chat.
-            Ajoute le message au chat avant de l'envoyer depuis un autre thread (pour ne pas bloquer le thread UI)
+            Ajoute le message au chat avant de l'envoyer. L'envoi ne bloque pas le thread UI :
+            le message est seulement placé dans la file d'écriture, après les commandes du joueur.
         
         Arguments:
             target - Le destinataire du message.
             message -- Le message à envoyer.
         """
         self.graphicalApp.addMessage(target, message, fromMe=True)
-        Thread(target=self.sendMessageFromNonGUIThread, args=(target, message)).start()
-
-    def sendMessageFromNonGUIThread(self, target, message):
-        """ Envoie un message du chat.
-        
-        Arguments:
-            target - Le destinataire du message.
-            message -- Le message à envoyer.
-        """
         toSend = ""
         if target == "Public":
             toSend = "ENVOI/"+message+"/"
@@ -0,0 +1,132 @@
+# coding: utf-8
+
+from collections import deque
+import data as dat
+
+
+class InterpolationBuffer():
+    """Les derniers états reçus d'un adversaire, datés de leur arrivée.
+        L'adversaire est affiché avec un léger retard (le délai d'interpolation) : sa position est alors
+        interpolée entre les deux états reçus qui encadrent cet instant, ce qui gomme la gigue du réseau.
+        Si les états suivants tardent, la position est extrapolée à partir du dernier vecteur reçu,
+        pendant une durée bornée.
+    """
+
+    # Le délai d'interpolation par défaut, en secondes : trois TICK à 30 Hz
+    DEFAULT_DELAY = 0.1
+    # La durée maximale d'extrapolation par défaut, en secondes
+    DEFAULT_MAX_EXTRAPOLATION = 0.25
+
+    def __init__(self, maxSize=32):
+        """Constructeur.
+
+        Keyword Arguments:
+            maxSize -- Le nombre maximum d'états gardés. (default: {32})
+        """
+        self.states = deque(maxlen=maxSize)     # Des tuples (instant, x, y, vx, vy, angle)
+
+    def __len__(self):
+        return len(self.states)
+
+    def push(self, time, x, y, vx, vy, angle):
+        """Ajoute un état reçu. Un état plus ancien que le dernier reçu est ignoré,
+            un état reçu au même instant le remplace.
+
+        Arguments:
+            time -- L'instant de réception, en secondes (perf_counter).
+            x -- La coordonnée X.
+            y -- La coordonnée Y.
+            vx -- Le vecteur X.
+            vy -- Le vecteur Y.
+            angle -- L'angle en degrés.
+        """
+        if self.states and time <= self.states[-1][0]:
+            if time == self.states[-1][0]:
+                self.states[-1] = (time, x, y, vx, vy, angle)
+            return
+        self.states.append((time, x, y, vx, vy, angle))
+
+    def clear(self):
+        """Oublie tous les états reçus."""
+        self.states.clear()
+
+    def sample(self, renderTime, maxExtrapolation):
+        """Calcule l'état d'un adversaire à un instant donné.
+            Les états devenus inutiles (antérieurs à l'intervalle encadrant l'instant) sont oubliés.
+
+        Arguments:
+            renderTime -- L'instant voulu, en secondes (perf_counter), c'est-à-dire maintenant moins le délai d'interpolation.
+            maxExtrapolation -- La durée maximale d'extrapolation après le dernier état reçu, en secondes.
+
+        Returns:
+            tuple(x, y, vx, vy, angle) -- L'état de l'adversaire, None si aucun état n'a été reçu.
+        """
+        states = self.states
+        if not states:
+            return None
+        while len(states) > 2 and states[1][0] <= renderTime:
+            states.popleft()
+
+        first = states[0]
+        if renderTime <= first[0]:
+            return first[1:]
+        if len(states) == 1 or states[1][0] <= renderTime:
+            return self.extrapolate(states[-1], min(renderTime - states[-1][0], maxExtrapolation))
+
+        second = states[1]
+        alpha = (renderTime - first[0]) / (second[0] - first[0])
+        # L'arène est un tore : on interpole selon le plus court chemin
+        x = InterpolationBuffer.wrap(first[1] + InterpolationBuffer.shortest(second[1] - first[1], dat.ARENA_L) * alpha,
+                                     dat.ARENA_L)
+        y = InterpolationBuffer.wrap(first[2] + InterpolationBuffer.shortest(second[2] - first[2], dat.ARENA_H) * alpha,
+                                     dat.ARENA_H)
+        vx = first[3] + (second[3] - first[3]) * alpha
+        vy = first[4] + (second[4] - first[4]) * alpha
+        angle = round(first[5] + ((second[5] - first[5] + 180) % 360 - 180) * alpha) % 360
+        return (x, y, vx, vy, angle)
+
+    def extrapolate(self, state, elapsed):
+        """Prolonge un état en suivant son vecteur, comme le ferait la physique du client.
+
+        Arguments:
+            state -- L'état (instant, x, y, vx, vy, angle).
+            elapsed -- La durée de l'extrapolation, en secondes.
+
+        Returns:
+            tuple(x, y, vx, vy, angle) -- L'état extrapolé.
+        """
+        # Le vecteur est appliqué une fois par image du client
+        frames = max(0.0, elapsed) * dat.REFRESH_TICRATE
+        x = InterpolationBuffer.wrap(state[1] + state[3] * frames, dat.ARENA_L)
+        y = InterpolationBuffer.wrap(state[2] + state[4] * frames, dat.ARENA_H)
+        return (x, y, state[3], state[4], state[5])
+
+    @staticmethod
+    def shortest(delta, half):
+        """Ramène un écart sur un axe de l'arène au plus court chemin.
+
+        Arguments:
+            delta -- L'écart.
+            half -- La demi-largeur de l'arène sur cet axe.
+
+        Returns:
+            L'écart le plus court, entre -half et half.
+        """
+        if delta > half:
+            return delta - 2 * half
+        if delta < -half:
+            return delta + 2 * half
+        return delta
+
+    @staticmethod
+    def wrap(value, half):
+        """Ramène une coordonnée dans l'arène.
+
+        Arguments:
+            value -- La coordonnée.
+            half -- La demi-largeur de l'arène sur cet axe.
+
+        Returns:
+            La coordonnée, entre -half et half.
+        """
+        return (value + half) % (2 * half) - half
@@ -0,0 +1,85 @@
+# coding: utf-8
+
+from math import floor
+import data as dat
+
+
+class ObstacleGrid():
+    """Index spatial des obstacles : une grille uniforme couvrant l'arène.
+        Les obstacles ne bougent pas, la grille est donc construite une seule fois à leur réception.
+        Chaque case a pour côté la distance de contact entre un pod et un astéroïde :
+        une recherche ne parcourt donc qu'au plus 2 x 2 cases, quel que soit le nombre d'obstacles.
+    """
+
+    def __init__(self, obstacles):
+        """Constructeur.
+
+        Arguments:
+            obstacles -- Les coordonnées (x, y) des obstacles.
+        """
+        self.obstacles = tuple(obstacles)
+        self.radius = dat.POD_SIDE / 2 + dat.ASTEROID_SIDE / 2
+        self.cellSide = 2 * self.radius
+        # Le test de contact compare les coins des images (x - côté, y - côté) : la grille les range de la même façon
+        self.originX = -dat.ARENA_L - dat.ASTEROID_SIDE
+        self.originY = -dat.ARENA_H - dat.ASTEROID_SIDE
+        self.nbColumns = max(1, int(floor(2 * dat.ARENA_L / self.cellSide)) + 1)
+        self.nbRows = max(1, int(floor(2 * dat.ARENA_H / self.cellSide)) + 1)
+        self.cells = [[] for _ in range(0, self.nbColumns * self.nbRows)]
+        # Les obstacles sont ajoutés dans l'ordre : chaque case reste triée par indice
+        for (index, (obstacleX, obstacleY)) in enumerate(self.obstacles):
+            column = self.getColumn(obstacleX - dat.ASTEROID_SIDE - self.originX)
+            row = self.getRow(obstacleY - dat.ASTEROID_SIDE - self.originY)
+            self.cells[row * self.nbColumns + column].append(index)
+
+    def __len__(self):
+        return len(self.obstacles)
+
+    def getColumn(self, offsetX):
+        """Calcule la colonne d'une abscisse, ramenée dans la grille.
+            Un obstacle ou un pod hors de l'arène est rangé dans la case du bord le plus proche,
+            ce qui garde la recherche exacte sans avoir à agrandir la grille.
+
+        Arguments:
+            offsetX -- L'abscisse relative à l'origine de la grille.
+
+        Returns:
+            L'indice de la colonne.
+        """
+        return min(self.nbColumns - 1, max(0, int(floor(offsetX / self.cellSide))))
+
+    def getRow(self, offsetY):
+        """Calcule la ligne d'une ordonnée, ramenée dans la grille.
+
+        Arguments:
+            offsetY -- L'ordonnée relative à l'origine de la grille.
+
+        Returns:
+            L'indice de la ligne.
+        """
+        return min(self.nbRows - 1, max(0, int(floor(offsetY / self.cellSide))))
+
+    def query(self, podX, podY):
+        """Cherche les obstacles qu'un pod peut toucher.
+
+        Arguments:
+            podX -- La coordonnée X du pod.
+            podY -- La coordonnée Y du pod.
+
+        Returns:
+            Les indices des obstacles candidats, dans l'ordre de réception des obstacles.
+        """
+        hitX = podX - dat.POD_SIDE - self.originX
+        hitY = podY - dat.POD_SIDE - self.originY
+        firstColumn = self.getColumn(hitX - self.radius)
+        lastColumn = self.getColumn(hitX + self.radius)
+        firstRow = self.getRow(hitY - self.radius)
+        lastRow = self.getRow(hitY + self.radius)
+        if firstColumn == lastColumn and firstRow == lastRow:
+            return self.cells[firstRow * self.nbColumns + firstColumn]
+        candidates = []
+        for row in range(firstRow, lastRow + 1):
+            for column in range(firstColumn, lastColumn + 1):
+                candidates.extend(self.cells[row * self.nbColumns + column])
+        candidates.sort()
+        return candidates
@@ -0,0 +1,353 @@
+# coding: utf-8
+
+from math import sqrt, cos, sin, radians
+import data as dat
+from physics.ObstacleGrid import ObstacleGrid
+
+
+class World():
+    """Met à jour la physique de tous les pods d'une image en une seule fois.
+        L'état de chaque pod est lu et écrit en un seul appel (getState, setState), puis les pods sont déplacés un par un.
+        Les obstacles, qui ne bougent pas, sont rangés une fois pour toutes dans une grille (voir ObstacleGrid).
+        Les collisions entre pods sont ensuite traitées en une seule passe, chaque paire n'étant testée qu'une fois.
+    """
+
+    # En dessous de ce nombre de pods, comparer toutes les paires coûte moins cher que de remplir la grille
+    MIN_PODS_FOR_GRID = 16
+
+    def __init__(self):
+        self.grid = ObstacleGrid(())
+        self.podCells = None
+
+    def setObstacles(self, obstacles):
+        """Remplace les obstacles du monde et reconstruit leur index spatial.
+
+        Arguments:
+            obstacles -- Les obstacles : des tuples dont les deux premiers éléments sont les coordonnées X et Y.
+        """
+        self.grid = ObstacleGrid([(o[0], o[1]) for o in obstacles])
+
+    def step(self, pods, fixedPods=()):
+        """Fait avancer tous les pods d'une image.
+            Ne doit être appelée que par la simulation, seule à modifier les pods.
+
+        Arguments:
+            pods -- Les pods ayant une position.
+
+        Keyword Arguments:
+            fixedPods -- Des pods dont l'état est imposé (des adversaires interpolés) : ils ne sont ni déplacés
+                         ni modifiés, mais les autres pods rebondissent sur eux. (default: {()})
+        """
+        if not pods:
+            return
+        states = self.moveScalar(pods)
+        grid = self.grid
+        if len(grid) > 0:
+            self.bounceAll(states, self.findObstacleContacts(states, grid))
+        if len(states) + len(fixedPods) > 1:
+            allStates = states + [list(pod.getState()) for pod in fixedPods]
+            for (first, second) in self.findPodPairs(allStates):
+                # Les pods imposés sont à la fin de allStates : dans une paire, seul le second peut l'être.
+                # Deux pods imposés ne se touchent pas : leurs états viennent du serveur
+                if second < len(states):
+                    self.collidePods(allStates[first], allStates[second])
+                elif first < len(states):
+                    self.bounceOffFixedPod(allStates[first], allStates[second])
+        for (pod, state) in zip(pods, states):
+            pod.setState(state[0], state[1], state[2], state[3])
+
+    def moveScalar(self, pods):
+        """Déplace les pods un par un.
+
+        Arguments:
+            pods -- Les pods ayant une position.
+
+        Returns:
+            Une liste [x, y, vx, vy] par pod.
+        """
+        states = []
+        for pod in pods:
+            state = list(pod.getState())
+            World.moveState(state)
+            states.append(state)
+        return states
+
+    @staticmethod
+    def moveState(state):
+        """Déplace un pod d'une image selon son vecteur.
+
+        Arguments:
+            state -- La liste [x, y, vx, vy] du pod, modifiée en place.
+        """
+        arenaL = dat.ARENA_L
+        arenaH = dat.ARENA_H
+        x = state[0] + state[2]
+        y = state[1] + state[3]
+
+        # Le pod quitte le canvas par la droite ou par la gauche
+        if x > arenaL:
+            x = -arenaL + (x - arenaL)
+        if x < -arenaL:
+            x = arenaL - (x + arenaL)
+        # Le pod quitte le canvas par le haut ou par le bas
+        if y > arenaH:
+            y = -arenaH + (y - arenaH)
+        if y < -arenaH:
+            y = arenaH - (y + arenaH)
+        state[0] = x
+        state[1] = y
+
+    def applyCommand(self, state, angle, angleCommand, thrustCommand, move=True):
+        """Applique une commande à un pod puis le déplace d'une image, comme Pod.updateFromCommand du serveur.
+            Sert à rejouer les commandes que le serveur n'a pas encore traitées : le pod rebondit
+            sur les obstacles, mais pas sur les autres pods dont on ne connaît pas les états passés.
+
+        Arguments:
+            state -- La liste [x, y, vx, vy] du pod, modifiée en place.
+            angle -- L'angle du pod en degrés.
+            angleCommand -- La rotation demandée, en degrés.
+            thrustCommand -- Le nombre de poussées demandées.
+
+        Keyword Arguments:
+            move -- Déplace le pod après la commande, False pour une commande que le serveur n'a pas encore reçue. (default: {True})
+
+        Returns:
+            Le nouvel angle du pod, en degrés.
+        """
+        angle = (angle + angleCommand) % 360
+        if thrustCommand != 0:
+            radianAngle = radians(angle)
+            state[2] += (dat.THRUST_IT * thrustCommand) * cos(radianAngle)
+            state[3] += (dat.THRUST_IT * thrustCommand) * -sin(radianAngle)
+        if move:
+            World.moveState(state)
+            if len(self.grid) > 0:
+                self.bounceAll([state], self.findObstacleContacts([state], self.grid))
+        return angle
+
+    def findObstacleContacts(self, states, grid):
+        """Cherche en une passe tous les contacts entre les pods et les obstacles.
+            Seuls les obstacles des cases voisines de chaque pod dans la grille sont testés.
+            Le test se fait sur les positions atteintes avant tout rebond.
+
+        Arguments:
+            states -- Les listes [x, y, vx, vy] des pods.
+            grid -- L'index spatial des obstacles.
+
+        Returns:
+            Les paires (indice du pod, indice de l'obstacle), triées.
+        """
+        podSide = dat.POD_SIDE
+        asteroidSide = dat.ASTEROID_SIDE
+        hitDistance = (podSide / 2 + asteroidSide / 2) * (podSide / 2 + asteroidSide / 2)
+        obstacles = grid.obstacles
+        contacts = []
+        for (podIndex, state) in enumerate(states):
+            hitX = state[0] - podSide
+            hitY = state[1] - podSide
+            for index in grid.query(state[0], state[1]):
+                (obstacleX, obstacleY) = obstacles[index]
+                dx = hitX - (obstacleX - asteroidSide)
+                dy = hitY - (obstacleY - asteroidSide)
+                if dx * dx + dy * dy <= hitDistance:
+                    contacts.append((podIndex, index))
+        return contacts
+
+    def bounceAll(self, states, contacts):
+        """Fait rebondir les pods sur les obstacles qu'ils touchent.
+            Les rebonds d'un même pod sont appliqués dans l'ordre de réception des obstacles.
+
+        Arguments:
+            states -- Les listes [x, y, vx, vy] des pods, modifiées en place.
+            contacts -- Les paires (indice du pod, indice de l'obstacle) renvoyées par findObstacleContacts.
+        """
+        radius = dat.ASTEROID_SIDE / 2 + dat.POD_SIDE / 2
+        obstacles = self.grid.obstacles
+        for (podIndex, index) in contacts:
+            state = states[podIndex]
+            (x, y, vx, vy) = state
+            (obstacleX, obstacleY) = obstacles[index]
+            nx = (x - obstacleX) / radius
+            ny = (y - obstacleY) / radius
+            p = vx * nx + vy * ny
+            d = sqrt((obstacleX - x) * (obstacleX - x) + (obstacleY - y) * (obstacleY - y))
+            state[2] = vx - 2 * p * nx
+            state[3] = vy - 2 * p * ny
+            if d > 0:
+                state[0] = obstacleX + radius * (x - obstacleX) / d
+                state[1] = obstacleY + radius * (y - obstacleY) / d
+
+    def findPodPairs(self, states):
+        """Cherche les paires de pods qui se touchent.
+            Les pods sont rangés dans une grille couvrant le tore de l'arène, dont les cases ont au moins
+            le côté d'un pod : seuls les pods d'une même case ou de deux cases voisines, en tenant compte
+            du passage d'un bord de l'arène à l'autre, sont comparés, puis filtrés selon leur distance exacte.
+
+        Arguments:
+            states -- Les listes [x, y, vx, vy] des pods.
+
+        Returns:
+            Les paires (i, j), i < j, d'indices de pods qui se touchent, triées.
+        """
+        hitDistance = dat.POD_SIDE * dat.POD_SIDE
+        arenaL = dat.ARENA_L
+        arenaH = dat.ARENA_H
+        pairs = []
+        for (indices, candidates) in self.groupPods(states):
+            for i in indices:
+                (x, y) = (states[i][0], states[i][1])
+                for j in candidates:
+                    if j <= i:
+                        continue
+                    # Le plus court chemin sur le tore, calculé ici plutôt que par torusOffset pour aller plus vite
+                    dx = abs(states[j][0] - x)
+                    if dx > arenaL:
+                        dx = 2 * arenaL - dx
+                    dy = abs(states[j][1] - y)
+                    if dy > arenaH:
+                        dy = 2 * arenaH - dy
+                    if dx * dx + dy * dy <= hitDistance:
+                        pairs.append((i, j))
+        pairs.sort()
+        return pairs
+
+    def groupPods(self, states):
+        """Range les pods dans la grille des pods.
+
+        Arguments:
+            states -- Les listes [x, y, vx, vy] des pods.
+
+        Returns:
+            Des tuples (indices, candidats) : les indices des pods d'une case et ceux des pods de la case
+            et des cases voisines. Avec peu de pods, toute l'arène forme une seule case.
+        """
+        if len(states) < World.MIN_PODS_FOR_GRID:
+            indices = range(0, len(states))
+            return [(indices, indices)]
+
+        if self.podCells is None:
+            self.podCells = self.buildPodCells()
+        (nbColumns, nbRows, cellWidth, cellHeight, neighbours) = self.podCells
+        arenaL = dat.ARENA_L
+        arenaH = dat.ARENA_H
+        cells = {}
+        for (i, state) in enumerate(states):
+            column = int((state[0] + arenaL) // cellWidth) % nbColumns
+            row = int((state[1] + arenaH) // cellHeight) % nbRows
+            cell = row * nbColumns + column
+            if cell in cells:
+                cells[cell].append(i)
+            else:
+                cells[cell] = [i]
+
+        groups = []
+        for (cell, indices) in cells.items():
+            candidates = [j for neighbour in neighbours[cell] if neighbour in cells for j in cells[neighbour]]
+            if len(candidates) > 1:
+                groups.append((indices, candidates))
+        return groups
+
+    def buildPodCells(self):
+        """Construit la grille des pods, qui ne dépend que des dimensions de l'arène et des pods.
+
+        Returns:
+            tuple(nbColumns, nbRows, cellWidth, cellHeight, neighbours) -- Les dimensions de la grille et,
+            pour chaque case, les indices des cases voisines et d'elle-même.
+        """
+        podSide = dat.POD_SIDE
+        nbColumns = max(1, int(2 * dat.ARENA_L // podSide))
+        nbRows = max(1, int(2 * dat.ARENA_H // podSide))
+        neighbours = []
+        for row in range(0, nbRows):
+            for column in range(0, nbColumns):
+                # Sur une petite arène, une même case peut être voisine par plusieurs côtés
+                neighbours.append(tuple({((row + dr) % nbRows) * nbColumns + (column + dc) % nbColumns
+                                         for dr in (-1, 0, 1) for dc in (-1, 0, 1)}))
+        return (nbColumns, nbRows, 2 * dat.ARENA_L / nbColumns, 2 * dat.ARENA_H / nbRows, neighbours)
+
+    @staticmethod
+    def torusOffset(x1, y1, x2, y2):
+        """Calcule le plus court chemin d'un point à un autre, l'arène étant un tore.
+
+        Arguments:
+            x1 -- La coordonnée X du premier point.
+            y1 -- La coordonnée Y du premier point.
+            x2 -- La coordonnée X du second point.
+            y2 -- La coordonnée Y du second point.
+
+        Returns:
+            tuple(dx, dy) -- Le déplacement du premier point au second.
+        """
+        dx = x2 - x1
+        if dx > dat.ARENA_L:
+            dx -= 2 * dat.ARENA_L
+        elif dx < -dat.ARENA_L:
+            dx += 2 * dat.ARENA_L
+        dy = y2 - y1
+        if dy > dat.ARENA_H:
+            dy -= 2 * dat.ARENA_H
+        elif dy < -dat.ARENA_H:
+            dy += 2 * dat.ARENA_H
+        return (dx, dy)
+
+    def bounceOffFixedPod(self, state, fixedState):
+        """Fait rebondir un pod sur un pod imposé s'ils se touchent.
+            Le pod imposé n'est pas modifié : seul l'autre pod est repoussé à un côté de pod de lui
+            et, s'il s'en approche, voit la composante normale de son vecteur inversée.
+            Sans cela, un pod qui chevauche un pod imposé pourrait rester bloqué contre lui.
+
+        Arguments:
+            state -- La liste [x, y, vx, vy] du pod, modifiée en place.
+            fixedState -- La liste [x, y, vx, vy] du pod imposé.
+        """
+        podSide = dat.POD_SIDE
+        (x, y, vx, vy) = state
+        (dx, dy) = World.torusOffset(fixedState[0], fixedState[1], x, y)
+        d = sqrt(dx * dx + dy * dy)
+        if d > podSide:
+            return
+        if d == 0:
+            # Les deux pods sont confondus : le pod est repoussé d'où il vient
+            (dx, dy) = (-vx, -vy) if (vx, vy) != (0, 0) else (1, 0)
+            d = sqrt(dx * dx + dy * dy)
+
+        nx = dx / d
+        ny = dy / d
+        p = vx * nx + vy * ny
+        if p < 0:
+            state[2] = vx - 2 * p * nx
+            state[3] = vy - 2 * p * ny
+        state[0] = fixedState[0] + podSide * nx
+        state[1] = fixedState[1] + podSide * ny
+
+    def collidePods(self, state1, state2):
+        """Fait rebondir deux pods l'un sur l'autre s'ils se touchent.
+            Les pods échangent la composante normale de leur vecteur et le second est repoussé.
+
+        Arguments:
+            state1 -- La liste [x, y, vx, vy] du premier pod, modifiée en place.
+            state2 -- La liste [x, y, vx, vy] du second pod, modifiée en place.
+        """
+        podSide = dat.POD_SIDE
+        (x1, y1, vx1, vy1) = state1
+        (x2, y2, vx2, vy2) = state2
+        (dx, dy) = World.torusOffset(x1, y1, x2, y2)
+        d = sqrt(dx * dx + dy * dy)
+        if d > podSide or d == 0:
+            return
+
+        nx = dx / podSide
+        ny = dy / podSide
+        gx = -ny
+        gy = nx
+        v1n = nx * vx1 + ny * vy1
+        v1g = gx * vx1 + gy * vy1
+        v2n = nx * vx2 + ny * vy2
+        v2g = gx * vx2 + gy * vy2
+
+        state1[2] = nx * v2n + gx * v1g
+        state1[3] = ny * v2n + gy * v1g
+        state2[2] = nx * v1n + gx * v2g
+        state2[3] = ny * v1n + gy * v2g
+        state2[0] = x1 + podSide * dx / d
+        state2[1] = y1 + podSide * dy / d
@@ -0,0 +1,29 @@
+# coding: utf-8
+
+from collections import namedtuple
+
+
+class WorldSnapshot(namedtuple("WorldSnapshot", ("frame", "player", "opponents", "commands", "inputFrame", "inputTime"))):
+    """L'état de tous les joueurs à la fin d'une image.
+        Le dispatcher publie un nouvel instantané à chaque image en remplaçant simplement sa référence :
+        l'affichage et les autres lecteurs n'ont donc besoin d'aucun verrou, et ne bloquent jamais la simulation.
+        Les joueurs sont des PodSnapshot, les adversaires un tuple dans l'ordre du dictionnaire du dispatcher.
+        frame est le nombre de pas de simulation faits, commands les commandes accumulées par le joueur,
+        lues par le thread d'envoi des commandes, inputFrame et inputTime le pas et l'instant de la première touche
+        appliquée depuis le dernier envoi.
+    """
+    __slots__ = ()
+
+    def getPods(self):
+        """Getteur sur tous les joueurs de l'instantané, le joueur local en premier.
+
+        Returns:
+            Un tuple de PodSnapshot.
+        """
+        if self.player is None:
+            return self.opponents
+        return (self.player,) + self.opponents
+
+
+# L'instantané publié tant qu'aucune session n'est en cours
+WorldSnapshot.EMPTY = WorldSnapshot(0, None, (), (0, 0), 0, None)
@@ -0,0 +1,141 @@
+# coding: utf-8
+
+from collections import deque
+from threading import Lock
+
+
+class InputHistory():
+    """Les commandes du joueur envoyées au serveur et qu'il n'a pas encore traitées.
+        Chaque commande envoyée porte un numéro de séquence ; le serveur indique avec ACK le dernier numéro traité
+        avant chaque TICK. Le joueur est alors recalé sur l'état du TICK et les commandes suivantes sont rejouées.
+        Mesure aussi l'erreur de prédiction, la distance dont le joueur est déplacé à chaque recalage,
+        et le délai entre une touche appuyée et l'acquittement de la commande qui la contient.
+    """
+
+    def __init__(self, maxSize=256, nbSamples=1024):
+        """Constructeur.
+
+        Keyword Arguments:
+            maxSize -- Le nombre maximum de commandes gardées, les plus anciennes sont oubliées. (default: {256})
+            nbSamples -- Le nombre d'erreurs de prédiction récentes gardées pour les percentiles. (default: {1024})
+        """
+        # Le thread d'envoi des commandes ajoute, celui de lecture des messages acquitte
+        self.lock = Lock()
+        # Des tuples (numéro, rotation en degrés, nombre de poussées, instant d'envoi, instant de la première touche)
+        self.inputs = deque(maxlen=maxSize)
+        self.sentTotals = (0, 0)
+        self.lastAcked = 0
+        self.errors = deque(maxlen=nbSamples)
+        self.nbCorrections = 0
+        self.errorSum = 0.0
+        self.maxError = 0.0
+        self.nbReplayed = 0
+        self.ackDelays = deque(maxlen=nbSamples)
+
+    def __len__(self):
+        return len(self.inputs)
+
+    def push(self, seq, angleCommand, thrustCommand, sentTotals, sendTime, inputTime=None):
+        """Ajoute une commande envoyée. Une commande déjà acquittée est ignorée.
+
+        Arguments:
+            seq -- Le numéro de séquence de la commande.
+            angleCommand -- La rotation demandée, en degrés.
+            thrustCommand -- Le nombre de poussées demandées.
+            sentTotals -- Les totaux (rotation, poussées) des commandes du joueur envoyées, celle-ci comprise.
+            sendTime -- L'instant d'envoi (perf_counter).
+
+        Keyword Arguments:
+            inputTime -- L'instant de la première touche contenue dans la commande, None s'il n'y en a pas. (default: {None})
+        """
+        with self.lock:
+            self.sentTotals = sentTotals
+            if seq > self.lastAcked:
+                self.inputs.append((seq, angleCommand, thrustCommand, sendTime, inputTime))
+
+    def acknowledge(self, seq, now):
+        """Oublie les commandes traitées par le serveur.
+
+        Arguments:
+            seq -- Le numéro de la dernière commande traitée par le serveur.
+            now -- L'instant de réception de l'acquittement (perf_counter).
+
+        Returns:
+            Le délai entre l'envoi de la commande seq et son acquittement, None si elle était déjà acquittée.
+        """
+        sendDelay = None
+        with self.lock:
+            self.lastAcked = max(self.lastAcked, seq)
+            while self.inputs and self.inputs[0][0] <= self.lastAcked:
+                (ackedSeq, _, _, sendTime, inputTime) = self.inputs.popleft()
+                if inputTime is not None:
+                    self.ackDelays.append(now - inputTime)
+                if ackedSeq == seq:
+                    sendDelay = now - sendTime
+        return sendDelay
+
+    def getPending(self):
+        """Getteur sur les commandes que le serveur n'a pas encore traitées.
+
+        Returns:
+            tuple(commandes, sentTotals) -- Les commandes, des tuples (numéro, rotation, poussées, ...) dans l'ordre,
+                                            et les totaux des commandes envoyées.
+        """
+        with self.lock:
+            return (list(self.inputs), self.sentTotals)
+
+    def clear(self):
+        """Oublie les commandes envoyées, pour un nouveau joueur. Les mesures sont conservées."""
+        with self.lock:
+            self.inputs.clear()
+            self.sentTotals = (0, 0)
+
+    def recordCorrection(self, error, nbReplayed):
+        """Enregistre un recalage.
+
+        Arguments:
+            error -- La distance entre la position prédite et la position recalée.
+            nbReplayed -- Le nombre de commandes rejouées.
+        """
+        self.errors.append(error)
+        self.nbCorrections += 1
+        self.errorSum += error
+        self.maxError = max(self.maxError, error)
+        self.nbReplayed += nbReplayed
+
+    def getStats(self):
+        """Getteur sur les mesures de la prédiction.
+
+        Returns:
+            tuple(nbCorrections, meanError, p95Error, maxError, meanReplayed) -- Le nombre de recalages,
+            l'erreur moyenne, le 95e percentile des erreurs récentes, l'erreur maximale
+            et le nombre moyen de commandes rejouées. None s'il n'y a eu aucun recalage.
+        """
+        if self.nbCorrections == 0:
+            return None
+        recent = sorted(self.errors)
+        p95 = recent[min(len(recent) - 1, int(len(recent) * 0.95))]
+        return (self.nbCorrections, self.errorSum / self.nbCorrections, p95, self.maxError,
+                self.nbReplayed / self.nbCorrections)
+
+    def getAckDelays(self):
+        """Getteur sur le délai entre une touche et l'acquittement de sa commande.
+
+        Returns:
+            tuple(nbSamples, mean, p95) -- Le nombre de mesures récentes, leur moyenne et leur 95e percentile
+            en secondes. None s'il n'y a eu aucune mesure.
+        """
+        delays = sorted(self.ackDelays)
+        if not delays:
+            return None
+        return (len(delays), sum(delays) / len(delays), delays[min(len(delays) - 1, int(len(delays) * 0.95))])
+
+    def formatStats(self):
+        """Met en forme les mesures de la prédiction."""
+        stats = self.getStats()
+        text = "no correction" if stats is None else \
+            "%d corrections, error mean %.2f p95 %.2f max %.2f, %.1f inputs replayed" % stats
+        delays = self.getAckDelays()
+        if delays is not None:
+            text += ", input-to-ack mean %.1f ms p95 %.1f ms" % (delays[1] * 1000, delays[2] * 1000)
+        return text
@@ -0,0 +1,61 @@
+# coding: utf-8
+
+from collections import deque
+
+
+class InputQueue():
+    """La file des appuis et relâchements de touches du joueur.
+        Le thread de l'interface graphique ajoute les événements sans prendre de verrou (deque.append est atomique),
+        la simulation les lit une seule fois par image : une touche maintenue agit une fois par image,
+        quelle que soit la répétition automatique du système, et une touche appuyée puis relâchée
+        entre deux images agit une fois. Les commandes d'une image ne dépendent donc que des touches.
+    """
+
+    # Les actions, dans l'ordre où elles sont appliquées : la poussée suit l'angle de l'image
+    ANTICLOCK = "antiClock"
+    CLOCK = "clock"
+    THRUST = "thrust"
+    ACTIONS = (ANTICLOCK, CLOCK, THRUST)
+
+    def __init__(self):
+        self.events = deque()   # Des tuples (action, appuyée)
+        self.held = set()       # Les actions maintenues, lues seulement par la simulation
+
+    def press(self, action):
+        """Signale l'appui sur une touche. Peut être appelée depuis n'importe quel thread.
+
+        Arguments:
+            action -- L'action de la touche, une des InputQueue.ACTIONS.
+        """
+        self.events.append((action, True))
+
+    def release(self, action):
+        """Signale le relâchement d'une touche. Peut être appelée depuis n'importe quel thread.
+
+        Arguments:
+            action -- L'action de la touche, une des InputQueue.ACTIONS.
+        """
+        self.events.append((action, False))
+
+    def releaseAll(self):
+        """Relâche toutes les touches, par exemple quand la fenêtre perd le focus."""
+        for action in InputQueue.ACTIONS:
+            self.release(action)
+
+    def drain(self):
+        """Lit les événements reçus depuis le dernier appel. Seule la simulation doit appeler cette méthode.
+
+        Returns:
+            Les actions à appliquer pendant cette image, dans l'ordre de InputQueue.ACTIONS.
+        """
+        events = self.events
+        pressed = set()
+        while events:
+            (action, down) = events.popleft()
+            if down:
+                self.held.add(action)
+                pressed.add(action)
+            else:
+                self.held.discard(action)
+        active = self.held | pressed if pressed else self.held
+        return [action for action in InputQueue.ACTIONS if action in active]
@@ -1,14 +1,17 @@
 # coding: utf-8
 
 from player.Pair import Pair
-from threading import RLock
+from player.PodSnapshot import PodSnapshot
 from math import cos, sin, radians, degrees
 import data as dat
 
 
 class PlayerPod():
-    """La classe PlayerPod. Représente un joueur."""
-    def __init__(self, pseudo, initialPosition, initialAngle, canvasTagId, image, photoImage):
+    """ La classe PlayerPod. Représente un joueur.
+        Un joueur n'a pas de verrou : une fois la session lancée, seule la simulation le modifie,
+        les autres threads lisent les instantanés qu'elle publie.
+    """
+    def __init__(self, pseudo, initialPosition, initialAngle, canvasTagId, image, photoImage, sprite=None):
         """constructeur
         
         Arguments:
@@ -17,6 +20,9 @@ class PlayerPod():
             initialAngle -- L'angle initial du joueur.
             canvasTagId -- Le tag du joueur dans le canvas.
             image -- L'image du joueur.
+
+        Keyword Arguments:
+            sprite -- Le chemin du sprite de l'image, qui identifie ses rotations en cache. (default: {None})
         """
         self.pseudo = pseudo
         self.position = initialPosition
@@ -24,32 +30,17 @@ class PlayerPod():
         self.canvasTagId = canvasTagId
         self.image = image
         self.photoImage = photoImage
+        self.sprite = sprite
         self.vector = Pair(0, 0)
         self.updateVector()
-        self.lock = RLock()
         self.angleCommand = 0
         self.thrustCommand = 0
+        self.dirty = True           # L'état a changé depuis le dernier instantané
+        self.lastSnapshot = None
 
     def __str__(self):
         return "Position - " + str(self.position) + ", Vecteur - " + str(self.vector) + ", Angle - " + str(self.angle)
 
-    def acquire(self, blocking=True, timeout=-1):
-        """Tente d'obtenir le verrou du joueur.
-        
-        Keyword Arguments:
-            blocking  -- La tentative doit-elle être bloquante ? (default: {True})
-            timeout -- Le délai d'attente maximum pour obtenir le verrou (default: {-1})
-        
-        Returns:
-            True si le verrou à été obtenu, False sinon.
-        """
-        return self.lock.acquire(blocking=blocking, timeout=timeout)
-
-
-    def release(self):
-        """Relâche le verrou du joueur."""
-        self.lock.release()
-
     def getPseudo(self):
         """Getteur sur le pseudo du joueur.
         
@@ -81,6 +72,7 @@ class PlayerPod():
             newX -- La nouvelle coordonnée X du joueur.
         """
         self.position.setX(newX)
+        self.dirty = True
 
     def getPositionY(self):
         """Getteur sur la coordonnée Y du joueur.
@@ -97,6 +89,7 @@ class PlayerPod():
             newY -- La nouvelle coordonnée Y du joueur.
         """
         self.position.setY(newY)
+        self.dirty = True
 
     def getVectorX(self):
         """Getteur sur le vecteur X du joueur.
@@ -113,6 +106,7 @@ class PlayerPod():
             newX -- Le vecteur X du joueur.
         """
         self.vector.setX(newX)
+        self.dirty = True
 
     def getVectorY(self):
         """Getteur sur le vecteur Y du joueur.
@@ -129,6 +123,7 @@ class PlayerPod():
             newY -- Le vecteur Y du joueur.
         """
         self.vector.setY(newY)
+        self.dirty = True
 
     def getAngle(self):
         """Getteur sur l'angle du joueur.
@@ -145,6 +140,7 @@ class PlayerPod():
             newAngle -- Le nouvel angle.
         """
         self.angle = newAngle
+        self.dirty = True
 
     def getCanvasTagId(self):
         """Getteur sur le tag du joueur pour le canvas de l'interface graphique.
@@ -161,6 +157,7 @@ class PlayerPod():
             newId -- Le nouveau tag du joueur.
         """
         self.canvasTagId = newId
+        self.dirty = True
 
     def getImage(self):
         """Getteur sur l'image du joueur dans l'interface graphique.
@@ -177,6 +174,15 @@ class PlayerPod():
             image -- La nouvelle image du joueur.
         """
         self.image = image
+        self.dirty = True
+
+    def getSprite(self):
+        """Getteur sur le chemin du sprite du joueur dans l'interface graphique.
+        
+        Returns:
+            Le chemin du sprite du joueur.
+        """
+        return self.sprite
 
     def setPhotoImage(self, photoImage):
         """Setteur sur la photoImage du joueur dans l'interface graphique.
@@ -192,7 +198,29 @@ class PlayerPod():
         Returns:
             Les commandes effectuées sur le pod.
         """
-        return "A" + str(radians(self.angleCommand)) + "T" + str(self.thrustCommand)
+        return PlayerPod.formatCommand(self.angleCommand, self.thrustCommand)
+
+    @staticmethod
+    def formatCommand(angleCommand, thrustCommand):
+        """Met en forme des commandes comme spécifié dans le protocole.
+
+        Arguments:
+            angleCommand -- La rotation demandée, en degrés.
+            thrustCommand -- Le nombre de poussées demandées.
+
+        Returns:
+            Les commandes sous forme d'une chaîne de caractère.
+        """
+        return "A" + str(radians(angleCommand)) + "T" + str(thrustCommand)
+
+    def getCommandTotals(self):
+        """Getteur sur les commandes accumulées depuis le dernier reset.
+            Les autres threads les lisent dans l'instantané publié par la simulation (WorldSnapshot.commands).
+
+        Returns:
+            tuple(angleCommand, thrustCommand) -- La rotation en degrés et le nombre de poussées.
+        """
+        return (self.angleCommand, self.thrustCommand)
     
     def resetCommand(self):
         """Reset des commandes du joueur."""
@@ -209,6 +237,47 @@ class PlayerPod():
         newVY = self.getVectorY() * -sin(radians(self.getAngle()))
         self.setVectorY(newVY)
 
+    def getState(self):
+        """Getteur sur la position et le vecteur du joueur en un seul appel.
+
+        Returns:
+            tuple(x, y, vx, vy) -- La position et le vecteur du joueur.
+        """
+        return (self.position.x, self.position.y, self.vector.x, self.vector.y)
+
+    def setState(self, newX, newY, newVX, newVY):
+        """Setteur de la position et du vecteur du joueur en un seul appel.
+            Le joueur n'est marqué comme modifié que si l'une des valeurs change.
+
+        Arguments:
+            newX  -- La nouvelle coordonnée X.
+            newY -- La nouvelle coordonnée Y.
+            newVX -- Le nouveau vecteur X.
+            newVY -- Le nouveau vecteur Y.
+        """
+        if (newX == self.position.x and newY == self.position.y
+                and newVX == self.vector.x and newVY == self.vector.y):
+            return
+        self.dirty = True
+        self.position.x = newX
+        self.position.y = newY
+        self.vector.x = newVX
+        self.vector.y = newVY
+
+    def snapshot(self):
+        """Fige l'état du joueur. Ne doit être appelée que par la simulation.
+            Si le joueur n'a pas changé depuis le dernier appel, le même instantané est renvoyé :
+            l'affichage peut donc ignorer un joueur dont l'instantané est celui qu'il a déjà dessiné.
+
+        Returns:
+            Un PodSnapshot du joueur.
+        """
+        if self.dirty or self.lastSnapshot is None:
+            self.lastSnapshot = PodSnapshot(self.pseudo, self.position.x, self.position.y, self.vector.x, self.vector.y,
+                                            self.angle, self.canvasTagId, self.image, self.sprite)
+            self.dirty = False
+        return self.lastSnapshot
+
     def fullyUpdate(self, newX, newY, newVX, newVY, newAngle):
         """Remet entièrement à jour un joueur.
         
@@ -225,6 +294,7 @@ class PlayerPod():
         self.vector.setX(newVX)
         self.vector.setY(newVY)
         self.setAngle(round(degrees(newAngle)))
+        self.dirty = True
 
     def fullyUpdateFromScratch(self, newX, newY, newVX, newVY, newAngle):
         """Remet entièrement à jour un joueur jusque la sans position ni vecteur.
@@ -239,6 +309,7 @@ class PlayerPod():
         self.position = Pair(newX, newY)
         self.vector = Pair(newVX, newVY)
         self.angle = round(degrees(newAngle))
+        self.dirty = True
 
     def thrust(self):
         """Applique une impulsion au joueur. Met à jour ses vecteurs."""
@@ -0,0 +1,84 @@
+# coding: utf-8
+
+from collections import namedtuple
+
+
+class PodSnapshot(namedtuple("PodSnapshot", ("pseudo", "x", "y", "vx", "vy", "angle", "canvasTagId", "image",
+                                                 "sprite"))):
+    """L'état d'un joueur figé à un instant donné.
+        Une fois créé, il ne change plus : on peut le lire depuis n'importe quel thread sans verrou.
+        Propose les mêmes getteurs que PlayerPod pour être passé directement à l'affichage.
+    """
+    __slots__ = ()
+
+    def getPseudo(self):
+        """Getteur sur le pseudo du joueur.
+
+        Returns:
+            Le pseudo du joueur.
+        """
+        return self.pseudo
+
+    def getPositionX(self):
+        """Getteur sur la coordonnée X du joueur.
+
+        Returns:
+            La coordonnée X du joueur.
+        """
+        return self.x
+
+    def getPositionY(self):
+        """Getteur sur la coordonnée Y du joueur.
+
+        Returns:
+            La coordonnée Y du joueur.
+        """
+        return self.y
+
+    def getVectorX(self):
+        """Getteur sur le vecteur X du joueur.
+
+        Returns:
+            Le vecteur X du joueur.
+        """
+        return self.vx
+
+    def getVectorY(self):
+        """Getteur sur le vecteur Y du joueur.
+
+        Returns:
+            Le vecteur Y du joueur.
+        """
+        return self.vy
+
+    def getAngle(self):
+        """Getteur sur l'angle du joueur.
+
+        Returns:
+            L'angle du joueur.
+        """
+        return self.angle
+
+    def getCanvasTagId(self):
+        """Getteur sur le tag du joueur pour le canvas de l'interface graphique.
+
+        Returns:
+            Le tag du joueur.
+        """
+        return self.canvasTagId
+
+    def getImage(self):
+        """Getteur sur l'image du joueur dans l'interface graphique.
+
+        Returns:
+            L'image du joueur.
+        """
+        return self.image
+
+    def getSprite(self):
+        """Getteur sur le chemin du sprite du joueur dans l'interface graphique.
+
+        Returns:
+            Le chemin du sprite du joueur.
+        """
+        return self.sprite
@@ -0,0 +1,66 @@
+# coding: utf-8
+
+import random
+import threading
+import time
+from math import hypot
+import data as dat
+from player.InputQueue import InputQueue
+
+
+class ScriptedInput(threading.Thread):
+    """Joue à la place de l'utilisateur, en mode headless.
+        Appuie sur les touches selon un script, refresh_tickrate fois par seconde,
+        afin de mesurer la prédiction du joueur sans interface graphique.
+    """
+
+    # Les scripts de commandes, comme ceux des adversaires de tools.StandInServer
+    SCRIPTS = ("circle", "random")
+
+    def __init__(self, dispatcher, script, seed=0):
+        """Constructeur.
+
+        Arguments:
+            dispatcher -- Le dispatcher de l'application.
+            script -- Les touches appuyées : "circle" ou "random".
+
+        Keyword Arguments:
+            seed -- La graine des touches aléatoires. (default: {0})
+        """
+        super().__init__(daemon=True)
+        self.dispatcher = dispatcher
+        self.script = script
+        self.rand = random.Random(seed)
+        self.isInterrupted = False
+
+    def run(self):
+        while not self.isInterrupted:
+            player = self.dispatcher.getSnapshot().player
+            if player is not None:
+                # La vitesse est bornée, comme celle des adversaires scriptés
+                speed = hypot(player.getVectorX(), player.getVectorY())
+                if self.script == "circle":
+                    self.tap(InputQueue.ANTICLOCK)
+                    if speed < dat.THRUST_IT:
+                        self.tap(InputQueue.THRUST)
+                else:
+                    choice = self.rand.random()
+                    if choice < 0.3:
+                        self.tap(InputQueue.CLOCK)
+                    elif choice < 0.6:
+                        self.tap(InputQueue.ANTICLOCK)
+                    if speed < dat.THRUST_IT and self.rand.random() < 0.2:
+                        self.tap(InputQueue.THRUST)
+            time.sleep(1 / dat.REFRESH_TICRATE)
+
+    def tap(self, action):
+        """Appuie sur une touche puis la relâche : l'action est appliquée à la prochaine image.
+
+        Arguments:
+            action -- L'action de la touche, une des InputQueue.ACTIONS.
+        """
+        self.dispatcher.keyPressedEvent(action)
+        self.dispatcher.keyReleasedEvent(action)
+
+    def stop(self):
+        self.isInterrupted = True
@@ -0,0 +1,169 @@
+# coding: utf-8
+
+import mmap
+import os
+import struct
+from PIL import Image, ImageTk
+
+
+class AssetStore():
+    """Le magasin des sprites de l'interface graphique.
+        Chaque sprite n'est décodé qu'une fois et son image (PIL) comme sa photoImage (Tk) sont partagées
+        par tous les objets qui l'affichent : 50 astéroïdes n'utilisent qu'une seule image Tk.
+        Peut aussi lire les sprites depuis un pack : un fichier unique contenant tous les sprites déjà décodés
+        en RGBA, projeté en mémoire au démarrage plutôt que lu et décodé fichier par fichier.
+    """
+
+    # Les sprites du jeu, relatifs au dossier src/client
+    SPRITES = (
+        "images/pod_sprite_50.png",
+        "images/pod2_sprite_50.png",
+        "images/obstacles/asteroid_sprite_55.png",
+        "images/obstacles/spirit_bomb_50.png"
+    ) + tuple("images/dragon_ball/ball_" + str(i) + ".png" for i in range(1, 8))
+
+    # L'en-tête d'un pack : la signature puis le nombre de sprites
+    PACK_MAGIC = b"PODPACK1"
+    PACK_HEADER = struct.Struct("<8sI")
+    # Une entrée de l'index : la taille du nom (suivie du nom), la largeur, la hauteur et la position des pixels
+    PACK_NAME = struct.Struct("<H")
+    PACK_ENTRY = struct.Struct("<IIQ")
+
+    def __init__(self, packPath=None):
+        """Constructeur.
+
+        Keyword Arguments:
+            packPath -- Le chemin du pack de sprites, None pour décoder les PNG. Le pack est (re)construit
+                        s'il n'existe pas ou si un sprite est plus récent que lui. (default: {None})
+        """
+        self.images = {}
+        self.photoImages = {}
+        self.pack = None
+        self.packIndex = {}
+        if packPath is not None:
+            if AssetStore.isPackStale(packPath):
+                AssetStore.buildPack(packPath)
+            self.openPack(packPath)
+
+    @staticmethod
+    def isPackStale(packPath, sprites=SPRITES):
+        """Indique si un pack doit être reconstruit.
+
+        Arguments:
+            packPath -- Le chemin du pack.
+
+        Keyword Arguments:
+            sprites -- Les sprites que le pack doit contenir. (default: {AssetStore.SPRITES})
+
+        Returns:
+            True si le pack n'existe pas ou si l'un des sprites a été modifié depuis sa construction.
+        """
+        if not os.path.exists(packPath):
+            return True
+        packTime = os.path.getmtime(packPath)
+        return any(os.path.getmtime(sprite) > packTime for sprite in sprites)
+
+    @staticmethod
+    def buildPack(packPath, sprites=SPRITES):
+        """Décode tous les sprites et les écrit dans un pack.
+
+        Arguments:
+            packPath -- Le chemin du pack.
+
+        Keyword Arguments:
+            sprites -- Les sprites à mettre dans le pack. (default: {AssetStore.SPRITES})
+        """
+        decoded = []
+        for sprite in sprites:
+            with Image.open(sprite) as image:
+                rgba = image.convert("RGBA")
+                decoded.append((sprite.encode("utf-8"), rgba.size[0], rgba.size[1], rgba.tobytes()))
+
+        # Les pixels suivent l'index : on calcule d'abord sa taille
+        offset = AssetStore.PACK_HEADER.size
+        for (name, _, _, _) in decoded:
+            offset += AssetStore.PACK_NAME.size + len(name) + AssetStore.PACK_ENTRY.size
+        index = [AssetStore.PACK_HEADER.pack(AssetStore.PACK_MAGIC, len(decoded))]
+        for (name, width, height, pixels) in decoded:
+            index.append(AssetStore.PACK_NAME.pack(len(name)) + name + AssetStore.PACK_ENTRY.pack(width, height, offset))
+            offset += len(pixels)
+
+        # Écrit dans un fichier temporaire pour qu'un client ne lise jamais un pack à moitié écrit
+        tmpPath = packPath + ".tmp"
+        with open(tmpPath, "wb") as packFile:
+            packFile.write(b"".join(index))
+            for (_, _, _, pixels) in decoded:
+                packFile.write(pixels)
+        os.replace(tmpPath, packPath)
+        print("[AssetStore] : " + str(len(decoded)) + " sprites packed in " + packPath)
+
+    def openPack(self, packPath):
+        """Projette un pack en mémoire et lit son index.
+
+        Arguments:
+            packPath -- Le chemin du pack.
+
+        Raises:
+            ValueError -- Si le fichier n'est pas un pack.
+        """
+        with open(packPath, "rb") as packFile:
+            self.pack = mmap.mmap(packFile.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, count) = AssetStore.PACK_HEADER.unpack_from(self.pack, 0)
+        if magic != AssetStore.PACK_MAGIC:
+            self.close()
+            raise ValueError(packPath + " is not a sprite pack")
+        position = AssetStore.PACK_HEADER.size
+        for _ in range(0, count):
+            (nameLength,) = AssetStore.PACK_NAME.unpack_from(self.pack, position)
+            position += AssetStore.PACK_NAME.size
+            name = self.pack[position:position + nameLength].decode("utf-8")
+            position += nameLength
+            self.packIndex[name] = AssetStore.PACK_ENTRY.unpack_from(self.pack, position)
+            position += AssetStore.PACK_ENTRY.size
+
+    def close(self):
+        """Libère le pack projeté en mémoire. Les images déjà lues depuis le pack ne doivent plus être utilisées."""
+        self.images = {}
+        self.photoImages = {}
+        self.packIndex = {}
+        if self.pack is not None:
+            self.pack.close()
+            self.pack = None
+
+    def getImage(self, sprite):
+        """Renvoie l'image d'un sprite, décodée au premier appel.
+
+        Arguments:
+            sprite -- Le chemin du sprite.
+
+        Returns:
+            L'image (PIL) du sprite, partagée : elle ne doit pas être modifiée.
+        """
+        image = self.images.get(sprite)
+        if image is None:
+            if sprite in self.packIndex:
+                (width, height, offset) = self.packIndex[sprite]
+                # L'image lit directement ses pixels dans le pack, sans copie
+                pixels = memoryview(self.pack)[offset:offset + width * height * 4]
+                image = Image.frombuffer("RGBA", (width, height), pixels, "raw", "RGBA", 0, 1)
+            else:
+                image = Image.open(sprite)
+                image.load()
+            self.images[sprite] = image
+        return image
+
+    def getPhotoImage(self, sprite):
+        """Renvoie la photoImage d'un sprite, créée au premier appel.
+            Doit être appelé une fois la fenêtre Tk créée.
+
+        Arguments:
+            sprite -- Le chemin du sprite.
+
+        Returns:
+            La photoImage (Tk) du sprite, partagée par tous les éléments du canvas qui l'affichent.
+        """
+        photoImage = self.photoImages.get(sprite)
+        if photoImage is None:
+            photoImage = ImageTk.PhotoImage(self.getImage(sprite))
+            self.photoImages[sprite] = photoImage
+        return photoImage
@@ -0,0 +1,116 @@
+# coding: utf-8
+
+from collections import deque
+from time import gmtime, strftime, perf_counter
+
+
+class ChatHistory():
+    """L'historique borné d'un chat.
+        Les messages reçus sont mis en attente depuis n'importe quel thread (deque.append est atomique)
+        puis ajoutés au Treeview par lots, depuis le thread de Tk, à chaque image de la boucle d'affichage.
+        Au-delà de maxRows lignes, les plus anciennes sont supprimées : la mémoire et le nombre de lignes
+        du Treeview restent bornés quel que soit le nombre de messages reçus.
+        Les messages reçus peuvent aussi être limités en débit (un seau à jetons), les messages en trop
+        étant ignorés ; les messages de l'utilisateur ne le sont jamais.
+    """
+
+    DEFAULT_MAX_ROWS = 500
+    # Le nombre maximum de lignes ajoutées au Treeview en une image, la suite attend l'image suivante
+    MAX_ROWS_PER_FLUSH = 50
+
+    def __init__(self, maxRows=DEFAULT_MAX_ROWS, rate=None):
+        """Constructeur.
+
+        Keyword Arguments:
+            maxRows -- Le nombre maximum de messages affichés. (default: {ChatHistory.DEFAULT_MAX_ROWS})
+            rate -- Le nombre maximum de messages reçus par seconde, en moyenne, None pour ne pas limiter.
+                    Une rafale d'une seconde de messages est acceptée. (default: {None})
+        """
+        self.maxRows = maxRows
+        self.pending = deque(maxlen=maxRows)    # Des tuples (message, date, fromMe)
+        self.rows = deque()                     # Les identifiants des lignes du Treeview, de la plus ancienne
+        self.messageCpt = 0
+        self.rate = rate
+        self.tokens = rate
+        self.lastRefill = None
+        self.nbReceived = 0
+        self.nbRateLimited = 0
+        self.nbEvicted = 0
+
+    def push(self, message, fromMe=False):
+        """Ajoute un message, affiché à la prochaine image. Peut être appelée depuis n'importe quel thread.
+
+        Arguments:
+            message -- Le message.
+
+        Keyword Arguments:
+            fromMe -- Indique si le message vient de l'utilisateur de l'application cliente. (default: {False})
+
+        Returns:
+            True si le message sera affiché, False s'il a été ignoré par la limite de débit.
+        """
+        if not fromMe:
+            self.nbReceived += 1
+            if self.rate is not None and not self.takeToken():
+                self.nbRateLimited += 1
+                return False
+        if len(self.pending) == self.maxRows:
+            # Le plus ancien message en attente ne sera jamais affiché
+            self.nbEvicted += 1
+        self.pending.append((message, strftime("%d/%m/%Y-%H:%M:%S", gmtime()), fromMe))
+        return True
+
+    def takeToken(self):
+        """Consomme un jeton du seau, rempli de rate jetons par seconde jusqu'à rate jetons.
+
+        Returns:
+            True si un jeton était disponible.
+        """
+        now = perf_counter()
+        if self.lastRefill is not None:
+            self.tokens = min(self.rate, self.tokens + (now - self.lastRefill) * self.rate)
+        self.lastRefill = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+    def hasPending(self):
+        """Indique si des messages attendent d'être affichés."""
+        return len(self.pending) > 0
+
+    def flush(self, treeview):
+        """ Ajoute au Treeview les messages en attente, au plus MAX_ROWS_PER_FLUSH,
+            puis supprime les lignes au-delà de maxRows. Doit être appelée depuis le thread de Tk.
+
+        Arguments:
+            treeview -- Le Treeview du chat.
+
+        Returns:
+            Le nombre de lignes ajoutées.
+        """
+        pending = self.pending
+        nbRows = min(len(pending), self.MAX_ROWS_PER_FLUSH)
+        for _ in range(0, nbRows):
+            (message, date, fromMe) = pending.popleft()
+            oddEvenTag = 'even' if (self.messageCpt % 2) == 0 else 'odd'
+            fromMeTag = 'from_me' if fromMe else 'not_from_me'
+            self.rows.append(treeview.insert('', 'end', text=message, values=date, tags=(oddEvenTag, fromMeTag)))
+            self.messageCpt += 1
+
+        overflow = len(self.rows) - self.maxRows
+        if overflow > 0:
+            evicted = [self.rows.popleft() for _ in range(0, overflow)]
+            # Une seule commande Tk pour toutes les lignes supprimées
+            treeview.delete(*evicted)
+            self.nbEvicted += overflow
+        return nbRows
+
+    def getStats(self):
+        """Getteur sur les mesures de l'historique.
+
+        Returns:
+            tuple(nbReceived, nbRateLimited, nbEvicted, nbRows) -- Le nombre de messages reçus, ignorés par la
+            limite de débit et supprimés de l'historique, et le nombre de lignes affichées.
+        """
+        return (self.nbReceived, self.nbRateLimited, self.nbEvicted, len(self.rows))
@@ -0,0 +1,155 @@
+# coding: utf-8
+
+from collections import deque
+from threading import Event, Lock
+from renderer.Renderer import Renderer
+
+
+class NullRenderer(Renderer):
+    """Un affichage qui n'affiche rien.
+        Permet d'exécuter le protocole et la physique du jeu sans interface graphique.
+        Compte les appels reçus et peut garder les plus récents en mémoire.
+    """
+
+    def __init__(self, dispatcher, historySize=0):
+        """Constructeur.
+
+        Arguments:
+            dispatcher -- Le dispatcher de l'application.
+
+        Keyword Arguments:
+            historySize -- Le nombre d'appels récents conservés, 0 pour n'en conserver aucun. (default: {0})
+        """
+        self.dispatcher = dispatcher
+        self.lock = Lock()
+        self.callCounts = {}
+        self.history = deque(maxlen=historySize) if historySize > 0 else None
+        self.nextTag = 1
+        self.closing = False
+        self.closed = Event()
+        self.dispatcher.setGraphicalApp(self)
+
+    def record(self, name, *args):
+        """Enregistre un appel.
+
+        Arguments:
+            name -- Le nom de la méthode appelée.
+            args -- Les arguments de l'appel.
+        """
+        with self.lock:
+            self.callCounts[name] = self.callCounts.get(name, 0) + 1
+            if self.history is not None:
+                self.history.append((name,) + args)
+
+    def newTag(self):
+        """Génère un nouveau tag, comme le ferait le canvas.
+
+        Returns:
+            Le nouveau tag.
+        """
+        with self.lock:
+            tag = self.nextTag
+            self.nextTag += 1
+        return tag
+
+    def getCallCounts(self):
+        """Getteur sur le nombre d'appels de chaque méthode.
+
+        Returns:
+            Un dictionnaire nom de la méthode -> nombre d'appels.
+        """
+        with self.lock:
+            return dict(self.callCounts)
+
+    def getHistory(self):
+        """Getteur sur les appels récents.
+
+        Returns:
+            Une liste de tuple(nom de la méthode, arguments...).
+        """
+        with self.lock:
+            return list(self.history) if self.history is not None else []
+
+    def waitForClose(self, timeout=None):
+        """Attend la fermeture de l'affichage.
+
+        Keyword Arguments:
+            timeout -- Le délai d'attente maximum en secondes, None pour attendre indéfiniment. (default: {None})
+
+        Returns:
+            True si l'affichage a été fermé, False si le délai a expiré.
+        """
+        return self.closed.wait(timeout)
+
+    def createGraphicalPlayer(self, playerX, playerY):
+        self.record("createGraphicalPlayer", playerX, playerY)
+        return (self.newTag(), None, None, None)
+
+    def createGraphicalOpponent(self, playerX, playerY):
+        self.record("createGraphicalOpponent", playerX, playerY)
+        return (self.newTag(), None, None, None)
+
+    def createGraphicalObstacle(self, obstacleX, obstacleY):
+        self.record("createGraphicalObstacle", obstacleX, obstacleY)
+        return (self.newTag(), None)
+
+    def showObjectif(self, objectifX, objectifY, objectifNumber):
+        self.record("showObjectif", objectifX, objectifY, objectifNumber)
+        return (self.newTag(), None)
+
+    def updateUIPlayer(self, player):
+        self.record("updateUIPlayer", player.getPseudo(), player.getPositionX(), player.getPositionY(), player.getAngle())
+
+    def deleteFromCanvas(self, tag):
+        self.record("deleteFromCanvas", tag)
+
+    def addScoreToTable(self, user, score):
+        self.record("addScoreToTable", user, score)
+
+    def updateScores(self, scores):
+        self.record("updateScores", scores)
+
+    def resetScores(self):
+        self.record("resetScores")
+
+    def removeOpponent(self, opponentName):
+        self.record("removeOpponent", opponentName)
+
+    def createChat(self, nom, enable=True):
+        self.record("createChat", nom)
+
+    def deleteChat(self, name):
+        self.record("deleteChat", name)
+
+    def addMessage(self, chatName, message, fromMe=False):
+        self.record("addMessage", chatName, message, fromMe)
+
+    def showDeniedMessage(self):
+        self.record("showDeniedMessage")
+        print("[NullRenderer] : The server refused the connection")
+        self.closeWindow()
+
+    def showWaitingMessage(self):
+        self.record("showWaitingMessage")
+        print("[NullRenderer] : Waiting for game to start...")
+
+    def showStartMessage(self):
+        self.record("showStartMessage")
+        print("[NullRenderer] : Good game !")
+
+    def showWinner(self, winnerName, iWin):
+        self.record("showWinner", winnerName, iWin)
+        print("[NullRenderer] : " + winnerName + " has won !")
+
+    def reset(self):
+        self.record("reset")
+
+    def closeWindow(self):
+        with self.lock:
+            # La fermeture peut être demandée par plusieurs threads à la fois
+            alreadyClosing = self.closing
+            self.closing = True
+        if not alreadyClosing:
+            self.record("closeWindow")
+            self.dispatcher.onCloseWindow()
+            self.closed.set()
@@ -0,0 +1,164 @@
+# coding: utf-8
+
+
+class Renderer():
+    """L'interface de l'affichage du jeu.
+        Regroupe toutes les méthodes que le dispatcher appelle pour afficher l'état de la partie.
+        Les positions reçues sont celles du jeu, chaque implémentation se charge de les convertir.
+    """
+
+    def createGraphicalPlayer(self, playerX, playerY):
+        """Crée le joueur à une position spécifique.
+
+        Arguments:
+            playerX -- La coordonnée X du joueur.
+            playerY -- La coordonnée Y du joueur.
+
+        Returns:
+            tuple -- Un tuple contenant le tag du joueur, son image, sa photoImage et le chemin de son sprite.
+        """
+        raise NotImplementedError
+
+    def createGraphicalOpponent(self, playerX, playerY):
+        """Crée un adversaire à une position spécifique.
+
+        Arguments:
+            playerX -- La coordonnée X de l'adversaire.
+            playerY -- La coordonnée Y de l'adversaire.
+
+        Returns:
+            tuple -- Un tuple contenant le tag de l'adversaire, son image, sa photoImage et le chemin de son sprite.
+        """
+        raise NotImplementedError
+
+    def createGraphicalObstacle(self, obstacleX, obstacleY):
+        """Crée un obstacle à une position spécifique.
+
+        Arguments:
+            obstacleX -- La coordonnée X de l'obstacle.
+            obstacleY -- La coordonnée Y de l'obstacle.
+
+        Returns:
+            tuple -- Un tuple contenant le tag de l'obstacle et sa photoImage.
+        """
+        raise NotImplementedError
+
+    def showObjectif(self, objectifX, objectifY, objectifNumber):
+        """Ajoute un objectif.
+
+        Arguments:
+            objectifX  -- La coordonnée X de l'objectif.
+            objectifY  -- La coordonnée Y de l'objectif.
+            objectifNumber  -- Le numéro de l'objectif.
+
+        Returns:
+            tuple(idTag, photoImage) -- Un tuple contenant le tag de l'objectif et son image.
+        """
+        raise NotImplementedError
+
+    def onSnapshotPublished(self, snapshot):
+        """Signale qu'un nouvel instantané a été publié par le dispatcher.
+            Appelée depuis le thread de la simulation. Par défaut, met à jour tous les pods tout de suite ;
+            un affichage ayant sa propre boucle peut l'ignorer et lire le dernier instantané du dispatcher.
+
+        Arguments:
+            snapshot -- Le nouvel instantané.
+        """
+        for pod in snapshot.getPods():
+            self.updateUIPlayer(pod)
+
+    def updateUIPlayer(self, player):
+        """Met à jour la position et l'angle de rotation d'un joueur.
+            Le joueur est en lecture seule : un PodSnapshot publié par le dispatcher.
+
+        Arguments:
+            player -- Le joueur.
+        """
+        raise NotImplementedError
+
+    def deleteFromCanvas(self, tag):
+        """Supprime un élément identifié par son tag.
+
+        Arguments:
+            tag  -- Le tag de l'élément à supprimer.
+        """
+        raise NotImplementedError
+
+    def addScoreToTable(self, user, score):
+        """Ajoute un nouveau score au tableau des scores.
+
+        Arguments:
+            user  -- Un pseudo.
+            score -- Un score.
+        """
+        raise NotImplementedError
+
+    def updateScores(self, scores):
+        """Met à jour le tableau des scores avec les scores de tous les joueurs.
+            Les joueurs absents de scores sont retirés du tableau.
+
+        Arguments:
+            scores -- Une liste de tuple(pseudo, score).
+        """
+        raise NotImplementedError
+
+    def resetScores(self):
+        """Remet à zéro le tableau des scores."""
+        raise NotImplementedError
+
+    def removeOpponent(self, opponentName):
+        """Supprime un adversaire de l'affichage.
+
+        Arguments:
+            opponentName -- Le nom de l'adversaire.
+        """
+        raise NotImplementedError
+
+    def createChat(self, nom, enable=True):
+        """Crée un nouveau chat."""
+        raise NotImplementedError
+
+    def deleteChat(self, name):
+        """Supprime un chat."""
+        raise NotImplementedError
+
+    def addMessage(self, chatName, message, fromMe=False):
+        """Ajout un message à un chat.
+
+        Arguments:
+            chatName -- Le nom du chat.
+            message -- Le message.
+
+        Keyword Arguments:
+            fromMe -- Indique si le message vient de l'utilisateur de l'application cliente. (default: {False})
+        """
+        raise NotImplementedError
+
+    def showDeniedMessage(self):
+        """Indique à l'utilisateur que sa tentative de connexion à été refusée."""
+        raise NotImplementedError
+
+    def showWaitingMessage(self):
+        """Indique à l'utilisateur d'attendre le début de la partie."""
+        raise NotImplementedError
+
+    def showStartMessage(self):
+        """Indique à l'utilisateur que la partie à commencé."""
+        raise NotImplementedError
+
+    def showWinner(self, winnerName, iWin):
+        """Affiche le nom du gagnant.
+
+        Arguments:
+            winnerName  -- Le nom du gagnant.
+            iWin  -- Indique si le gagnant est le joueur actuel.
+        """
+        raise NotImplementedError
+
+    def reset(self):
+        """Remet à zéro l'affichage."""
+        raise NotImplementedError
+
+    def closeWindow(self):
+        """Signale au dispatcher que l'utilisateur souhaite quitter l'application et ferme l'affichage."""
+        raise NotImplementedError
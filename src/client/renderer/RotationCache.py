@@ -0,0 +1,74 @@
+# coding: utf-8
+
+from collections import OrderedDict
+
+
+class RotationCache():
+    """Cache des images tournées des sprites.
+        Tourner une image puis l'envoyer à Tk coûte cher et les angles possibles sont peu nombreux
+        (des multiples de turn_it, ou les angles entiers reçus du serveur) : chaque rotation d'un sprite
+        n'est donc calculée qu'une fois et partagée par tous les pods utilisant ce sprite.
+        Les rotations les moins récemment utilisées sont oubliées au-delà de maxSize entrées.
+    """
+
+    def __init__(self, rotate, maxSize=256):
+        """Constructeur.
+
+        Arguments:
+            rotate -- La fonction (image, angle) -> image tournée, prête à être affichée.
+
+        Keyword Arguments:
+            maxSize -- Le nombre maximum de rotations gardées en mémoire. (default: {256})
+        """
+        self.rotate = rotate
+        self.maxSize = maxSize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, spriteKey, image, angle):
+        """Renvoie une image tournée, en la calculant si elle n'est pas en cache.
+
+        Arguments:
+            spriteKey -- L'identifiant du sprite, partagé par toutes ses copies (son chemin par exemple).
+            image -- L'image du sprite, utilisée si la rotation n'est pas en cache.
+            angle -- L'angle en degrés.
+
+        Returns:
+            L'image tournée.
+        """
+        key = (spriteKey, angle % 360)
+        rotated = self.entries.get(key)
+        if rotated is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return rotated
+        self.misses += 1
+        rotated = self.rotate(image, angle % 360)
+        self.entries[key] = rotated
+        if len(self.entries) > self.maxSize:
+            self.entries.popitem(last=False)
+        return rotated
+
+    def preload(self, spriteKey, image, step):
+        """Calcule à l'avance toutes les rotations d'un sprite d'un pas donné.
+
+        Arguments:
+            spriteKey -- L'identifiant du sprite.
+            image -- L'image du sprite.
+            step -- Le pas entre deux angles, en degrés.
+        """
+        for angle in range(0, 360, abs(step) or 360):
+            self.get(spriteKey, image, angle)
+
+    def clear(self):
+        """Vide le cache."""
+        self.entries.clear()
+
+    def getStats(self):
+        """Getteur sur l'efficacité du cache.
+
+        Returns:
+            tuple(hits, misses, size) -- Le nombre de rotations trouvées, calculées, et gardées en mémoire.
+        """
+        return (self.hits, self.misses, len(self.entries))
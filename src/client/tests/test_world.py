@@ -0,0 +1,98 @@
+# coding: utf-8
+
+"""Tests de la physique du monde (physics.World).
+
+Depuis le dossier src/client :
+    python3 -m pytest tests
+"""
+import os
+import sys
+import unittest
+from math import sqrt
+
+CLIENT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, CLIENT_DIR)
+
+import data as dat
+from physics.World import World
+from player.Pair import Pair
+from player.PlayerPod import PlayerPod
+
+
+def makePod(pseudo, x, y, vx=0, vy=0):
+    """Crée un pod sans image à une position donnée.
+
+    Arguments:
+        pseudo -- Le pseudo du pod.
+        x -- La coordonnée X du pod.
+        y -- La coordonnée Y du pod.
+
+    Keyword Arguments:
+        vx -- Le vecteur X du pod. (default: {0})
+        vy -- Le vecteur Y du pod. (default: {0})
+
+    Returns:
+        Le pod.
+    """
+    pod = PlayerPod(pseudo, Pair(x, y), 0, None, None, None)
+    pod.setState(x, y, vx, vy)
+    return pod
+
+
+def torusDistance(pod1, pod2):
+    """Calcule la distance entre deux pods, l'arène étant un tore."""
+    (x1, y1, _, _) = pod1.getState()
+    (x2, y2, _, _) = pod2.getState()
+    (dx, dy) = World.torusOffset(x1, y1, x2, y2)
+    return sqrt(dx * dx + dy * dy)
+
+
+class TestFixedPods(unittest.TestCase):
+    """Les pods imposés (les adversaires interpolés) ne bougent pas : seul le joueur est repoussé."""
+
+    @classmethod
+    def setUpClass(cls):
+        # data.setUpData lit ../data.json depuis le dossier courant
+        cwd = os.getcwd()
+        os.chdir(CLIENT_DIR)
+        try:
+            dat.setUpData()
+        finally:
+            os.chdir(cwd)
+
+    def test_player_overlapping_fixed_pod_is_pushed_out(self):
+        world = World()
+        player = makePod("player", 0, 0)
+        opponent = makePod("opponent", 10, 5)
+        world.step([player], [opponent])
+        self.assertGreaterEqual(torusDistance(player, opponent), dat.POD_SIDE - 1e-9)
+        self.assertEqual(opponent.getState(), (10, 5, 0, 0))
+
+    def test_player_moving_into_fixed_pod_bounces_back(self):
+        world = World()
+        player = makePod("player", -dat.POD_SIDE, 0, vx=5)
+        opponent = makePod("opponent", 0, 0)
+        world.step([player], [opponent])
+        (x, _, vx, _) = player.getState()
+        self.assertLess(vx, 0)
+        self.assertLessEqual(x, -dat.POD_SIDE + 1e-9)
+        self.assertGreaterEqual(torusDistance(player, opponent), dat.POD_SIDE - 1e-9)
+
+    def test_player_overlapping_fixed_pod_across_the_arena_edge(self):
+        world = World()
+        player = makePod("player", dat.ARENA_L - 5, 0)
+        opponent = makePod("opponent", -dat.ARENA_L + 5, 0)
+        world.step([player], [opponent])
+        self.assertGreaterEqual(torusDistance(player, opponent), dat.POD_SIDE - 1e-9)
+
+    def test_player_does_not_stay_stuck_on_fixed_pod(self):
+        world = World()
+        player = makePod("player", 0, 0, vx=1)
+        opponent = makePod("opponent", 1, 0)
+        for _ in range(0, 10):
+            world.step([player], [opponent])
+            self.assertGreaterEqual(torusDistance(player, opponent), dat.POD_SIDE - 1e-9)
+
+
+if __name__ == "__main__":
+    unittest.main()
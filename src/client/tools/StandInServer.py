@@ -0,0 +1,532 @@
+# coding: utf-8
+
+"""Un serveur de remplacement, écrit en Python, parlant le même protocole que le serveur Java.
+Permet de tester et de mesurer le client sur une seule machine, sans JVM, avec des entrées déterministes.
+
+Depuis le dossier src/client :
+    python3 -m tools.StandInServer --port 1234 --players 1 --bots 3 --obstacles 3 --tickrate 30
+
+Gère les extensions facultatives SEQ et BIN du protocole (voir Protocol.CAPABILITY_SEQ et CAPABILITY_BINARY_TICK)
+et peut simuler une latence réseau :
+    python3 -m tools.StandInServer --port 1234 --bots 3 --latency 100
+"""
+import argparse
+import asyncio
+import random
+import re as regexp
+from math import cos, sin, radians, degrees, sqrt
+
+import communication.codec as codec
+import data as dat
+from communication.Protocol import Protocol
+
+COMMAND_PATTERN = regexp.compile("A(-?[0-9.Ee+-]+)T([0-9]+)")
+
+
+class StandInPlayer():
+    """Un joueur du serveur de remplacement : un client connecté ou un adversaire scripté."""
+
+    def __init__(self, pseudo, x, y, writer=None):
+        """Constructeur.
+
+        Arguments:
+            pseudo -- Le pseudo du joueur.
+            x -- La coordonnée X du joueur.
+            y -- La coordonnée Y du joueur.
+
+        Keyword Arguments:
+            writer -- Le flux d'écriture vers le client, None pour un adversaire scripté. (default: {None})
+        """
+        self.pseudo = pseudo
+        self.x = x
+        self.y = y
+        self.vx = 0.0
+        self.vy = 0.0
+        self.angle = 0  # En degrés
+        self.score = 0
+        self.writer = writer
+        self.acksInputs = False     # Le client a annoncé Protocol.CAPABILITY_SEQ
+        self.lastSeq = 0            # Le numéro de la dernière commande du client traitée
+        self.binaryTicks = False    # Le client a annoncé Protocol.CAPABILITY_BINARY_TICK
+        self.playerId = 0           # Le numéro du joueur dans les TICK binaires, attribué à la session
+
+    def getVcoord(self):
+        """Retourne la position, le vecteur et l'angle du joueur conformes au protocole."""
+        return codec.formatVcoord(self.x, self.y, self.vx, self.vy, radians(self.angle))
+
+    def updateFromCommand(self, angleCmd, thrustCmd):
+        """Applique une commande puis déplace le joueur, comme Pod.updateFromCommand du serveur Java.
+
+        Arguments:
+            angleCmd -- L'ajout à l'angle en radians.
+            thrustCmd -- Le nombre de poussées.
+        """
+        self.angle += round(degrees(angleCmd) % 360)
+        radianAngle = radians(self.angle)
+        self.vx += (dat.THRUST_IT * thrustCmd) * cos(radianAngle)
+        self.vy += (dat.THRUST_IT * thrustCmd) * -sin(radianAngle)
+        self.x += self.vx
+        self.y += self.vy
+
+        # Le pod quitte l'arène
+        if self.x > dat.ARENA_L:
+            self.x = -dat.ARENA_L + (self.x - dat.ARENA_L)
+        elif self.x < -dat.ARENA_L:
+            self.x = dat.ARENA_L - (self.x + dat.ARENA_L)
+        if self.y > dat.ARENA_H:
+            self.y = -dat.ARENA_H + (self.y - dat.ARENA_H)
+        elif self.y < -dat.ARENA_H:
+            self.y = dat.ARENA_H - (self.y + dat.ARENA_H)
+
+
+class StandInServer():
+    """Le serveur de remplacement.
+        Une session commence dès que le nombre de clients attendu est connecté.
+        Les adversaires scriptés sont déplacés par le serveur à chaque TICK, de façon déterministe.
+    """
+
+    # Les scripts de déplacement des adversaires
+    SCRIPTS = ("still", "circle", "random")
+
+    def __init__(self, host="localhost", port=1234, nbPlayers=1, nbBots=0, nbObstacles=None, tickRate=None,
+                 script="circle", seed=0, latency=0):
+        """Constructeur.
+
+        Keyword Arguments:
+            host -- L'adresse d'écoute. (default: {"localhost"})
+            port -- Le port d'écoute. (default: {1234})
+            nbPlayers -- Le nombre de clients attendus avant de commencer une session. (default: {1})
+            nbBots -- Le nombre d'adversaires scriptés. (default: {0})
+            nbObstacles -- Le nombre d'obstacles, celui de data.json si None. (default: {None})
+            tickRate -- Le nombre de TICK par seconde, celui de data.json si None. (default: {None})
+            script -- Le déplacement des adversaires scriptés : "still", "circle" ou "random". (default: {"circle"})
+            seed -- La graine des tirages aléatoires. (default: {0})
+            latency -- La latence simulée dans chaque sens, en secondes : les messages reçus sont traités
+                       et les messages envoyés sont écrits avec ce retard. (default: {0})
+        """
+        self.host = host
+        self.port = port
+        self.nbPlayers = nbPlayers
+        self.nbBots = nbBots
+        self.nbObstacles = dat.NB_OBSTACLE if nbObstacles is None else nbObstacles
+        self.tickRate = dat.SERVER_TICRATE if tickRate is None else tickRate
+        self.script = script
+        self.rand = random.Random(seed)
+        self.latency = latency
+        self.players = {}       # pseudo -> StandInPlayer, dans l'ordre d'arrivée
+        self.obstacles = []     # Une liste de tuple (x, y)
+        self.objectif = (0.0, 0.0)
+        self.sessionStarted = False
+        self.tickTask = None
+        self.startTask = None
+        self.tickCount = 0
+        self.nextPlayerId = 0
+        self.messagesSent = 0
+        self.bytesSent = 0
+        self.server = None
+        self.newObjectif()
+
+    def randomPosition(self):
+        """Tire une position aléatoire dans l'arène.
+
+        Returns:
+            tuple(x, y) -- La position.
+        """
+        return (self.rand.uniform(-dat.ARENA_L, dat.ARENA_L), self.rand.uniform(-dat.ARENA_H, dat.ARENA_H))
+
+    def newObjectif(self):
+        """Place un nouvel objectif."""
+        self.objectif = self.randomPosition()
+
+    def getScores(self):
+        """Retourne les scores de la session conformes au protocole."""
+        return "|".join(p.pseudo + ":" + str(p.score) for p in self.players.values())
+
+    def getCoords(self):
+        """Retourne les coordonnées des joueurs conformes au protocole."""
+        return "|".join(p.pseudo + ":" + codec.formatCoord(p.x, p.y) for p in self.players.values())
+
+    def getVcoords(self):
+        """Retourne les positions, vecteurs et angles des joueurs conformes au protocole."""
+        return "|".join(p.pseudo + ":" + p.getVcoord() for p in self.players.values())
+
+    def getBinaryTick(self):
+        """Retourne le message BTICK des positions, vecteurs et angles des joueurs."""
+        frame = codec.formatBinaryStates((p.playerId, p.x, p.y, p.vx, p.vy, radians(p.angle))
+                                         for p in self.players.values())
+        return b"BTICK/" + str(len(frame)).encode() + b"/" + frame
+
+    def getPlayerIds(self):
+        """Retourne les numéros des joueurs dans les TICK binaires conformes au protocole."""
+        return "|".join(p.pseudo + ":" + str(p.playerId) for p in self.players.values())
+
+    def assignPlayerId(self, player):
+        """Attribue au joueur le prochain numéro libre de la session.
+
+        Arguments:
+            player -- Le joueur.
+        """
+        self.nextPlayerId += 1
+        player.playerId = self.nextPlayerId
+
+    def sendPlayerIds(self):
+        """Envoie les numéros des joueurs aux clients recevant les TICK binaires."""
+        message = "IDS/" + self.getPlayerIds() + "/"
+        for player in list(self.players.values()):
+            if player.binaryTicks:
+                self.send(player, message)
+
+    def getOcoords(self):
+        """Retourne les coordonnées des obstacles conformes au protocole."""
+        return "|".join("obs" + str(i + 1) + ":" + codec.formatCoord(x, y) for (i, (x, y)) in enumerate(self.obstacles))
+
+    def getNbBombs(self):
+        """Retourne le nombre de bombes de chaque joueur conforme au protocole (toujours 0)."""
+        return "|".join(p.pseudo + ":B0" for p in self.players.values())
+
+    def getObjectif(self):
+        """Retourne les coordonnées de l'objectif conformes au protocole."""
+        return codec.formatCoord(*self.objectif)
+
+    def send(self, player, message):
+        """Envoie un message à un client. Les adversaires scriptés ne reçoivent rien.
+
+        Arguments:
+            player -- Le destinataire.
+            message -- Le message, une chaîne de caractères ou des octets déjà encodés.
+        """
+        if player.writer is not None and not player.writer.is_closing():
+            data = message if isinstance(message, bytes) else message.encode()
+            if self.latency > 0:
+                asyncio.get_event_loop().call_later(self.latency, self.write, player.writer, data)
+            else:
+                player.writer.write(data)
+            self.messagesSent += 1
+            self.bytesSent += len(data)
+
+    def write(self, writer, data):
+        """Écrit un message retardé par la latence simulée, si la connexion est encore ouverte.
+
+        Arguments:
+            writer -- Le flux d'écriture vers le client.
+            data -- Le message encodé.
+        """
+        if not writer.is_closing():
+            writer.write(data)
+
+    def sendToAll(self, message, exceptPseudo=None):
+        """Envoie un message à tous les clients.
+
+        Arguments:
+            message -- Le message.
+
+        Keyword Arguments:
+            exceptPseudo -- Un client qui ne doit pas recevoir le message. (default: {None})
+        """
+        for player in list(self.players.values()):
+            if player.pseudo != exceptPseudo:
+                self.send(player, message)
+
+    async def handleClient(self, reader, writer):
+        """Gère la connexion d'un client jusqu'à sa fermeture.
+
+        Arguments:
+            reader -- Le flux de lecture du client.
+            writer -- Le flux d'écriture vers le client.
+        """
+        pseudo = None
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                splitted = line.decode(errors="replace").strip().split("/")
+                if pseudo is None:
+                    if splitted[0] == "CONNECT" and len(splitted) > 1:
+                        pseudo = self.onConnect(splitted[1], writer, splitted[2:])
+                        if pseudo is None:
+                            break
+                    continue
+                if self.latency > 0 and "EXIT" not in splitted:
+                    asyncio.get_event_loop().call_later(self.latency, self.treatClientMessage, pseudo, splitted)
+                elif not self.treatClientMessage(pseudo, splitted):
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            if pseudo is not None:
+                self.removePlayer(pseudo)
+            writer.close()
+
+    def onConnect(self, pseudo, writer, capabilities=()):
+        """Traite un message CONNECT.
+
+        Arguments:
+            pseudo -- Le pseudo demandé.
+            writer -- Le flux d'écriture vers le client.
+
+        Keyword Arguments:
+            capabilities -- Les extensions du protocole annoncées par le client. (default: {()})
+
+        Returns:
+            Le pseudo du joueur, None si la connexion est refusée.
+        """
+        if pseudo in self.players:
+            writer.write(b"DENIED/")
+            return None
+        print("[StandInServer] : Connection of user : " + pseudo)
+        self.sendToAll("NEWPLAYER/" + pseudo + "/")
+        x, y = self.randomPosition()
+        player = StandInPlayer(pseudo, x, y, writer)
+        self.players[pseudo] = player
+        if Protocol.CAPABILITY_SEQ in capabilities:
+            # Le premier ACK indique au client que ses commandes seront acquittées
+            player.acksInputs = True
+            self.send(player, "ACK/0/")
+        player.binaryTicks = Protocol.CAPABILITY_BINARY_TICK in capabilities
+        phase = "play" if self.sessionStarted else "wait"
+        self.send(player, "WELCOME/" + phase + "/" + self.getScores() + "/" + self.getObjectif() + "/" + self.getNbBombs() + "/")
+        if self.sessionStarted:
+            self.send(player, "SESSION/" + self.getCoords() + "/" + self.getObjectif() + "/" + self.getOcoords() + "/")
+            # Un joueur arrivé en cours de session reçoit un nouveau numéro, que tous les clients doivent connaître
+            self.assignPlayerId(player)
+            self.sendPlayerIds()
+        elif self.countClients() >= self.nbPlayers and self.startTask is None:
+            self.startTask = asyncio.get_event_loop().create_task(self.startSession())
+        return pseudo
+
+    def treatClientMessage(self, pseudo, splitted):
+        """Traite un message d'un client connecté.
+
+        Arguments:
+            pseudo -- Le pseudo du client.
+            splitted -- Le message découpé selon les "/".
+
+        Returns:
+            False si le client quitte la partie, True sinon.
+        """
+        # Avec la latence simulée, le client a pu partir entre la réception et le traitement du message
+        if pseudo not in self.players:
+            return False
+        i = 0
+        while i < len(splitted):
+            command = splitted[i]
+            if command == "EXIT":
+                return False
+            elif command == "NEWCOM" and i + 1 < len(splitted):
+                match = COMMAND_PATTERN.fullmatch(splitted[i + 1])
+                if match is not None and self.sessionStarted:
+                    self.onNewCommand(pseudo, float(match.group(1)), int(match.group(2)))
+                i += 1
+            elif command == "SEQ" and i + 1 < len(splitted):
+                # La commande qui précède a été traitée (ou ignorée hors session)
+                if splitted[i + 1].isdigit():
+                    self.players[pseudo].lastSeq = int(splitted[i + 1])
+                i += 1
+            elif command == "ENVOI" and i + 1 < len(splitted):
+                self.sendToAll("RECEPTION/" + splitted[i + 1] + "/", exceptPseudo=pseudo)
+                i += 1
+            elif command == "PENVOI" and i + 2 < len(splitted):
+                if splitted[i + 1] in self.players:
+                    self.send(self.players[splitted[i + 1]], "PRECEPTION/" + splitted[i + 2] + "/" + pseudo + "/")
+                i += 2
+            i += 1
+        return True
+
+    def onNewCommand(self, pseudo, angleCmd, thrustCmd):
+        """Applique une commande à un joueur et vérifie les collisions et l'objectif.
+
+        Arguments:
+            pseudo -- Le pseudo du joueur.
+            angleCmd -- L'ajout à l'angle en radians.
+            thrustCmd -- Le nombre de poussées.
+        """
+        player = self.players[pseudo]
+        player.updateFromCommand(angleCmd, thrustCmd)
+        self.checkCollisions(player)
+
+        if self.hit(player.x, player.y, dat.POD_SIDE, self.objectif[0], self.objectif[1], dat.BALL_SIDE):
+            player.score += 1
+            if player.score >= dat.WIN_CAP:
+                self.sendToAll("WINNER/" + self.getScores() + "/")
+                self.finishSession()
+            else:
+                self.newObjectif()
+                self.sendToAll("NEWOBJ/" + self.getObjectif() + "/" + self.getScores() + "/")
+
+    def hit(self, x1, y1, side1, x2, y2, side2):
+        """Vérifie si deux objets se touchent.
+
+        Returns:
+            True s'il y a collision, False sinon.
+        """
+        distance = (x1 - x2) * (x1 - x2) + (y1 - y2) * (y1 - y2)
+        return distance <= (side1 / 2 + side2 / 2) * (side1 / 2 + side2 / 2)
+
+    def checkCollisions(self, player):
+        """Fait rebondir un joueur sur les obstacles qu'il touche, comme le serveur Java.
+
+        Arguments:
+            player -- Le joueur.
+        """
+        for (obstacleX, obstacleY) in self.obstacles:
+            if self.hit(player.x, player.y, dat.POD_SIDE, obstacleX, obstacleY, dat.ASTEROID_SIDE):
+                playerR = dat.POD_SIDE / 2
+                obstacleR = dat.ASTEROID_SIDE / 2
+                nx = (player.x - obstacleX) / (obstacleR + playerR)
+                ny = (player.y - obstacleY) / (obstacleR + playerR)
+                p = player.vx * nx + player.vy * ny
+                d = sqrt((obstacleX - player.x) ** 2 + (obstacleY - player.y) ** 2)
+                player.vx -= 2 * p * nx
+                player.vy -= 2 * p * ny
+                if d > 0:
+                    player.x = obstacleX + (obstacleR + playerR) * (player.x - obstacleX) / d
+                    player.y = obstacleY + (obstacleR + playerR) * (player.y - obstacleY) / d
+
+    def countClients(self):
+        """Retourne le nombre de clients connectés."""
+        return len([p for p in self.players.values() if p.writer is not None])
+
+    def removePlayer(self, pseudo):
+        """Supprime un client de la session et prévient les autres.
+
+        Arguments:
+            pseudo -- Le pseudo du client.
+        """
+        if pseudo in self.players:
+            print("[StandInServer] : Removing " + pseudo)
+            del self.players[pseudo]
+            self.sendToAll("PLAYERLEFT/" + pseudo + "/")
+        if self.countClients() == 0:
+            self.finishSession()
+            # Les adversaires scriptés ne restent pas sans client
+            self.players = {}
+
+    async def startSession(self):
+        """Attend le temps d'attente de data.json puis commence une session."""
+        await asyncio.sleep(dat.WAITING_TIME / 1000)
+        self.startTask = None
+        if self.countClients() == 0:
+            return
+        for i in range(0, self.nbBots):
+            pseudo = "bot" + str(i + 1)
+            if pseudo not in self.players:
+                x, y = self.randomPosition()
+                self.players[pseudo] = StandInPlayer(pseudo, x, y)
+        self.obstacles = [self.randomPosition() for __ in range(0, self.nbObstacles)]
+        self.nextPlayerId = 0
+        for player in self.players.values():
+            self.assignPlayerId(player)
+        self.sessionStarted = True
+        print("[StandInServer] : Session begins with " + str(len(self.players)) + " players")
+        self.sendToAll("SESSION/" + self.getCoords() + "/" + self.getObjectif() + "/" + self.getOcoords() + "/")
+        self.sendPlayerIds()
+        self.tickTask = asyncio.get_event_loop().create_task(self.tick())
+
+    def finishSession(self):
+        """Termine la session courante. Une nouvelle session commencera si des clients sont encore connectés."""
+        if self.tickTask is not None:
+            self.tickTask.cancel()
+            self.tickTask = None
+        if not self.sessionStarted:
+            return
+        self.sessionStarted = False
+        for pseudo in [p.pseudo for p in self.players.values() if p.writer is None]:
+            del self.players[pseudo]
+        for player in self.players.values():
+            player.score = 0
+            player.x, player.y = self.randomPosition()
+            player.vx = player.vy = 0.0
+            player.angle = 0
+        self.newObjectif()
+        if self.countClients() > 0:
+            self.sendToAll("WELCOME/wait/" + self.getScores() + "/" + self.getObjectif() + "/" + self.getNbBombs() + "/")
+            if self.countClients() >= self.nbPlayers and self.startTask is None:
+                self.startTask = asyncio.get_event_loop().create_task(self.startSession())
+
+    def moveBot(self, player):
+        """Déplace un adversaire scripté selon le script choisi.
+
+        Arguments:
+            player -- L'adversaire.
+        """
+        if self.script == "still":
+            return
+        speed = sqrt(player.vx * player.vx + player.vy * player.vy)
+        if self.script == "circle":
+            angleCmd = dat.TURN_IT
+            thrustCmd = 1 if speed < dat.THRUST_IT else 0
+        else:
+            angleCmd = self.rand.choice((-dat.TURN_IT, 0, dat.TURN_IT))
+            thrustCmd = 1 if speed < dat.THRUST_IT and self.rand.random() < 0.2 else 0
+        player.updateFromCommand(radians(angleCmd), thrustCmd)
+        self.checkCollisions(player)
+
+    async def tick(self):
+        """Déplace les adversaires scriptés et envoie un TICK à chaque client, tickRate fois par seconde."""
+        loop = asyncio.get_event_loop()
+        period = 1 / self.tickRate
+        deadline = loop.time()
+        while True:
+            for player in list(self.players.values()):
+                if player.writer is None:
+                    self.moveBot(player)
+            # Chaque forme du TICK n'est calculée que si un client la reçoit
+            tick = None
+            binaryTick = None
+            for player in list(self.players.values()):
+                if player.writer is None:
+                    continue
+                if player.acksInputs:
+                    self.send(player, "ACK/" + str(player.lastSeq) + "/")
+                if player.binaryTicks:
+                    if binaryTick is None:
+                        binaryTick = self.getBinaryTick()
+                    self.send(player, binaryTick)
+                else:
+                    if tick is None:
+                        tick = "TICK/" + self.getVcoords() + "/"
+                    self.send(player, tick)
+            self.tickCount += 1
+            # L'échéance suivante ne dépend pas du temps passé à envoyer les TICK
+            deadline += period
+            await asyncio.sleep(max(0, deadline - loop.time()))
+
+    async def serve(self):
+        """Ouvre le port d'écoute et sert les clients indéfiniment."""
+        self.server = await asyncio.start_server(self.handleClient, self.host, self.port)
+        print("[StandInServer] : Listening on " + self.host + ":" + str(self.port))
+        async with self.server:
+            await self.server.serve_forever()
+
+    def formatStats(self):
+        """Met en forme les statistiques d'envoi du serveur."""
+        return "%d TICK, %d messages, %d bytes sent" % (self.tickCount, self.messagesSent, self.bytesSent)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serveur de remplacement parlant le protocole du jeu.")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=1234)
+    parser.add_argument("--players", type=int, default=1, help="le nombre de clients attendus avant de commencer")
+    parser.add_argument("--bots", type=int, default=0, help="le nombre d'adversaires scriptés")
+    parser.add_argument("--obstacles", type=int, default=None, help="le nombre d'obstacles (data.json par défaut)")
+    parser.add_argument("--tickrate", type=float, default=None, help="le nombre de TICK par seconde (data.json par défaut)")
+    parser.add_argument("--script", choices=StandInServer.SCRIPTS, default="circle",
+                        help="le déplacement des adversaires scriptés")
+    parser.add_argument("--seed", type=int, default=0, help="la graine des tirages aléatoires")
+    parser.add_argument("--latency", type=float, default=0, help="la latence simulée dans chaque sens, en ms")
+    args = parser.parse_args()
+
+    dat.setUpData()
+    server = StandInServer(args.host, args.port, args.players, args.bots, args.obstacles, args.tickrate,
+                           args.script, args.seed, args.latency / 1000)
+    try:
+        asyncio.run(server.serve())
+    except KeyboardInterrupt:
+        pass
+    print("[StandInServer] : " + server.formatStats())
+
+
+if __name__ == "__main__":
+    main()
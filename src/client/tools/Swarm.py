@@ -0,0 +1,318 @@
+# coding: utf-8
+
+"""Générateur de charge : des centaines de clients simulés dans un seul processus, sans interface graphique.
+Chaque client réutilise le décodeur, le protocole et la physique (PlayerPod) du client.
+Affiche, pour l'ensemble des connexions, les percentiles p50/p95/p99 de l'écart entre deux TICK,
+du nombre de messages et d'octets reçus par seconde et du temps de décodage.
+
+Depuis le dossier src/client :
+    python3 -m tools.Swarm --port 1234 --clients 200 --duration 30
+"""
+import argparse
+import asyncio
+import random
+from time import perf_counter
+
+import communication.codec as codec
+import data as dat
+from communication.MessageDecoder import MessageDecoder
+from communication.Protocol import Protocol
+from player.Pair import Pair
+from player.PlayerPod import PlayerPod
+
+# La taille maximale lue en une fois sur la socket
+RECV_SIZE = 65536
+
+
+def percentile(values, p):
+    """Calcule un percentile (méthode du rang le plus proche).
+
+    Arguments:
+        values -- Les valeurs.
+        p -- Le percentile voulu, entre 0 et 100.
+
+    Returns:
+        La valeur du percentile, None s'il n'y a aucune valeur.
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(p / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+class SwarmClient():
+    """Un client simulé.
+        Joue le rôle du dispatcher pour le protocole : il ne garde que son propre pod et les mesures.
+    """
+
+    def __init__(self, pseudo, script, seed):
+        """Constructeur.
+
+        Arguments:
+            pseudo -- Le pseudo du client.
+            script -- Les commandes envoyées : "still", "circle" ou "random".
+            seed -- La graine des commandes aléatoires.
+        """
+        self.pseudo = pseudo
+        self.script = script
+        self.rand = random.Random(seed)
+        self.player = None
+        self.writer = None
+        self.decoder = MessageDecoder()
+        self.protocol = Protocol(self)
+        self.connected = False
+        self.denied = False
+        self.startTime = None
+        self.lastTick = None
+        self.tickIntervals = []
+        self.nbMessages = 0
+        self.nbBytes = 0
+        self.nbErrors = 0       # Les messages dont le traitement a échoué
+        self.decodeTime = 0.0
+
+    async def run(self, host, port):
+        """Se connecte au serveur puis lit ses messages jusqu'à la fermeture de la connexion.
+
+        Arguments:
+            host -- Le nom d'host du serveur.
+            port -- Le numéro de port du serveur.
+        """
+        try:
+            reader, self.writer = await asyncio.open_connection(host, port)
+        except OSError:
+            return
+        self.connected = True
+        self.startTime = perf_counter()
+        self.writer.write(("CONNECT/" + self.pseudo + "/\n").encode())
+        try:
+            while True:
+                data = await reader.read(RECV_SIZE)
+                if not data:
+                    break
+                now = perf_counter()
+                self.nbBytes += len(data)
+                self.decoder.feed(data)
+                while self.decoder.hasMessage():
+                    message = self.decoder.nextMessage()
+                    self.nbMessages += 1
+                    if message[0] == "TICK":
+                        if self.lastTick is not None:
+                            self.tickIntervals.append(now - self.lastTick)
+                        self.lastTick = now
+                    try:
+                        self.protocol.dispatch(message)
+                    # Un message mal formé est compté, le client continue de lire les suivants
+                    except Exception as e:
+                        self.nbErrors += 1
+                        if self.nbErrors == 1:
+                            print("[SwarmClient] : " + self.pseudo + " : " + type(e).__name__ + " : " + str(e))
+                self.decodeTime += perf_counter() - now
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self.connected = False
+
+    def sendCommand(self):
+        """Choisit les commandes du pod selon le script et les envoie au serveur."""
+        if self.player is None or self.writer is None or self.writer.is_closing():
+            return
+        if self.script == "circle":
+            self.player.clock()
+            self.player.thrust()
+        elif self.script == "random":
+            choice = self.rand.random()
+            if choice < 0.3:
+                self.player.clock()
+            elif choice < 0.6:
+                self.player.antiClock()
+            if self.rand.random() < 0.2:
+                self.player.thrust()
+        self.writer.write(("NEWCOM/" + self.player.getCommand() + "/\n").encode())
+        self.player.resetCommand()
+
+    def close(self):
+        """Envoie le message EXIT et ferme la connexion."""
+        if self.writer is not None and not self.writer.is_closing():
+            self.writer.write(("EXIT/" + self.pseudo + "/\n").encode())
+            self.writer.close()
+
+    def getStats(self, now):
+        """Calcule les mesures du client.
+
+        Arguments:
+            now -- L'instant de fin des mesures.
+
+        Returns:
+            Un dictionnaire des mesures, None si le client ne s'est jamais connecté.
+        """
+        if self.startTime is None:
+            return None
+        elapsed = max(now - self.startTime, 1e-9)
+        return {
+            "intervals": self.tickIntervals,
+            "msgRate": self.nbMessages / elapsed,
+            "byteRate": self.nbBytes / elapsed,
+            "decodeUs": self.decodeTime / max(self.nbMessages, 1) * 1e6,
+            "cpuShare": self.decodeTime / elapsed * 100,
+            "errors": self.nbErrors
+        }
+
+    # Les méthodes suivantes sont appelées par le protocole, comme pour le dispatcher
+
+    def onStatusReceived(self, status):
+        pass
+
+    def onScoresReceived(self, scores):
+        pass
+
+    def showDeniedMessage(self):
+        self.denied = True
+
+    def onNewPlayerReceived(self, pseudo):
+        pass
+
+    def onPlayerLeftReceived(self, pseudo):
+        pass
+
+    def onSessionReceived(self, coords, coord):
+        for (pseudo, coordPlayer) in codec.parseEntries(coords):
+            if pseudo == self.pseudo:
+                x, y = codec.parseCoord(coordPlayer)
+                self.player = PlayerPod(pseudo, Pair(x, y), 0, None, None, None)
+
+    def onObstaclesReceived(self, obstacles):
+        pass
+
+    def onWinnerReceived(self, scores):
+        self.player = None
+
+    def onTickReceived(self, vcoords):
+        for (pseudo, vcoord) in codec.parseEntries(vcoords):
+            values = codec.parseVcoord(vcoord)
+            # Un TICK retardé peut arriver entre WINNER et la session suivante
+            if pseudo == self.pseudo and self.player is not None:
+                self.player.fullyUpdate(*values)
+
+    def onObjectifReceived(self, objectif):
+        codec.parseCoord(objectif)
+
+    def onPublicMessageReceived(self, message):
+        pass
+
+    def onPrivateMessageReceived(self, src, message):
+        pass
+
+
+class Swarm():
+    """Un essaim de clients simulés partageant une même boucle d'événements."""
+
+    def __init__(self, host, port, nbClients, script="random", seed=0, rampUp=1.0):
+        """Constructeur.
+
+        Arguments:
+            host -- Le nom d'host du serveur.
+            port -- Le numéro de port du serveur.
+            nbClients -- Le nombre de clients simulés.
+
+        Keyword Arguments:
+            script -- Les commandes envoyées par les clients : "still", "circle" ou "random". (default: {"random"})
+            seed -- La graine des commandes aléatoires. (default: {0})
+            rampUp -- La durée en secondes sur laquelle les connexions sont étalées. (default: {1.0})
+        """
+        self.host = host
+        self.port = port
+        self.rampUp = rampUp
+        self.clients = [SwarmClient("swarm" + str(i + 1), script, seed + i) for i in range(0, nbClients)]
+
+    async def sendCommands(self):
+        """Envoie les commandes de tous les clients, server_tickrate fois par seconde."""
+        loop = asyncio.get_event_loop()
+        period = 1 / dat.SERVER_TICRATE
+        deadline = loop.time()
+        while True:
+            for client in self.clients:
+                client.sendCommand()
+            deadline += period
+            await asyncio.sleep(max(0, deadline - loop.time()))
+
+    async def run(self, duration):
+        """Connecte tous les clients, les fait jouer pendant une durée donnée puis les déconnecte.
+
+        Arguments:
+            duration -- La durée de la mesure en secondes.
+
+        Returns:
+            L'instant de fin des mesures.
+        """
+        tasks = []
+        for (i, client) in enumerate(self.clients):
+            tasks.append(asyncio.ensure_future(client.run(self.host, self.port)))
+            # Les connexions sont étalées pour ne pas saturer la file d'attente du serveur
+            if self.rampUp > 0:
+                await asyncio.sleep(self.rampUp / len(self.clients))
+        commandTask = asyncio.ensure_future(self.sendCommands())
+        await asyncio.sleep(duration)
+        end = perf_counter()
+
+        commandTask.cancel()
+        for client in self.clients:
+            client.close()
+        await asyncio.wait(tasks, timeout=2)
+        for task in tasks:
+            task.cancel()
+        return end
+
+    def formatReport(self, end):
+        """Met en forme les percentiles des mesures de tous les clients.
+
+        Arguments:
+            end -- L'instant de fin des mesures.
+
+        Returns:
+            Le rapport.
+        """
+        stats = [s for s in (client.getStats(end) for client in self.clients) if s is not None]
+        period = 1 / dat.SERVER_TICRATE
+        intervals = [i * 1000 for s in stats for i in s["intervals"]]
+        jitters = [abs(i - period * 1000) for i in intervals]
+        rows = [
+            ("TICK interval (ms)", intervals),
+            ("TICK jitter (ms)", jitters),
+            ("messages/s per conn", [s["msgRate"] for s in stats]),
+            ("bytes/s per conn", [s["byteRate"] for s in stats]),
+            ("decode (us/msg)", [s["decodeUs"] for s in stats]),
+            ("decode CPU (%/conn)", [s["cpuShare"] for s in stats])
+        ]
+        lines = ["%d/%d clients connected, %d denied, %d messages failed" % (
+            len(stats), len(self.clients), len([c for c in self.clients if c.denied]), sum(s["errors"] for s in stats))]
+        lines.append("%-22s %12s %12s %12s" % ("", "p50", "p95", "p99"))
+        for (name, values) in rows:
+            if values:
+                lines.append("%-22s %12.3f %12.3f %12.3f" % (name, percentile(values, 50), percentile(values, 95),
+                                                              percentile(values, 99)))
+            else:
+                lines.append("%-22s %12s %12s %12s" % (name, "-", "-", "-"))
+        return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simule de nombreux clients pour mesurer le serveur et le protocole.")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=1234)
+    parser.add_argument("--clients", type=int, default=100, help="le nombre de clients simulés")
+    parser.add_argument("--duration", type=float, default=10, help="la durée de la mesure en secondes")
+    parser.add_argument("--script", choices=("still", "circle", "random"), default="random",
+                        help="les commandes envoyées par les clients")
+    parser.add_argument("--ramp-up", type=float, default=1.0, help="la durée sur laquelle les connexions sont étalées")
+    parser.add_argument("--seed", type=int, default=0, help="la graine des commandes aléatoires")
+    args = parser.parse_args()
+
+    dat.setUpData()
+    swarm = Swarm(args.host, args.port, args.clients, args.script, args.seed, args.ramp_up)
+    end = asyncio.run(swarm.run(args.duration))
+    print(swarm.formatReport(end))
+
+
+if __name__ == "__main__":
+    main()